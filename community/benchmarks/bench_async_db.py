@@ -0,0 +1,75 @@
+# benchmarks/bench_async_db.py
+"""
+기존 동기(PyMySQL) 경로와 비동기(aiomysql) 경로의 동시 요청 처리량 비교 벤치마크
+
+async 라우트 안에서 동기 드라이버를 호출하면 쿼리를 기다리는 동안 이벤트 루프 전체가 멈춥니다.
+같은 쿼리를 같은 동시성으로 실행해 두 방식의 처리량(req/s)과 p99 지연시간을 비교합니다.
+
+실행 방법 (community 폴더에서):
+    python -m benchmarks.bench_async_db --requests 500 --concurrency 50 --delay 0.01
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from database import SYNC_DATABASE_URL, engine
+
+# 느린 쿼리를 흉내 내기 위해 MySQL의 SLEEP()을 사용합니다.
+DEFAULT_QUERY = "SELECT SLEEP(:delay)"
+
+
+async def run_case(label: str, make_request, total: int, concurrency: int):
+    """동시성 제한을 두고 total 개의 요청을 실행한 뒤 결과를 출력합니다."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            await make_request()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(f"[{label:8}] {total}건 / {elapsed:.2f}s = {total / elapsed:8.1f} req/s, p99 {p99 * 1000:.1f} ms")
+
+
+async def main(args):
+    query = text(args.query)
+    params = {"delay": args.delay}
+    sync_engine = create_engine(SYNC_DATABASE_URL)
+
+    async def blocking_request():
+        # 기존 방식: async 함수 안에서 동기 커넥션을 그대로 사용 (이벤트 루프가 멈춤)
+        with sync_engine.connect() as conn:
+            conn.execute(query, params).fetchall()
+
+    async def async_request():
+        # 개선 방식: 쿼리를 기다리는 동안 다른 요청이 이벤트 루프를 사용
+        async with engine.connect() as conn:
+            (await conn.execute(query, params)).fetchall()
+
+    # 커넥션 풀 워밍업
+    await blocking_request()
+    await async_request()
+
+    await run_case("blocking", blocking_request, args.requests, args.concurrency)
+    await run_case("async", async_request, args.requests, args.concurrency)
+
+    sync_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="동기/비동기 DB 경로 처리량 비교")
+    parser.add_argument("--requests", type=int, default=500, help="전체 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시 요청 수")
+    parser.add_argument("--delay", type=float, default=0.01, help="SLEEP 쿼리의 대기 시간(초)")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="실행할 SQL (:delay 파라미터 사용 가능)")
+    asyncio.run(main(parser.parse_args()))
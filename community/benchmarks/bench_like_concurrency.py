@@ -0,0 +1,168 @@
+# benchmarks/bench_like_concurrency.py
+"""
+좋아요/취소 동시 요청에서 카운터가 정확한지 확인하는 스크립트 (기본은 DB 서버 불필요)
+
+여러 사용자가 같은 게시글에 좋아요/취소를 무작위로 연타하는 상황을 만들어
+각 요청을 실제 API와 같은 단위(get_db 의 요청 단위 트랜잭션)로 LikeController 에 동시에 보냅니다.
+좋아요 수를 매번 바로 UPDATE 하는 경우(direct)와 메모리 버퍼에 모았다가 반영하는 경우(buffer)를 차례로 실행하고,
+buffer 는 실행 중 flush 를 주기적으로 돌린 뒤 마지막으로 남은 증감량을 반영하고 재계산(reconcile)까지 실행합니다.
+끝난 뒤 아래를 확인하고, 하나라도 어긋나면 종료 코드 1로 실패합니다.
+- posts.like_count 와 post_likes 행 수가 같은지
+- 성공한 좋아요(201) 수 - 성공한 취소(200) 수가 최종 좋아요 수와 같은지
+- 같은 사용자의 좋아요가 두 번 저장되지 않았는지
+
+--url 로 MySQL 주소를 넘기면 (마이그레이션이 적용된 빈 테스트 DB) 그 DB에서 실행합니다.
+
+실행 방법 (community 폴더에서):
+    python -m benchmarks.bench_like_concurrency --users 20 --clicks 10 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Response
+from sqlalchemy import text
+
+import database
+from commands.migrate import migrate
+from controllers.like_controller import LikeController
+from counters import like_counts
+from database import create_db_engine, get_db
+from utils import UserInfo
+
+SEED = 42
+
+
+# 라우트의 Depends(get_db) 와 같은 요청 단위 트랜잭션 (커밋 후 on_commit 콜백 실행)
+request_scope = asynccontextmanager(get_db)
+
+
+async def seed_users(db_engine, users: int) -> list[int]:
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO users (email, password, nickname, profile_url, account_status)
+                VALUES (:email, 'x', :nickname, NULL, 'active')
+            """),
+            [{"email": f"like{i}@bench.example.com", "nickname": f"like{i}"} for i in range(1, users + 1)]
+        )
+        return [row.id for row in await conn.execute(text("SELECT id FROM users WHERE email LIKE 'like%'"))]
+
+
+async def create_post(db_engine, user_id: int) -> int:
+    async with db_engine.begin() as conn:
+        result = await conn.execute(
+            text("INSERT INTO posts (user_id, title, content) VALUES (:user_id, 'like bench', 'like bench')"),
+            {"user_id": user_id}
+        )
+        return result.lastrowid
+
+
+async def run_case(label: str, db_engine, user_ids: list[int], args) -> list[str]:
+    post_id = await create_post(db_engine, user_ids[0])
+
+    # 사용자마다 clicks 번의 좋아요/취소를 무작위로 섞어 한꺼번에 보냅니다.
+    rng = random.Random(SEED)
+    clicks = [(user_id, rng.choice(("like", "unlike"))) for user_id in user_ids for _ in range(args.clicks)]
+    rng.shuffle(clicks)
+
+    results = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)  # 커넥션 풀 크기를 넘지 않도록 제한
+
+    async def click(user_id: int, action: str):
+        user = UserInfo(userId=user_id, email=f"like{user_id}@bench.example.com", nickname="bench", status="active")
+        async with semaphore:
+            try:
+                async with request_scope() as conn:
+                    if action == "like":
+                        await LikeController.add_like(conn, post_id, user, Response())
+                    else:
+                        await LikeController.remove_like(conn, post_id, user, Response())
+                results[f"{action} ok"] += 1
+            except HTTPException as e:
+                results[f"{action} {e.status_code}"] += 1
+
+    async def flusher():
+        # tasks.like_count_flusher 처럼 요청이 오가는 중에 주기적으로 반영합니다.
+        while True:
+            await asyncio.sleep(args.flush_interval)
+            await like_counts.flush()
+
+    flush_task = asyncio.create_task(flusher()) if like_counts.enabled else None
+    started = time.perf_counter()
+    await asyncio.gather(*(click(user_id, action) for user_id, action in clicks))
+    elapsed = time.perf_counter() - started
+
+    reconciled = 0
+    if flush_task:
+        flush_task.cancel()
+        try:
+            await flush_task
+        except asyncio.CancelledError:
+            pass
+        reconciled = await like_counts.reconcile()  # 남은 증감량 반영 + 재계산
+
+    async with db_engine.connect() as conn:
+        like_count = (await conn.execute(
+            text("SELECT like_count FROM posts WHERE id = :post_id"), {"post_id": post_id}
+        )).scalar_one()
+        rows, distinct_users = (await conn.execute(
+            text("SELECT COUNT(*), COUNT(DISTINCT user_id) FROM post_likes WHERE post_id = :post_id"),
+            {"post_id": post_id}
+        )).one()
+
+    print(f"[{label:6}] 요청 {len(clicks)}건 / {elapsed:.2f}s")
+    for key in sorted(results):
+        print(f"[{label:6}]   {key:12} {results[key]:5}")
+    print(f"[{label:6}] like_count={like_count}  post_likes={rows}  distinct users={distinct_users}  reconciled={reconciled}")
+
+    errors = []
+    if like_count != rows:
+        errors.append("posts.like_count 와 post_likes 행 수가 다릅니다.")
+    if results["like ok"] - results["unlike ok"] != rows:
+        errors.append("성공한 좋아요 - 취소 수가 최종 좋아요 수와 다릅니다.")
+    if rows != distinct_users:
+        errors.append("같은 사용자의 좋아요가 중복 저장되었습니다.")
+    if reconciled:
+        errors.append("버퍼 반영 후에도 재계산으로 고친 카운터가 있습니다.")
+    return [f"[{label}] {error}" for error in errors]
+
+
+async def main(args):
+    if args.url:
+        db_engine = create_db_engine(args.url)
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="community-bench-"), "like.db")
+        db_engine = create_db_engine(f"sqlite+aiosqlite:///{db_path}")
+        await migrate(db_engine=db_engine)
+    # get_db 와 좋아요 수 버퍼는 database.engine 을 사용하므로 벤치마크 엔진으로 바꿔 끼웁니다.
+    database.engine = db_engine
+    user_ids = await seed_users(db_engine, args.users)
+
+    errors = []
+    for label, buffered in (("direct", False), ("buffer", True)):
+        like_counts.enabled = buffered
+        errors += await run_case(label, db_engine, user_ids, args)
+    await db_engine.dispose()
+
+    for error in errors:
+        print(f"[FAIL] {error}")
+    if errors:
+        sys.exit(1)
+    print("[OK] 동시 요청에서도 좋아요 수가 정확합니다.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="좋아요/취소 동시 요청의 카운터 정확성 확인")
+    parser.add_argument("--users", type=int, default=20, help="좋아요를 누르는 사용자 수")
+    parser.add_argument("--clicks", type=int, default=10, help="사용자마다 보내는 좋아요/취소 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시에 처리하는 최대 요청 수")
+    parser.add_argument("--flush-interval", type=float, default=0.05, help="buffer 케이스에서 실행 중 반영 주기(초)")
+    parser.add_argument("--url", default=None, help="사용할 DB 주소 (기본: 임시 SQLite 파일)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+# benchmarks/bench_login.py
+"""
+동시 로그인 + 일반 조회가 섞인 트래픽에서 bcrypt 실행 위치에 따른 지연시간 비교 (DB 서버 불필요)
+
+- inline: 이벤트 루프에서 bcrypt를 바로 실행 (이전 방식, PASSWORD_HASH_WORKERS=0 과 같음)
+- pool  : 전용 스레드 풀에서 실행 (security.PasswordHashPool)
+
+임시 SQLite 파일에 사용자와 게시글을 만들어 두고, 로그인 요청과 피드 조회 요청을 일정한 도착 간격으로 섞어 보낸 뒤
+각각의 p50/p99 지연시간을 출력합니다. inline 에서는 로그인 한 건이 해싱하는 동안 피드 조회까지 모두 멈춥니다.
+
+실행 방법 (community 폴더에서):
+    python -m benchmarks.bench_login --logins 40 --reads 400 --rate 100 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import Response
+from sqlalchemy import text
+
+import security
+from commands.migrate import migrate
+from controllers.auth_controller import AuthController
+from database import create_db_engine
+from models.post_model import PostModel
+from security import PasswordHashPool, pwd_context
+from utils import UserLoginRequest
+
+PASSWORD = "bench-password"
+
+
+async def seed(db_engine, users: int, posts: int, rounds: int):
+    # 모든 사용자가 같은 해시를 쓰도록 한 번만 해싱합니다. (검증 비용은 rounds 로 조절)
+    hashed = pwd_context.hash(PASSWORD, rounds=rounds)
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO users (email, password, nickname, profile_url, account_status)
+                VALUES (:email, :password, :nickname, NULL, 'active')
+            """),
+            [{"email": f"user{i}@bench.example.com", "password": hashed, "nickname": f"user{i}"} for i in range(1, users + 1)]
+        )
+        await conn.execute(
+            text("INSERT INTO posts (user_id, title, content) VALUES (:user_id, :title, 'bench content')"),
+            [{"user_id": (i % users) + 1, "title": f"post {i}"} for i in range(1, posts + 1)]
+        )
+
+
+def percentile(latencies: list, ratio: float) -> float:
+    return latencies[max(int(len(latencies) * ratio) - 1, 0)] * 1000
+
+
+async def run_case(label: str, db_engine, logins: int, reads: int, rate: float):
+    latencies = {"login": [], "feed": []}
+
+    async def login(user_id: int):
+        request = UserLoginRequest(email=f"user{user_id}@bench.example.com", password=PASSWORD)
+        async with db_engine.begin() as conn:
+            await AuthController.login(conn, request, Response())
+
+    async def feed(_):
+        async with db_engine.begin() as conn:
+            await PostModel.get_all_posts(conn, None, 10)
+
+    async def one_request(kind: str, run, arg, arrival: float):
+        # 지연시간은 요청이 '도착해야 했던' 시각부터 잽니다.
+        # 이벤트 루프가 bcrypt로 멈춰 있어 늦게 시작된 시간도 클라이언트가 기다린 시간에 포함됩니다.
+        await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+        await run(arg)
+        latencies[kind].append(time.perf_counter() - arrival)
+
+    # 이전 실행에서 만든 세션을 지워 ALREADY_LOGIN(409)이 나지 않게 합니다.
+    async with db_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM sessions"))
+
+    # 초당 rate 건씩 일정한 간격으로 도착하고, 로그인은 조회 요청 사이에 고르게 섞습니다.
+    requests = [("feed", feed, i) for i in range(reads)]
+    step = max((reads + logins) // max(logins, 1), 1)
+    for n, user_id in enumerate(range(1, logins + 1)):
+        requests.insert(n * step, ("login", login, user_id))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        one_request(kind, run, arg, started + i / rate) for i, (kind, run, arg) in enumerate(requests)
+    ))
+    elapsed = time.perf_counter() - started
+
+    for kind, values in latencies.items():
+        values.sort()
+        print(
+            f"[{label:6}] {kind:5} {len(values):4}건  p50 {percentile(values, 0.5):8.1f} ms"
+            f"  p99 {percentile(values, 0.99):8.1f} ms"
+        )
+    print(f"[{label:6}] 전체 {elapsed:.2f}s")
+
+
+async def main(args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="community-bench-"), "login.db")
+    db_engine = create_db_engine(f"sqlite+aiosqlite:///{db_path}")
+    await migrate(db_engine=db_engine)
+    await seed(db_engine, args.logins, 100, args.rounds)
+
+    # AuthController 는 security.password_hash_pool 을 사용하므로 케이스마다 풀을 바꿔 끼웁니다.
+    for label, workers in (("inline", 0), ("pool", args.workers)):
+        security.password_hash_pool = PasswordHashPool(workers, max_pending=args.logins)
+        await run_case(label, db_engine, args.logins, args.reads, args.rate)
+        security.password_hash_pool.shutdown()
+
+    await db_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bcrypt 실행 위치(이벤트 루프/스레드 풀)별 로그인·조회 지연시간 비교")
+    parser.add_argument("--logins", type=int, default=40, help="로그인 요청 수 (사용자마다 한 번)")
+    parser.add_argument("--reads", type=int, default=400, help="피드 조회 요청 수")
+    parser.add_argument("--rate", type=float, default=100.0, help="초당 도착하는 요청 수 (로그인 + 조회)")
+    parser.add_argument("--workers", type=int, default=4, help="pool 케이스의 스레드 수")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost (운영 기본값은 12)")
+    asyncio.run(main(parser.parse_args()))
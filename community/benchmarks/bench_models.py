@@ -0,0 +1,180 @@
+# benchmarks/bench_models.py
+"""
+models/ 의 주요 쿼리 성능 회귀 테스트 (DB 서버 불필요)
+
+임시 SQLite 파일에 마이그레이션을 적용하고, 고정된 시드로 같은 데이터를 만든 뒤
+피드/상세/댓글/세션 조회와 좋아요 쓰기 경로의 지연시간(중앙값, p95)을 측정합니다.
+--baseline 으로 이전 결과(JSON)를 넘기면 중앙값이 허용 범위보다 느려진 항목이 있을 때 종료 코드 1로 실패합니다.
+
+실행 방법 (community 폴더에서):
+    python -m benchmarks.bench_models --save bench_baseline.json
+    python -m benchmarks.bench_models --baseline bench_baseline.json --tolerance 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from commands.migrate import migrate
+from database import create_db_engine
+from models.comment_model import CommentModel
+from models.like_model import LikeModel
+from models.post_model import PostModel
+from models.user_model import UserModel
+
+SEED = 42
+
+
+async def seed(db_engine, users: int, posts: int, comments_per_post: int, likes_per_post: int):
+    """고정된 시드로 항상 같은 데이터를 만듭니다."""
+    rng = random.Random(SEED)
+    now = datetime(2025, 1, 1)
+
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO users (email, password, nickname, profile_url, account_status)
+                VALUES (:email, 'x', :nickname, NULL, 'active')
+            """),
+            [{"email": f"user{i}@bench.local", "nickname": f"user{i}"} for i in range(1, users + 1)]
+        )
+        await conn.execute(
+            text("INSERT INTO sessions (user_id, session_id, expired_at) VALUES (:user_id, :session_id, :expired_at)"),
+            [{"user_id": i, "session_id": f"session-{i}", "expired_at": now + timedelta(days=3650)} for i in range(1, users + 1)]
+        )
+        await conn.execute(
+            text("""
+                INSERT INTO posts (user_id, title, content, created_at, updated_at, like_count, comment_count)
+                VALUES (:user_id, :title, 'bench content', :created_at, :created_at, :likes, :comments)
+            """),
+            [
+                {
+                    "user_id": rng.randint(1, users), "title": f"post {i}", "created_at": now + timedelta(minutes=i),
+                    "likes": min(likes_per_post, users), "comments": comments_per_post,
+                }
+                for i in range(1, posts + 1)
+            ]
+        )
+        await conn.execute(
+            text("""
+                INSERT INTO comments (post_id, user_id, content, created_at, updated_at)
+                VALUES (:post_id, :user_id, 'bench comment', :created_at, :created_at)
+            """),
+            [
+                {"post_id": p, "user_id": rng.randint(1, users), "created_at": now + timedelta(minutes=p, seconds=c)}
+                for p in range(1, posts + 1) for c in range(comments_per_post)
+            ]
+        )
+        await conn.execute(
+            text("INSERT INTO post_likes (post_id, user_id) VALUES (:post_id, :user_id)"),
+            [
+                {"post_id": p, "user_id": u}
+                for p in range(1, posts + 1) for u in rng.sample(range(1, users + 1), min(likes_per_post, users))
+            ]
+        )
+
+
+def build_cases(users: int, posts: int):
+    """(이름, 실행 함수) 목록. 각 함수는 요청 하나와 같은 단위로 커넥션을 받아 실행합니다."""
+    rng = random.Random(SEED)
+
+    async def like_toggle(conn):
+        user_id, post_id = rng.randint(1, users), rng.randint(1, posts)
+        # 추가되지 않았으면 (이미 누른 상태) 취소합니다. (카운터는 매번 바로 UPDATE 하는 방식으로 측정)
+        if await LikeModel.add_like(conn, user_id, post_id):
+            await LikeModel.add_like_count(conn, post_id, 1)
+        elif removed := await LikeModel.remove_like(conn, user_id, post_id):
+            await LikeModel.add_like_count(conn, post_id, -removed)
+
+    async def post_detail_legacy(conn):
+        # 이전 상세 조회: 조회수 UPDATE + 게시글 조회 + 좋아요 여부 조회 (왕복 3번)
+        user_id, post_id = rng.randint(1, users), rng.randint(1, posts)
+        await PostModel.increase_view_count(conn, post_id)
+        await PostModel.get_post_by_id(conn, post_id)
+        await LikeModel.has_liked(conn, user_id, post_id)
+
+    async def feed_liked_flags(conn):
+        # 로그인 사용자의 목록: 페이지 조회 + 페이지 전체의 좋아요 여부를 IN 쿼리 한 번으로
+        page = await PostModel.get_all_posts(conn, rng.randint(11, posts), 10)
+        await LikeModel.get_liked_post_ids(conn, rng.randint(1, users), [post["postId"] for post in page])
+
+    return [
+        ("feed_first_page", lambda conn: PostModel.get_all_posts(conn, None, 10)),
+        ("feed_liked_flags", feed_liked_flags),
+        ("feed_deep_page", lambda conn: PostModel.get_all_posts(conn, rng.randint(11, posts), 10)),
+        ("post_detail", lambda conn: PostModel.get_post_by_id(conn, rng.randint(1, posts))),
+        ("post_detail_legacy", post_detail_legacy),
+        ("post_detail_liked", lambda conn: PostModel.get_post_detail(conn, rng.randint(1, posts), rng.randint(1, users))),
+        ("comment_list", lambda conn: CommentModel.get_comments_by_post_id(conn, rng.randint(1, posts))),
+        ("session_lookup", lambda conn: UserModel.get_user_by_session(conn, f"session-{rng.randint(1, users)}")),
+        ("like_toggle", like_toggle),
+    ]
+
+
+async def measure(db_engine, run, iterations: int) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with db_engine.begin() as conn:
+            await run(conn)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "median_ms": round(statistics.median(latencies), 4),
+        "p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 4),
+    }
+
+
+async def main(args) -> int:
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="community-bench-"), "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db_engine = create_db_engine(f"sqlite+aiosqlite:///{db_path}")
+
+    await migrate(db_engine=db_engine)
+    await seed(db_engine, args.users, args.posts, args.comments, args.likes)
+
+    results = {}
+    for name, run in build_cases(args.users, args.posts):
+        await measure(db_engine, run, 20)  # 워밍업
+        results[name] = await measure(db_engine, run, args.iterations)
+        print(f"  {name:20} median {results[name]['median_ms']:8.3f} ms   p95 {results[name]['p95_ms']:8.3f} ms")
+    await db_engine.dispose()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, result in results.items():
+            if name in baseline and result["median_ms"] > baseline[name]["median_ms"] * (1 + args.tolerance):
+                regressions.append(f"{name}: {baseline[name]['median_ms']} ms -> {result['median_ms']} ms")
+
+    for line in regressions:
+        print(f"  [REGRESSION] {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="models/ 쿼리 성능 회귀 테스트 (SQLite)")
+    parser.add_argument("--db", help="SQLite 파일 경로 (기본: 임시 폴더)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=5, help="게시글당 댓글 수")
+    parser.add_argument("--likes", type=int, default=10, help="게시글당 좋아요 수")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--save", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용하는 중앙값 증가 비율")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,135 @@
+# benchmarks/bench_serializer.py
+"""
+게시글 목록 한 페이지(기본 100개)의 응답 생성 비용 비교 (DB 서버 불필요)
+
+- before: 글마다 BASE_URL 문자열을 새로 조립하고 BaseResponse 를 반환
+          (FastAPI 가 response_model 로 다시 검증/변환한 뒤 표준 json 으로 직렬화)
+- after : serializers.avatar_url / image_url (경로 -> 전체 주소 캐시) + trusted_response (검증 없이 orjson 직렬화)
+
+DB 조회는 빼고 캐시에서 꺼낸 것과 같은 페이지를 만들어 두고, 실제 FastAPI 앱에 ASGI 로 요청을 보내
+요청 한 건의 평균/p50/p99 시간을 출력합니다. 두 응답 본문(JSON)이 같은지도 확인하고, 다르면 종료 코드 1로 실패합니다.
+
+실행 방법 (community 폴더에서):
+    python -m benchmarks.bench_serializer --posts 100 --authors 20 --requests 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+
+from images import image_pipeline
+from serializers import avatar_url, image_url, orjson, trusted_response
+from utils import BaseResponse
+
+BASE_URL = "http://127.0.0.1:8000"  # 이전 방식 (컨트롤러마다 하드코딩하던 주소)
+
+
+def make_page(posts: int, authors: int) -> list[dict]:
+    """PostModel.get_all_posts 가 돌려주는 것과 같은 모양의 페이지 (작성자 프로필은 authors 명이 돌아가며 반복)"""
+    created_at = datetime(2026, 1, 1, 12, 0, 0)
+    page = []
+    for i in range(posts):
+        author_id = i % authors + 1
+        profile = f"/public/images/{hashlib.sha256(f'profile{author_id}'.encode()).hexdigest()}.png"
+        page.append({
+            "postId": 10000 - i,
+            "title": f"bench post {i}",
+            "author": {
+                "userId": author_id,
+                "nickname": f"user{author_id}",
+                "profileImage": None if author_id % 5 == 0 else profile,  # 일부는 기본 프로필
+            },
+            "createdAt": created_at - timedelta(minutes=i),
+            "likeCount": i % 7,
+            "commentCount": i % 3,
+            "viewCount": i * 11,
+            "imageUrl": f"/public/images/{hashlib.sha256(f'image{i}'.encode()).hexdigest()}.jpg" if i % 2 else None,
+        })
+    return page
+
+
+def build_app(page: list[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=BaseResponse)
+    async def before():
+        posts = [{**post, "author": {**post["author"]}} for post in page]
+        for post in posts:
+            db_path = await image_pipeline.resolve(post["author"].get("profileImage"), "avatar")
+            if db_path and db_path.startswith("http"):
+                full_url = db_path
+            elif db_path:
+                full_url = f"{BASE_URL}{db_path}"
+            else:
+                full_url = f"{BASE_URL}/public/images/default-profile.png"
+            post["author"]["profileImage"] = full_url
+            image_path = post.pop("imageUrl")
+            post["thumbnail"] = f"{BASE_URL}{await image_pipeline.resolve(image_path, 'thumb')}" if image_path else None
+        return BaseResponse(message="POST_RETRIEVAL_SUCCESS", data={"posts": posts, "nextCursor": posts[-1]["postId"]})
+
+    @app.get("/after", response_model=BaseResponse)
+    async def after():
+        posts = [{**post, "author": {**post["author"]}} for post in page]
+        for post in posts:
+            post["author"]["profileImage"] = await avatar_url(post["author"].get("profileImage"))
+            post["thumbnail"] = await image_url(post.pop("imageUrl"), "thumb")
+        return trusted_response("POST_RETRIEVAL_SUCCESS", {"posts": posts, "nextCursor": posts[-1]["postId"]})
+
+    return app
+
+
+def percentile(latencies: list, ratio: float) -> float:
+    return latencies[max(int(len(latencies) * ratio) - 1, 0)] * 1000
+
+
+async def run_case(client: httpx.AsyncClient, path: str, requests: int) -> tuple[list, bytes]:
+    for _ in range(min(requests // 10, 100)):  # 워밍업 (매니페스트/주소 캐시 채우기)
+        body = (await client.get(path)).content
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return sorted(latencies), body
+
+
+async def main(args):
+    page = make_page(args.posts, args.authors)
+    app = build_app(page)
+    # BASE_URL/CDN_BASE_URL 을 바꾸지 않은 기본 설정에서 두 방식의 결과가 같아야 합니다.
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for label in ("before", "after"):
+            latencies, body = await run_case(client, f"/{label}", args.requests)
+            results[label] = (latencies, body)
+            mean = sum(latencies) / len(latencies) * 1000
+            print(
+                f"[{label:6}] {args.posts} posts  mean={mean:.3f}ms  p50={percentile(latencies, 0.5):.3f}ms"
+                f"  p99={percentile(latencies, 0.99):.3f}ms  body={len(body)} bytes"
+            )
+
+    before_mean = sum(results["before"][0]) / args.requests
+    after_mean = sum(results["after"][0]) / args.requests
+    print(f"orjson={'사용' if orjson is not None else '없음(표준 json)'}  speedup x{before_mean / after_mean:.2f}")
+
+    if json.loads(results["before"][1]) != json.loads(results["after"][1]):
+        print("[FAIL] 두 방식의 응답 본문이 다릅니다.")
+        sys.exit(1)
+    print("[OK] 두 방식의 응답 본문이 같습니다.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="게시글 목록 응답 직렬화 비용 비교")
+    parser.add_argument("--posts", type=int, default=100, help="한 페이지의 게시글 수")
+    parser.add_argument("--authors", type=int, default=20, help="페이지에 나오는 서로 다른 작성자 수")
+    parser.add_argument("--requests", type=int, default=2000, help="방식마다 보내는 요청 수")
+    asyncio.run(main(parser.parse_args()))
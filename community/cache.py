@@ -0,0 +1,301 @@
+# cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import config
+from database import ON_COMMIT_KEY, connect
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    크기 제한(LRU) + 만료 시간(TTL)이 있는 프로세스 내 캐시
+
+    - maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 버리므로 메모리가 무한히 늘지 않습니다.
+    - 값이 None인 경우도 캐시할 수 있도록 get()은 없을 때 default를 반환합니다.
+    - 무효화(pop, invalidate_where, update_where, clear)가 일어날 때마다 epoch가 올라갑니다.
+      DB 조회 전에 epoch를 읽어 두었다가 set(..., epoch=...)으로 넘기면,
+      조회하는 사이에 무효화가 있었을 때 오래된 값이 다시 캐시되지 않습니다.
+    - stale_ttl > 0 이면 만료된 항목을 그 시간만큼 더 보관해 get_stale()로 꺼낼 수 있습니다.
+      (stale-while-revalidate: get_or_load 참고)
+    - pause_fill() ~ resume_fill() 사이에는 set()을 무시합니다. 캐시 밖에서 DB 값을 바꾸고 캐시를 직접 고치는 동안
+      (조회수/좋아요 수 버퍼 반영), 바뀌기 전인지 후인지 알 수 없는 값이 캐시되지 않게 합니다.
+    """
+    registry: dict[str, "TTLCache"] = {}
+
+    def __init__(self, name: str, maxsize: int, ttl: float, stale_ttl: float = 0.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.refreshing: dict = {}  # 백그라운드 갱신 중인 key -> asyncio.Task
+        self.loading: dict = {}     # DB에서 읽는 중인 key -> asyncio.Future (single-flight)
+        self.coalesced = 0          # 다른 요청의 조회 결과를 함께 받은 횟수
+        self.fill_paused = 0        # pause_fill() 중첩 횟수 (0보다 크면 set() 무시)
+        self.refresh_failures = 0   # 백그라운드 갱신이 실패한 횟수 (만료된 값을 계속 사용)
+        self._data: OrderedDict = OrderedDict()  # key -> (만료 시각, 값)
+        TTLCache.registry[name] = self
+
+    def get(self, key, default=None):
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)  # 최근 사용 표시
+        self.hits += 1
+        return value
+
+    def get_stale(self, key, default=None):
+        """만료됐지만 stale_ttl 안에 있는 값을 반환합니다. (get()이 놓친 경우에만 호출)"""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING or item[0] + self.stale_ttl <= time.monotonic():
+            return default
+        self.stale_hits += 1
+        return item[1]
+
+    def set(self, key, value, ttl: float | None = None, epoch: int | None = None):
+        if self.maxsize <= 0 or self.fill_paused or (epoch is not None and epoch != self.epoch):
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key):
+        self.epoch += 1
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """predicate(key, value)가 True인 항목을 모두 지웁니다. (전체를 훑으므로 드문 작업에만 사용)"""
+        self.epoch += 1
+        for key in [key for key, (_, value) in self._data.items() if predicate(key, value)]:
+            del self._data[key]
+
+    def update(self, key, update):
+        """key가 캐시에 있으면 값을 update(value)의 반환값으로 바꿉니다. (만료 시각은 유지)"""
+        self.epoch += 1
+        item = self._data.get(key, _MISSING)
+        if item is not _MISSING:
+            self._data[key] = (item[0], update(item[1]))
+
+    def update_where(self, predicate, update):
+        """predicate(key, value)가 True인 항목의 값을 update(value)의 반환값으로 바꿉니다. (만료 시각은 유지)"""
+        self.epoch += 1
+        for key, (expires_at, value) in list(self._data.items()):
+            if predicate(key, value):
+                self._data[key] = (expires_at, update(value))
+
+    def pause_fill(self):
+        self.fill_paused += 1
+        self.epoch += 1
+
+    def resume_fill(self):
+        """멈춘 사이에 시작해 아직 끝나지 않은 조회도 캐시되지 않도록 epoch 를 올립니다."""
+        self.fill_paused -= 1
+        self.epoch += 1
+
+    def clear(self):
+        self.epoch += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "staleHits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "refreshFailures": self.refresh_failures,
+            "evictions": self.evictions,
+        }
+
+    @classmethod
+    def all_stats(cls) -> dict:
+        return {name: cache.stats() for name, cache in cls.registry.items()}
+
+
+async def get_or_load(cache: TTLCache, key, conn, loader, negative_ttl: float | None = None):
+    """
+    캐시에 있으면 그대로, 없으면 loader(conn)으로 DB에서 읽어 캐시한 뒤 반환합니다.
+    - 같은 key를 동시에 놓친 요청들은 쿼리 하나의 결과를 함께 받습니다. (single-flight)
+    - loader가 None을 반환하면 (없는/삭제된 데이터) negative_ttl 동안만 캐시합니다.
+    - cache.stale_ttl > 0 이면 만료 직후의 값은 바로 반환하고, 새 값은 백그라운드에서 한 번만 읽어 옵니다.
+    - 이 트랜잭션에서 이미 데이터를 바꿨다면(on_commit 등록됨) 커밋 전 값이 캐시되지 않도록 캐시를 거치지 않습니다.
+    반환값은 캐시에 들어 있는 객체 그대로이므로 수정하려면 복사해서 사용하세요.
+    """
+    if conn is not None and conn.info.get(ON_COMMIT_KEY):
+        return await loader(conn)
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    if cache.stale_ttl > 0:
+        value = cache.get_stale(key, _MISSING)
+        if value is not _MISSING:
+            _refresh_in_background(cache, key, loader)
+            return value
+
+    loading = cache.loading.get(key)
+    if loading is not None:
+        try:
+            value = await asyncio.shield(loading)
+            cache.coalesced += 1
+            return value
+        except asyncio.CancelledError:
+            if not loading.cancelled():
+                raise  # 이 요청 자체가 취소된 경우
+            # 먼저 조회하던 요청이 실패하면 각자 다시 조회합니다.
+
+    epoch = cache.epoch
+    loading = asyncio.get_running_loop().create_future()
+    cache.loading[key] = loading
+    try:
+        value = await loader(conn)
+    except BaseException:
+        loading.cancel()
+        raise
+    finally:
+        if cache.loading.get(key) is loading:
+            del cache.loading[key]
+
+    loading.set_result(value)
+    cache.set(key, value, ttl=negative_ttl if value is None else None, epoch=epoch)
+    return value
+
+
+def _refresh_in_background(cache: TTLCache, key, loader):
+    if key in cache.refreshing:
+        return
+
+    async def refresh():
+        try:
+            epoch = cache.epoch
+            # 요청의 커넥션은 응답과 함께 반납되므로 별도 커넥션으로 읽습니다.
+            async with connect() as conn:
+                value = await loader(conn)
+            cache.set(key, value, epoch=epoch)
+        except Exception:
+            cache.refresh_failures += 1
+            logger.exception("[%s] 캐시 갱신 실패 (key=%r)", cache.name, key)
+        finally:
+            cache.refreshing.pop(key, None)
+
+    cache.refreshing[key] = asyncio.create_task(refresh())
+
+
+# 인증 요청마다 실행되는 세션 -> 사용자 조회 결과 (utils.get_current_user)
+session_cache = TTLCache("session", maxsize=config.SESSION_CACHE_SIZE, ttl=config.SESSION_CACHE_TTL)
+
+# token 모드 세션 검증용 userId -> 사용자 정보 (sessionsValidAfter 포함)
+user_cache = TTLCache("user", maxsize=config.USER_CACHE_SIZE, ttl=config.USER_CACHE_TTL)
+
+# 게시글 목록 페이지 (lastPostId, size) -> PostModel.get_all_posts 결과
+feed_cache = TTLCache(
+    "feed", maxsize=config.FEED_CACHE_SIZE, ttl=config.FEED_CACHE_TTL, stale_ttl=config.FEED_CACHE_STALE_TTL
+)
+
+# 게시글 상세 post_id -> PostModel.get_post_by_id 결과 (없거나 삭제된 글은 None)
+post_cache = TTLCache("post", maxsize=config.POST_CACHE_SIZE, ttl=config.POST_CACHE_TTL)
+
+
+# ---------- 게시글 캐시 무효화 ----------
+# 게시글/좋아요/댓글/회원 정보가 바뀌면 모델에서 on_commit 으로 아래 함수를 등록합니다.
+# 관련된 페이지/게시글만 지우고, 숫자만 바뀌는 경우에는 지우지 않고 카운터를 고칩니다.
+
+def _page_has_post(post_id: int):
+    return lambda _, posts: any(post["postId"] == post_id for post in posts)
+
+
+def _add_counts(post: dict, deltas: dict) -> dict:
+    return {**post, **{field: post[field] + delta for field, delta in deltas.items()}}
+
+
+def invalidate_new_post(post_id: int):
+    """새 글은 항상 첫 페이지에만 나타나므로 커서가 없는 페이지만 지웁니다. (없는 글로 캐시된 id도 함께)"""
+    feed_cache.invalidate_where(lambda key, _: key[0] is None)
+    post_cache.pop(post_id)
+
+
+def invalidate_post(post_id: int):
+    """글이 수정/삭제되면 상세 캐시와 그 글이 들어 있는 페이지를 지웁니다. (삭제 시 뒤의 글이 당겨지는 것도 이 페이지뿐)"""
+    feed_cache.invalidate_where(_page_has_post(post_id))
+    post_cache.pop(post_id)
+
+
+def invalidate_all_posts():
+    """작성자 닉네임/프로필이 바뀌거나 탈퇴한 경우: 드문 작업이라 게시글 캐시를 모두 비웁니다."""
+    feed_cache.clear()
+    post_cache.clear()
+
+
+def patch_post_counts(post_id: int, **deltas: int):
+    """좋아요/댓글 수처럼 숫자만 바뀌는 경우 캐시를 지우지 않고 해당 글의 카운터만 고칩니다."""
+    feed_cache.update_where(
+        _page_has_post(post_id),
+        lambda posts: [_add_counts(post, deltas) if post["postId"] == post_id else post for post in posts]
+    )
+    post_cache.update(post_id, lambda post: post and _add_counts(post, deltas))
+
+
+@contextmanager
+def post_caches_paused():
+    """
+    카운터 버퍼가 DB에 반영하는 동안 게시글 캐시를 새로 채우지 않습니다. (counters.ViewCountBuffer / LikeCountBuffer)
+    이 사이에 읽은 행은 반영 전 값인지 후 값인지 알 수 없어, 나중에 patch_*_counts 로 더하면 두 번 더해질 수 있기 때문입니다.
+    그 전부터 캐시에 있던 항목은 반영 전 값이므로, 커밋 직후 patch_*_counts 로 고치면 됩니다.
+    """
+    feed_cache.pause_fill()
+    post_cache.pause_fill()
+    try:
+        yield
+    finally:
+        feed_cache.resume_fill()
+        post_cache.resume_fill()
+
+
+def patch_view_counts(counts: dict[int, int]):
+    """조회수 버퍼가 DB에 반영한 {post_id: 증가량} 을 캐시에도 더합니다. (counters.ViewCountBuffer)"""
+    _patch_many_counts("viewCount", counts)
+
+
+def patch_like_counts(counts: dict[int, int]):
+    """좋아요 수 버퍼가 DB에 반영한 {post_id: 증감량} 을 캐시에도 더합니다. (counters.LikeCountBuffer)"""
+    _patch_many_counts("likeCount", counts)
+
+
+def _patch_many_counts(field: str, counts: dict[int, int]):
+    feed_cache.update_where(
+        lambda _, posts: any(post["postId"] in counts for post in posts),
+        lambda posts: [
+            _add_counts(post, {field: counts[post["postId"]]}) if post["postId"] in counts else post
+            for post in posts
+        ]
+    )
+    for post_id, count in counts.items():
+        post_cache.update(post_id, lambda post: post and _add_counts(post, {field: count}))
@@ -0,0 +1,66 @@
+# commands/build_image_derivatives.py
+"""
+업로드 폴더의 원본 이미지로 파생 이미지(avatar/thumb/display + WebP)와 매니페스트를 만드는 명령
+
+서버는 업로드 직후 images.ImagePipeline 에서 파생 이미지를 만들지만,
+기능 도입 전에 올라온 이미지나 서버 종료/대기열 초과로 건너뛴 이미지는 매니페스트가 없습니다.
+매니페스트(x.json)가 없는 원본만 골라 프로세스 풀에서 만들고, --force 를 주면 모두 다시 만듭니다.
+(Pillow 필요: pip install ".[images]")
+
+실행 방법 (community 폴더에서):
+    python -m commands.build_image_derivatives --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from images import IMAGE_DIR, IMAGE_URL_PREFIX, Image, build_derivatives
+
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+
+def find_sources(force: bool) -> list[str]:
+    """원본 이미지 파일 이름 목록 (파생 이미지 x.avatar.jpg 처럼 이름에 점이 더 있는 파일은 제외)"""
+    sources = []
+    for filename in sorted(os.listdir(IMAGE_DIR)):
+        stem, extension = os.path.splitext(filename)
+        if extension.lower() not in SOURCE_EXTENSIONS or "." in stem:
+            continue
+        if force or not os.path.exists(os.path.join(IMAGE_DIR, f"{stem}.json")):
+            sources.append(filename)
+    return sources
+
+
+def main(args):
+    if Image is None:
+        print("Pillow 가 설치되어 있지 않습니다. (pip install \".[images]\")")
+        sys.exit(1)
+
+    sources = find_sources(args.force)
+    started = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(build_derivatives, os.path.join(IMAGE_DIR, filename), f"{IMAGE_URL_PREFIX}{filename}"): filename
+            for filename in sources
+        }
+        for future in as_completed(futures):
+            try:
+                manifest = future.result()
+                print(f"  [OK]   {futures[future]} ({len(manifest['variants'])}개 크기)")
+            except Exception as e:
+                failures += 1
+                print(f"  [FAIL] {futures[future]} - {e!r}")
+
+    print(f"파생 이미지 생성 완료: {len(sources) - failures}/{len(sources)}건 ({time.perf_counter() - started:.2f}s)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="업로드 이미지의 썸네일/WebP 파생 이미지 생성")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수")
+    parser.add_argument("--force", action="store_true", help="매니페스트가 있어도 다시 만듦")
+    main(parser.parse_args())
@@ -0,0 +1,170 @@
+# commands/check_query_plans.py
+"""
+models/ 의 모든 SQL에 EXPLAIN을 실행해 풀 테이블 스캔이 있는지 검사하는 명령
+
+models/*.py 에서 text("...") 로 작성된 쿼리를 모두 찾아 샘플 파라미터로 EXPLAIN을 돌립니다.
+MySQL 실행 계획의 type 이 ALL(풀 스캔)인 테이블이 하나라도 있으면 종료 코드 1로 실패합니다.
+IN 목록은 상수 SQL 에 expanding 파라미터(`IN :ids`)로 작성하면 그대로 검사됩니다.
+text() 에 상수가 아닌 SQL(f-string 등)을 넘기는 쿼리는 DYNAMIC_QUERIES 에 대표 SQL 을 등록해야 하며,
+등록되지 않았으면 [UNCHECKED] 로 표시하고 실패합니다. (검사하지 못한 쿼리가 통과로 보이지 않도록)
+(SQLite 백엔드에서는 EXPLAIN QUERY PLAN 의 'SCAN 테이블' 항목을 풀 스캔으로 판단합니다.)
+인덱스가 빠졌거나 쿼리가 인덱스를 타지 못하게 바뀐 것을 배포 전에 잡기 위한 용도입니다.
+
+옵티마이저는 테이블 크기에 따라 계획을 바꾸므로, 마이그레이션을 적용하고
+어느 정도 데이터가 들어 있는 DB(스테이징 등)에 대해 실행하는 것이 좋습니다.
+
+실행 방법 (community 폴더에서):
+    python -m commands.check_query_plans
+"""
+import ast
+import asyncio
+import os
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import bindparam, text
+
+from database import engine
+from models.post_model import COUNTER_COLUMNS, PostModel
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+# 문자열 컬럼과 비교하는 파라미터에 숫자를 넣으면 MySQL이 형 변환 때문에 인덱스를 쓰지 않으므로
+# 실제 타입과 같은 샘플 값을 넣어 줍니다. (여기에 없는 파라미터는 정수 1을 사용)
+SAMPLE_PARAMS = {
+    "session_id": "00000000-0000-0000-0000-000000000000",
+    "email": "explain@example.com",
+    "nickname": "explain",
+    "password": "explain",
+    "title": "explain",
+    "content": "explain",
+    "image_url": "/public/images/explain.png",
+    "profile_url": "/public/images/explain.png",
+    "paths": "/public/images/explain.png",
+    "expired_at": datetime(2000, 1, 1),
+}
+
+# expanding 파라미터(IN :ids)에 넣을 샘플 목록 (값은 위와 같은 규칙, 인덱스 범위 탐색이 되도록 2개)
+SAMPLE_LIST_SIZE = 2
+
+# SQL 을 실행 시점에 조립하는 쿼리 ("클래스.메서드" -> 대표 SQL 목록)
+DYNAMIC_QUERIES: dict[str, list[str]] = {
+    # 반영할 게시글 수만큼 CASE WHEN 이 늘어나는 카운터 일괄 UPDATE (컬럼마다 하나씩)
+    "PostModel.counter_update_query": [
+        PostModel.counter_update_query(column, SAMPLE_LIST_SIZE).text for column in COUNTER_COLUMNS
+    ],
+}
+
+# 의도적으로 풀 스캔을 허용하는 쿼리 ("클래스.메서드" 형식) 와 그 이유
+ALLOWED_FULL_SCANS: dict[str, str] = {}
+
+# 읽기 작업이 없는 단순 INSERT ... VALUES 는 검사 대상에서 제외합니다.
+INSERT_VALUES = re.compile(r"^\s*INSERT\s+(IGNORE\s+)?INTO\s+\w+\s*\([^)]*\)\s*VALUES", re.IGNORECASE)
+# 방언 전용 문법이라 다른 DB에서는 실행할 수 없는 쿼리 (모델에서 conn.dialect.name 으로 골라 씀)
+OTHER_DIALECT_ONLY = {
+    "sqlite": re.compile(r"^\s*INSERT\s+IGNORE\b", re.IGNORECASE),
+    "mysql": re.compile(r"^\s*INSERT\s+OR\s+IGNORE\b", re.IGNORECASE),
+}
+BIND_PARAM = re.compile(r"(?<!:):(\w+)")
+EXPANDING_PARAM = re.compile(r"\bIN\s+:(\w+)", re.IGNORECASE)
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+def collect_queries():
+    """
+    (위치, 클래스.메서드, SQL) 목록과, SQL 이 상수가 아니고 DYNAMIC_QUERIES 에도 없는 (위치, 클래스.메서드) 목록을 반환합니다.
+    """
+    queries = []
+    unchecked = []
+    for filename in sorted(os.listdir(MODELS_DIR)):
+        if not filename.endswith(".py"):
+            continue
+        path = os.path.join(MODELS_DIR, filename)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+
+        for cls in [node for node in tree.body if isinstance(node, ast.ClassDef)]:
+            for func in [node for node in cls.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]:
+                for node in ast.walk(func):
+                    if not (
+                        isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Name)
+                        and node.func.id == "text"
+                        and node.args
+                    ):
+                        continue
+                    location = f"models/{filename}:{node.lineno}"
+                    name = f"{cls.name}.{func.name}"
+                    if isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+                        queries.append((location, name, node.args[0].value))
+                    elif name in DYNAMIC_QUERIES:
+                        queries.extend((location, name, sql) for sql in DYNAMIC_QUERIES[name])
+                    else:
+                        unchecked.append((location, name))
+    return queries, unchecked
+
+
+def sample_params(sql: str) -> dict:
+    expanding = set(EXPANDING_PARAM.findall(sql))
+    params = {}
+    for name in BIND_PARAM.findall(sql):
+        value = SAMPLE_PARAMS.get(name, 1)
+        params[name] = [value] * SAMPLE_LIST_SIZE if name in expanding else value
+    return params
+
+
+def explain_query(prefix: str, sql: str):
+    query = text(f"{prefix} {sql}")
+    expanding = set(EXPANDING_PARAM.findall(sql))
+    if expanding:
+        query = query.bindparams(*[bindparam(name, expanding=True) for name in sorted(expanding)])
+    return query
+
+
+async def explain(conn, sql: str):
+    """EXPLAIN 결과에서 풀 스캔하는 테이블 이름 목록을 반환합니다."""
+    if conn.dialect.name == "sqlite":
+        # SQLite: 인덱스 없이 테이블 전체를 읽으면 detail이 'SCAN 테이블' 로만 표시됩니다.
+        result = await conn.execute(explain_query("EXPLAIN QUERY PLAN", sql), sample_params(sql))
+        return [match.group(1) for row in result if (match := SQLITE_FULL_SCAN.match(row.detail))]
+
+    result = await conn.execute(explain_query("EXPLAIN", sql), sample_params(sql))
+    return [row["table"] for row in result.mappings() if row["type"] == "ALL"]
+
+
+async def check() -> int:
+    failures = 0
+    queries, unchecked = collect_queries()
+    for location, name in unchecked:
+        failures += 1
+        print(f"  [UNCHECKED] {name} ({location}) - SQL 이 상수가 아니어서 검사하지 못함 (DYNAMIC_QUERIES 에 대표 SQL 등록 필요)")
+
+    async with engine.connect() as conn:
+        for location, name, sql in queries:
+            other_dialect = OTHER_DIALECT_ONLY.get(conn.dialect.name)
+            if INSERT_VALUES.match(sql) or (other_dialect and other_dialect.match(sql)):
+                continue
+            full_scans = await explain(conn, sql)
+            if not full_scans:
+                print(f"  [OK]   {name} ({location})")
+            elif name in ALLOWED_FULL_SCANS:
+                print(f"  [SKIP] {name} ({location}) - {ALLOWED_FULL_SCANS[name]}")
+            else:
+                failures += 1
+                print(f"  [FAIL] {name} ({location}) - 풀 스캔: {', '.join(full_scans)}")
+        await conn.rollback()
+    return failures
+
+
+async def main():
+    failures = await check()
+    await engine.dispose()
+    if failures:
+        print(f"풀 테이블 스캔 또는 검사하지 못한 쿼리 {failures}개 발견")
+        sys.exit(1)
+    print("모든 쿼리가 인덱스를 사용합니다.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
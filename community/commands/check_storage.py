@@ -0,0 +1,137 @@
+# commands/check_storage.py
+"""
+설정된 파일 저장소(STORAGE_BACKEND)에 실제로 올리고, 받고, 지워 보는 점검 명령
+
+- FileService.save_file 로 같은 파일을 두 번 올려 한 번만 저장되는지(내용 해시 이름) 확인
+- 저장된 주소에서 받은 내용이 올린 내용과 같은지 확인
+- presigned 업로드를 지원하면(s3) 발급받은 주소로 직접 올리고, 다른 내용을 올리면 거절되는지 확인 (거절되지 않으면 경고만)
+- 정리 작업(list_stale / remove)이 올린 파일을 찾아 지우는지 확인
+하나라도 실패하면 종료 코드 1로 끝납니다.
+
+로컬 가짜 S3 서버(moto_server, pip install ".[dev]")로 점검하는 예 (community 폴더에서):
+    moto_server -p 5000 &
+    STORAGE_BACKEND=s3 S3_BUCKET=community S3_ENDPOINT_URL=http://127.0.0.1:5000 \\
+    AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test \\
+    python -m commands.check_storage --create-bucket
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+import requests
+from starlette.datastructures import UploadFile
+
+from images import to_disk_path
+from storage import storage
+from utils import FileService, UploadPresignRequest
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def make_file(size: int) -> bytes:
+    """매직 바이트만 PNG 인 임의 내용 (실행할 때마다 다른 해시)"""
+    return PNG_SIGNATURE + os.urandom(max(size - len(PNG_SIGNATURE), 0))
+
+
+def download(url: str) -> bytes:
+    if url.startswith("http"):
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        return response.content
+    with open(to_disk_path(url), "rb") as f:
+        return f.read()
+
+
+async def check_save_file(args, errors: list[str]) -> list[str]:
+    content = make_file(args.size)
+    started = time.perf_counter()
+    first = await FileService.save_file(UploadFile(io.BytesIO(content), filename="check.png"))
+    elapsed = time.perf_counter() - started
+    stored = FileService.stored
+    second = await FileService.save_file(UploadFile(io.BytesIO(content), filename="again.png"))
+    print(f"  save_file  {first} ({len(content)} bytes, {elapsed:.2f}s)")
+
+    if first != second or FileService.stored != stored:
+        errors.append("같은 내용을 두 번 올렸는데 다른 파일로 저장되었습니다.")
+    if download(first) != content:
+        errors.append("save_file 로 올린 파일의 내용이 다릅니다.")
+    return [first]
+
+
+async def check_presigned_upload(args, errors: list[str]) -> list[str]:
+    if not storage.supports_presigned_upload:
+        print(f"  presign    ({storage.name} 저장소는 지원하지 않아 건너뜀)")
+        return []
+
+    content = make_file(args.size)
+    request = UploadPresignRequest(
+        sha256=hashlib.sha256(content).hexdigest(), contentType="image/png", size=len(content)
+    )
+    presigned = await FileService.create_presigned_upload(request)
+    upload = presigned["upload"]
+    print(f"  presign    {presigned['imagePath']}")
+
+    tampered = requests.put(upload["url"], data=make_file(args.size), headers=upload["headers"], timeout=30)
+    if tampered.ok:
+        # 서명에 크기/형식/체크섬 헤더가 들어 있어 S3 는 거절하지만, 가짜 서버(moto 등)는 검사하지 않기도 합니다.
+        print("  [WARN] 체크섬이 다른 내용의 presigned 업로드가 거절되지 않았습니다. (서버가 서명/체크섬을 검사하지 않음)")
+
+    response = requests.put(upload["url"], data=content, headers=upload["headers"], timeout=30)
+    if not response.ok:
+        errors.append(f"presigned 업로드 실패: {response.status_code} {response.text[:200]}")
+    elif download(presigned["imagePath"]) != content:
+        errors.append("presigned 업로드로 올린 파일의 내용이 다릅니다.")
+    elif (await FileService.create_presigned_upload(request))["upload"] is not None:
+        errors.append("이미 올라간 내용인데 업로드 주소를 다시 발급했습니다.")
+    return [presigned["imagePath"]]
+
+
+async def main(args):
+    print(f"저장소: {storage.stats()}")
+    if args.create_bucket and storage.name == "s3":
+        region = storage.client.meta.region_name
+        await asyncio.to_thread(
+            storage.client.create_bucket, Bucket=storage.bucket,
+            **({} if region == "us-east-1" else {"CreateBucketConfiguration": {"LocationConstraint": region}})
+        )
+        # 클라이언트가 주소로 바로 받을 수 있도록 업로드 폴더만 공개 읽기를 허용합니다. (운영에서는 CDN 설정으로 대신)
+        policy = {
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow", "Principal": "*", "Action": "s3:GetObject",
+                "Resource": f"arn:aws:s3:::{storage.bucket}/{storage.prefix}*",
+            }],
+        }
+        await asyncio.to_thread(storage.client.put_bucket_policy, Bucket=storage.bucket, Policy=json.dumps(policy))
+
+    errors = []
+    urls = await check_save_file(args, errors)
+    urls += await check_presigned_upload(args, errors)
+
+    # 방금 올린 파일도 대상이 되도록 기준 시각을 미래로 잡습니다.
+    older_than = time.time() + 60
+    stale = set(await storage.list_stale(older_than))
+    for url in urls:
+        if url not in stale:
+            errors.append(f"정리 대상 목록에 없습니다: {url}")
+        elif not await storage.remove(url, older_than):
+            errors.append(f"지우지 못했습니다: {url}")
+    print(f"  cleanup    {len(urls)}개 삭제")
+
+    for error in errors:
+        print(f"[FAIL] {error}")
+    if errors:
+        sys.exit(1)
+    print("[OK] 저장소 업로드/다운로드/정리가 정상입니다.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="파일 저장소 업로드/presigned 업로드/정리 점검")
+    parser.add_argument("--size", type=int, default=256 * 1024, help="올려 볼 파일 크기(바이트, UPLOAD_MAX_BYTES 이하)")
+    parser.add_argument("--create-bucket", action="store_true", help="버킷을 먼저 만듦 (가짜 S3 서버용)")
+    asyncio.run(main(parser.parse_args()))
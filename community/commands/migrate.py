@@ -0,0 +1,93 @@
+# commands/migrate.py
+"""
+스키마 마이그레이션 실행 명령
+
+migrations/ 폴더의 NNNN_설명.py 파일을 버전 순서대로 실행하고,
+적용한 버전은 schema_migrations 테이블에 기록해 두 번 실행되지 않게 합니다.
+각 마이그레이션 파일은 동기 커넥션을 받는 upgrade(conn) 함수를 가집니다.
+
+실행 방법 (community 폴더에서):
+    python -m commands.migrate                  # 남은 마이그레이션 모두 적용
+    python -m commands.migrate --list           # 적용 현황 확인
+    python -m commands.migrate --baseline 0001  # 이미 테이블이 있는 DB: 0001까지 적용된 것으로 표시만 함
+"""
+import argparse
+import asyncio
+import importlib
+import os
+
+from sqlalchemy import text
+
+from database import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def load_migrations():
+    """(버전, 파일 이름, 모듈) 목록을 버전 순으로 반환합니다."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        name, extension = os.path.splitext(filename)
+        if extension != ".py" or not name[:4].isdigit():
+            continue
+        module = importlib.import_module(f"migrations.{name}")
+        migrations.append((name[:4], name, module))
+    return migrations
+
+
+async def get_applied_versions(conn) -> set:
+    await conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(16) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    result = (await conn.execute(text("SELECT version FROM schema_migrations"))).fetchall()
+    return {row[0] for row in result}
+
+
+async def mark_applied(conn, version: str, name: str):
+    await conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+        {"version": version, "name": name}
+    )
+
+
+async def migrate(baseline: str | None = None, list_only: bool = False, db_engine=None):
+    """db_engine을 넘기면 기본 engine 대신 해당 DB에 적용합니다. (벤치마크용 SQLite 파일 등)"""
+    db_engine = db_engine or engine
+    migrations = load_migrations()
+
+    async with db_engine.begin() as conn:
+        applied = await get_applied_versions(conn)
+
+    for version, name, module in migrations:
+        if version in applied:
+            if list_only:
+                print(f"  [적용됨] {name}")
+            continue
+        if list_only:
+            print(f"  [대기중] {name}")
+            continue
+
+        # MySQL의 DDL은 자동 커밋되므로, 버전마다 트랜잭션을 따로 열어 기록합니다.
+        async with db_engine.begin() as conn:
+            if baseline and version <= baseline:
+                print(f"  [baseline] {name}")
+            else:
+                print(f"  [적용] {name} - {(module.__doc__ or '').strip()}")
+                await conn.run_sync(module.upgrade)
+            await mark_applied(conn, version, name)
+
+
+async def main(args):
+    await migrate(baseline=args.baseline, list_only=args.list)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DB 스키마 마이그레이션")
+    parser.add_argument("--list", action="store_true", help="적용 현황만 출력")
+    parser.add_argument("--baseline", help="이 버전까지는 실행하지 않고 적용된 것으로 기록")
+    asyncio.run(main(parser.parse_args()))
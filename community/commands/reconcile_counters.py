@@ -0,0 +1,49 @@
+# commands/reconcile_counters.py
+"""
+posts.like_count / posts.comment_count 카운터 재계산 명령
+
+좋아요/댓글 작성·삭제 시 같은 트랜잭션에서 카운터를 갱신하지만,
+수동으로 데이터를 고치거나 장애가 나면 값이 어긋날 수 있습니다.
+게시글 id 범위를 나눠 배치 단위로 실제 개수와 비교하고, 어긋난 행만 수정합니다.
+(서버가 좋아요 수 버퍼를 쓰는 중이면 아직 반영되지 않은 증감량이 이중으로 셀 수 있지만,
+ 반영된 글은 서버의 like_count_reconciler 가 다음 주기에 다시 맞춥니다.)
+
+실행 방법 (community 폴더에서):
+    python -m commands.reconcile_counters --batch-size 1000
+"""
+import argparse
+import asyncio
+import time
+
+from database import engine
+from models.post_model import PostModel
+
+
+async def reconcile(batch_size: int) -> int:
+    """전체 게시글을 batch_size 단위로 재계산하고, 수정된 행의 총 개수를 반환합니다."""
+    async with engine.connect() as conn:
+        max_id = await PostModel.get_max_post_id(conn)
+
+    fixed = 0
+    for start_id in range(1, max_id + 1, batch_size):
+        end_id = start_id + batch_size - 1
+        # 배치마다 트랜잭션을 짧게 끊어서 잠금이 오래 유지되지 않도록 합니다.
+        async with engine.begin() as conn:
+            count = await PostModel.reconcile_counters(conn, start_id, end_id)
+        if count:
+            print(f"  posts {start_id}~{end_id}: {count}건 수정")
+        fixed += count
+    return fixed
+
+
+async def main(args):
+    started = time.perf_counter()
+    fixed = await reconcile(args.batch_size)
+    print(f"카운터 재계산 완료: {fixed}건 수정 ({time.perf_counter() - started:.2f}s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="게시글 좋아요/댓글 카운터 재계산")
+    parser.add_argument("--batch-size", type=int, default=1000, help="한 번에 처리할 게시글 id 범위")
+    asyncio.run(main(parser.parse_args()))
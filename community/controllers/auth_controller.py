@@ -1,26 +1,33 @@
 # controllers/auth_controller.py
 from fastapi import HTTPException, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
 from models.user_model import UserModel
 from utils import BaseResponse, UserSignupRequest, UserLoginRequest, UserInfo
-from security import SecurityUtils
-
-BASE_URL = "http://127.0.0.1:8000"
+from security import SecurityUtils, SessionTokenUtils
+from serializers import profile_image_url
+import config
 
 
 class AuthController:
 
     @staticmethod
-    def signup(request: UserSignupRequest, response: Response):
+    async def signup(db: AsyncConnection, request: UserSignupRequest, response: Response):
                 
         # 1. 중복 검사 (이메일, 닉네임)
-        if UserModel.find_by_email(request.email):
+        if await UserModel.find_by_email(db, request.email):
             raise HTTPException(status_code=409, detail="EMAIL_ALREADY_EXISTS")
-        if UserModel.find_by_nickname(request.nickname):
+        if await UserModel.find_by_nickname(db, request.nickname):
             raise HTTPException(status_code=409, detail="NICKNAME_ALREADY_EXISTS")
 
         # 2. 저장 및 반환 (설계서 규격인 userId로 맞춤)
         user_data = request.model_dump()
-        userId = UserModel.save_user(user_data)
+        try:
+            userId = await UserModel.save_user(db, user_data)
+        except IntegrityError as e:
+            # 같은 이메일/닉네임으로 동시에 가입해 위의 검사를 함께 통과한 경우 (DB 유니크 인덱스가 막음)
+            detail = "EMAIL_ALREADY_EXISTS" if "email" in str(e.orig) else "NICKNAME_ALREADY_EXISTS"
+            raise HTTPException(status_code=409, detail=detail)
 
         response.status_code = 201  # 상태 코드 설정
         return BaseResponse(
@@ -29,12 +36,12 @@ class AuthController:
         )
     
     @staticmethod
-    def login(request: UserLoginRequest, response: Response):
+    async def login(db: AsyncConnection, request: UserLoginRequest, response: Response):
 
-        user = UserModel.find_by_email(request.email)
+        user = await UserModel.find_by_email(db, request.email)
 
         # 1. [401] 사용자 존재 여부 및 비밀번호 일치 여부 확인
-        if not user or not SecurityUtils.verify_password(request.password, user["password"]):
+        if not user or not await SecurityUtils.verify_password_async(request.password, user["password"]):
             raise HTTPException(status_code=401, detail="LOGIN_FAILED")
         
         # 2. [403] 정지된 계정 체크 (ACCOUNT_SUSPENDED)
@@ -46,18 +53,17 @@ class AuthController:
             detail_msg = f"ACCOUNT_TEMPORARILY_SUSPENDED (Started at: {user.get('suspensionStart')})"
             raise HTTPException(status_code=403, detail=detail_msg)
 
-        # 3. [409] 이미 로그인된 계정 체크 (ALREADY_LOGIN)
-        if UserModel.is_already_logged_in(request.email):
-            raise HTTPException(status_code=409, detail="ALREADY_LOGIN")
+        if config.SESSION_MODE == "token":
+            # 서명 토큰은 서버에 저장하지 않으므로 중복 로그인 체크 없이 바로 발급합니다.
+            session_id = SessionTokenUtils.create_token(user["userId"])
+        else:
+            # 3. [409] 이미 로그인된 계정 체크 (ALREADY_LOGIN)
+            if await UserModel.is_already_logged_in(db, request.email):
+                raise HTTPException(status_code=409, detail="ALREADY_LOGIN")
 
-        session_id = UserModel.create_session(user["userId"])
+            session_id = await UserModel.create_session(db, user["userId"])
         # 보안을 위해 토큰은 따로 빼고 정보만 반환
-        db_path = user.get("profileImage")
-
-        if db_path:
-            full_url = f"{BASE_URL}{db_path}"
-        else:
-            full_url = f"{BASE_URL}/public/images/default-profile.png"
+        full_url = profile_image_url(user.get("profileImage"))
 
         user_info = {
             "userId": user["userId"],
@@ -71,12 +77,16 @@ class AuthController:
         return session_id, BaseResponse(message="LOGIN_SUCCESS", data=user_info)
     
     @staticmethod
-    def logout(session_id: str, response: Response):
+    async def logout(db: AsyncConnection, session_id: str, current_user: UserInfo, response: Response):
         """
         로그아웃 비즈니스 로직
         """
-        # 1. 서버 메모리에서 세션 삭제
-        UserModel.delete_session(session_id)
+        # 1. 서버에서 세션 무효화
+        if config.SESSION_MODE == "token":
+            # 토큰 하나만 골라 지울 수 없으므로 이 유저에게 발급된 토큰을 모두 무효화합니다.
+            await UserModel.revoke_sessions(db, current_user.userId)
+        else:
+            await UserModel.delete_session(db, session_id)
         
         # 2. 브라우저 쿠키 삭제 (만료 시간을 0으로 설정하여 즉시 파기)
         response.delete_cookie(key="session_id")
@@ -84,12 +94,12 @@ class AuthController:
         return BaseResponse(message="LOGOUT_SUCCESS", data=None)
 
     @staticmethod
-    def check_duplicate(type: str, value: str):
+    async def check_duplicate(db: AsyncConnection, type: str, value: str):
         is_duplicate = False
         if type == "email":
-            is_duplicate = UserModel.find_by_email(value) is not None
+            is_duplicate = await UserModel.find_by_email(db, value) is not None
         elif type == "nickname":
-            is_duplicate = UserModel.find_by_nickname(value) is not None
+            is_duplicate = await UserModel.find_by_nickname(db, value) is not None
         
         # 프론트엔드에서 사용하기 편하게 JSON 형태로 반환
         return {
@@ -1,56 +1,43 @@
 # controllers/comment_controller.py
 from datetime import datetime
 from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncConnection
 from models.comment_model import CommentModel
-from models.user_model import UserModel
 from models.post_model import PostModel # 게시글 존재 확인용
+from serializers import avatar_url, trusted_response
 from utils import BaseResponse, CommentCreateRequest, UserInfo, CommentUpdateRequest, AuthorDetail, CommentDetailResponse
 
-BASE_URL = "http://127.0.0.1:8000"
-
 class CommentController:
     
     @staticmethod
-    def get_comments(post_id: int):
+    async def get_comments(db: AsyncConnection, post_id: int, last_comment_id: int, size: int):
         """특정 게시글의 댓글 목록 조회"""
         
         # 1. 게시글이 있는지 먼저 검사
-        post = PostModel.get_post_by_id(post_id)
+        post = await PostModel.get_post_by_id_cached(db, post_id)
         if not post:
             raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
             
-        # 2. 댓글 목록 가져오기
-        comments = CommentModel.get_comments_by_post_id(post_id)
+        # 2. 댓글 목록 가져오기 (게시글 목록처럼 마지막으로 받은 댓글 ID 이후부터 size 개)
+        comments = await CommentModel.get_comments_by_post_id(db, post_id, last_comment_id=last_comment_id, size=size)
+        # 빈 페이지가 끝까지 읽어서인지, 없는 댓글이나 다른 게시글의 댓글을 커서로 보내서인지 구분합니다.
+        if not comments and last_comment_id is not None:
+            if not await CommentModel.is_comment_of_post(db, post_id, last_comment_id):
+                raise HTTPException(status_code=400, detail="INVALID_CURSOR")
         
         response_list = []
 
         for comment in comments:
-            # 댓글에 적힌 작성자 닉네임으로 유저 정보를 찾습니다.
-            # (만약 DB에 userId로 저장했다면 find_by_id로 찾으면 됩니다)
-            author_user = UserModel.find_by_nickname(comment["author"])
-            
-            # 유저가 탈퇴해서 없을 수도 있으니 방어 로직
-            if author_user:
+            # 작성자 정보는 댓글 조회 쿼리에서 users 와 JOIN 해 함께 가져왔으므로 댓글마다 다시 조회하지 않습니다.
+            # [핵심] 작은 프로필용 파생 이미지 경로를 BASE_URL(또는 CDN)과 결합하여 전체 주소 생성
+            # 이미지가 없으면 기본 프로필 이미지를 연결합니다.
+            full_profile_url = await avatar_url(comment.get("profileImage"))
 
-                db_path = author_user.get("profile_url")
-                
-                # [핵심] BASE_URL과 결합하여 전체 주소 생성
-                # 이미지가 없으면 기본 프로필 이미지를 연결합니다.
-                full_profile_url = f"{BASE_URL}{db_path}" if db_path else f"{BASE_URL}/public/images/default-profile.png"
-
-                author_data = {
-                    "userId" : author_user["id"],
-                    "nickname":author_user["nickname"],
-                    # DB엔 profileImage지만, 요청하신 응답은 profileImageUrl이므로 이름 변경 매핑
-                    "profileImage":full_profile_url 
-                }
-            else:
-                # 탈퇴한 유저 처리 (더미 데이터)
-                author_data = {
-                    "userId":0,
-                    "nickname":"(알수없음)",
-                    "profileImage":f"{BASE_URL}/public/images/default-profile.png"
-                }
+            author_data = {
+                "userId": comment["userId"],
+                "nickname": comment["author"],
+                "profileImage": full_profile_url
+            }
 
             # 최종 데이터 조립
 
@@ -65,18 +52,24 @@ class CommentController:
                 "author":author_data # 객체 넣기
             }
             response_list.append(response_data)
+
+        # 요청한 size보다 적게 가져왔다면 더 이상 댓글이 없으므로 None
+        next_cursor = comments[-1]["commentId"] if len(comments) == size else None
         
-        return BaseResponse(
-            message="COMMENT_LIST_SUCCESS", 
-            data=response_list
+        return trusted_response(
+            "COMMENT_LIST_SUCCESS",
+            {
+                "comments": response_list,
+                "nextCursor": next_cursor
+            }
         )
 
     @staticmethod
-    def create_comment(post_id: int, request: CommentCreateRequest, user: UserInfo, response: Response):
+    async def create_comment(db: AsyncConnection, post_id: int, request: CommentCreateRequest, user: UserInfo, response: Response):
         """댓글 작성"""
         
         # 1. 부모 게시글이 진짜 있는지 확인 (무결성 검사)
-        post = PostModel.get_post_by_id(post_id)
+        post = await PostModel.get_post_by_id_cached(db, post_id)
         if not post:
             raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
             
@@ -91,18 +84,18 @@ class CommentController:
             "createdAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        comment_id = CommentModel.create_comment(new_comment)
+        comment_id = await CommentModel.create_comment(db, new_comment)
         post["commentCount"] += 1        
         
         response.status_code = 201
         return BaseResponse(message="COMMENT_CREATE_SUCCESS", data={"commentId": comment_id})
 
     @staticmethod
-    def update_comment(comment_id: int, request: CommentUpdateRequest, user: UserInfo, response: Response):
+    async def update_comment(db: AsyncConnection, comment_id: int, request: CommentUpdateRequest, user: UserInfo, response: Response):
         """댓글 수정"""
         
         # 1. [404] 댓글 존재 확인
-        comment = CommentModel.get_comment_by_id(comment_id)
+        comment = await CommentModel.get_comment_by_id(db, comment_id)
         if not comment:
             raise HTTPException(status_code=404, detail="NOT_FOUND")
             
@@ -114,7 +107,7 @@ class CommentController:
             print(f"권한 에러 - DB 주인 ID: {db_author_id}, 접속 유저 ID: {user.userId}")
             raise HTTPException(status_code=403, detail="FORBIDDEN")
         # 3. [Logic] 내용 수정
-        CommentModel.update_comment(comment_id, request.content)
+        await CommentModel.update_comment(db, comment_id, request.content)
         
         # 4. [200] 성공 응답 (204 Spec 대체)
         response.status_code = 200
@@ -124,11 +117,11 @@ class CommentController:
         )
 
     @staticmethod
-    def delete_comment(comment_id: int, user: UserInfo):
+    async def delete_comment(db: AsyncConnection, comment_id: int, user: UserInfo):
         """댓글 삭제 (본인만 가능)"""
         
         # 1. 댓글 존재 확인
-        comment = CommentModel.get_comment_by_id(comment_id)
+        comment = await CommentModel.get_comment_by_id(db, comment_id)
         if not comment:
             raise HTTPException(status_code=404, detail="COMMENT_NOT_FOUND")
             
@@ -137,12 +130,12 @@ class CommentController:
             raise HTTPException(status_code=403, detail="PERMISSION_DENIED")
             
         # 댓글이 달린 게시글의 commentCount 감소
-        target_post = PostModel.get_post_by_id(comment["postId"])
+        target_post = await PostModel.get_post_by_id_cached(db, comment["postId"])
         if target_post:
             target_post["commentCount"] -= 1
             current_count = target_post["commentCount"]
 
         # 3. 삭제
-        CommentModel.delete_comment(comment_id)
+        await CommentModel.delete_comment(db, comment_id)
         
         return BaseResponse(message="COMMENT_DELETE_SUCCESS", data={"commentCount": current_count})
\ No newline at end of file
@@ -1,68 +1,60 @@
 # controllers/like_controller.py
 from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncConnection
+from counters import like_counts
 from models.like_model import LikeModel
 from models.post_model import PostModel
 from utils import BaseResponse, UserInfo
 
-BASE_URL = "http://127.0.0.1:8000"
-
 
 class LikeController:
     
     @staticmethod
-    def add_like(post_id: int, user: UserInfo, response: Response):
+    async def add_like(db: AsyncConnection, post_id: int, user: UserInfo, response: Response):
         """좋아요 추가 (POST)"""
-        
-        # 1. 게시글 존재 확인
-        post = PostModel.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
 
-        # 2. 중복 좋아요 방지 (409 Conflict)
-        if LikeModel.has_liked(user.userId, post_id):
+        # 1. 데이터 업데이트 (게시글 존재 확인 + 중복 방지를 한 문장으로 원자적으로)
+        if not await LikeModel.add_like(db, user.userId, post_id):
+            # 추가되지 않았다면 글이 없는지(404), 이미 눌렀는지(409) 구분
+            if not await PostModel.get_post_by_id_cached(db, post_id):
+                raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
             raise HTTPException(status_code=409, detail="POST_ALREADY_LIKE")
 
-        # 3. 데이터 업데이트
-        LikeModel.add_like(user.userId, post_id)
-        post["likeCount"] = post.get("likeCount", 0) + 1 # 동기화
+        # 2. 좋아요 수 증가 (메모리 버퍼에 모았다가 주기적으로 반영, 응답에는 반영 전 증가량까지 포함)
+        like_count = await like_counts.record(db, post_id, 1)
 
-        # 4. 응답 (201 Created)
+        # 3. 응답 (201 Created)
         response.status_code = 201
         return BaseResponse(
             message="REGISTER_SUCCESS",
             data={
                 "isLiked": True,
-                "likeCount": post["likeCount"]
+                "likeCount": like_count
             }
         )
 
     @staticmethod
-    def remove_like(post_id: int, user: UserInfo, response: Response):
+    async def remove_like(db: AsyncConnection, post_id: int, user: UserInfo, response: Response):
         """좋아요 취소 (DELETE)"""
-        
-        # 1. 게시글 존재 확인
-        post = PostModel.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
 
-        # 2. [409] 좋아요를 누른 적이 없는 경우 (POST_ALREADY_DELETE_LIKE)
-        if not LikeModel.has_liked(user.userId, post_id):
+        # 1. 데이터 업데이트
+        removed = await LikeModel.remove_like(db, user.userId, post_id)
+        if not removed:
+            # 지워지지 않았다면 글이 없는지(404), 좋아요를 누른 적이 없는지(409) 구분
+            if not await PostModel.get_post_by_id_cached(db, post_id):
+                raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
             raise HTTPException(status_code=409, detail="POST_ALREADY_DELETE_LIKE")
-        
-        # 3. 데이터 업데이트
-        LikeModel.remove_like(user.userId, post_id)
-        post["likeCount"] -= 1 # 동기화
 
-        if post["likeCount"] < 0:
-            raise HTTPException(status_code=500, detail="DATA_INTEGRITY_ERROR")
+        # 2. 좋아요 수 감소 (실제로 지워진 행 수만큼)
+        like_count = await like_counts.record(db, post_id, -removed)
 
-        # 4. 응답 (200 OK - No Content 메시지)
+        # 3. 응답 (200 OK - No Content 메시지)
         response.status_code = 200
         return BaseResponse(
             message="POST_LIKE_DELETE", # 좋아요가 사라졌음을 의미
             data={
                 "isLiked": False,
-                "likeCount": post["likeCount"]
+                "likeCount": like_count
             }
         )
 
@@ -1,53 +1,65 @@
 # controllers/post_controller.py
 from datetime import datetime
 from fastapi import HTTPException, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncConnection
 from models.post_model import PostModel
 from models.user_model import UserModel
 from models.comment_model import CommentModel
 from models.like_model import LikeModel
-from utils import BaseResponse, PostCreateRequest, PostDetail, UserInfo, PostUpdateRequest, CommentSimple, AuthorDetail, FileService
-
-BASE_URL = "http://127.0.0.1:8000"
+from counters import like_counts, view_counts
+from cache import feed_cache, get_or_load
+from images import image_pipeline
+from serializers import asset_url, avatar_url, image_url, trusted_response
+from utils import BaseResponse, PostCreateRequest, PostDetail, UserInfo, PostUpdateRequest, CommentSimple, AuthorDetail, FileService, UploadPresignRequest
 
 class PostController:
     @staticmethod
-    def get_posts(last_post_id: int, size: int, response: Response):
-        """전체 게시글 목록을 가져오는 흐름 제어"""
+    async def get_posts(db: AsyncConnection, last_post_id: int, size: int, response: Response, user: UserInfo = None):
+        """전체 게시글 목록을 가져오는 흐름 제어 (로그인 상태면 글마다 isLiked 포함)"""
         
         # [방어 코드] 0이나 음수가 들어오면 처음부터 보여주도록 None 처리
         actual_last_id = None if (last_post_id is None or last_post_id <= 0) else last_post_id
         
-        # 1. 모델에서 데이터 가져오기
-        posts = PostModel.get_all_posts(last_post_id=actual_last_id, size=size)
+        # 1. 모델에서 데이터 가져오기 (같은 페이지 요청이 몰리므로 캐시를 거칩니다)
+        cached_posts = await get_or_load(
+            feed_cache, (actual_last_id, size), db,
+            lambda conn: PostModel.get_all_posts(conn, last_post_id=actual_last_id, size=size)
+        )
+        # 아래에서 URL/조회수를 덮어쓰므로 캐시 원본이 바뀌지 않게 복사해서 사용합니다.
+        posts = [{**post, "author": {**post["author"]}} for post in cached_posts]
 
         if not posts:
             response.status_code = 200
-            return BaseResponse(message="NO_MORE_POSTS", data={"posts": [], "nextCursor": None})
+            return trusted_response("NO_MORE_POSTS", {"posts": [], "nextCursor": None})
+
+        # 좋아요 여부는 사용자마다 다르므로 캐시하지 않고, 페이지 전체를 쿼리 한 번으로 확인합니다.
+        liked_post_ids = (
+            await LikeModel.get_liked_post_ids(db, user.userId, [post["postId"] for post in posts]) if user else set()
+        )
 
         # [핵심 수정] DB의 상대경로를 전체 URL로 변환하여 공급
         for post in posts:
             author_info = post.get("author", {})
-            db_path = author_info.get("profileImage")
-            
-            if db_path and db_path.startswith("http"):
-                full_url = db_path
-            elif db_path:
-                full_url = f"{BASE_URL}{db_path}"
-            else:
-                full_url = f"{BASE_URL}/public/images/default-profile.png"
-            
+            # 목록의 프로필은 40px 로 보이므로 원본 대신 작은 파생 이미지를 씁니다. (아직 없으면 원본)
             # 덮어씌우지 않고, author 객체 내부의 값을 업데이트합니다.
-            post["author"]["profileImage"] = full_url
+            post["author"]["profileImage"] = await avatar_url(author_info.get("profileImage"))
+            post["viewCount"] += view_counts.pending(post["postId"])  # 아직 DB에 반영되지 않은 조회수
+            post["likeCount"] += like_counts.pending(post["postId"])  # 아직 DB에 반영되지 않은 좋아요 증감
+            post["isLiked"] = post["postId"] in liked_post_ids
+
+            # 본문 이미지는 목록에서 썸네일 크기로 보여줍니다.
+            image_path = post.pop("imageUrl")
+            post["thumbnail"] = await image_url(image_path, "thumb")
             
         # 3. [핵심] 다음 페이지의 기준점(nextCursor) 계산
         # 가져온 데이터의 마지막 항목 ID를 다음 요청 때 쓰라고 알려줍니다.
         # 만약 요청한 size보다 적게 가져왔다면 '더 이상 글이 없음'을 의미하므로 None을 줍니다.
         next_cursor = posts[-1]["postId"] if len(posts) == size else None
 
-        response.status_code = 200
-        return BaseResponse(
-            message="POST_RETRIEVAL_SUCCESS",
-            data={
+        # 이미 다 만든 dict 이므로 BaseResponse 검증 없이 바로 직렬화합니다.
+        return trusted_response(
+            "POST_RETRIEVAL_SUCCESS",
+            {
                 "posts": posts,
                 "nextCursor": next_cursor
             }
@@ -76,48 +88,43 @@ class PostController:
         return summaries
     
     @staticmethod
-    def get_post_detail(post_id: int, response: Response, user: UserInfo = None) -> BaseResponse:
+    async def get_post_detail(db: AsyncConnection, post_id: int, response: Response, user: UserInfo = None) -> BaseResponse:
         """게시글 상세 조회 및 조회수 증가 (댓글은 별도 API에서 처리)"""
-    
-        # 2. 조회수 증가 (비즈니스 로직)
-        PostModel.increase_view_count(post_id)
 
-        # 1. 게시글과 작성자 정보를 한 번에 가져옴 (Model에서 Join 처리됨)
-        post = PostModel.get_post_by_id(post_id)
+        # 1. 게시글, 작성자, 좋아요 여부를 쿼리 한 번에 가져옴 (인기 글은 캐시에서 꺼내고 좋아요 여부만 확인)
+        post = await PostModel.get_post_detail_cached(db, post_id, user.userId)
         
         if not post:
             # 특정 글을 찍어서 들어왔는데 없으면 에러(Raise)가 정답!
             raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
+
+        # 조회수 증가: 메모리 버퍼에 모았다가 주기적으로 반영하므로, 아직 반영 안 된 증가량을 더해서 보여줍니다.
+        post["viewCount"] += await view_counts.record(db, post_id, viewer=user.userId)
+        post["likeCount"] += like_counts.pending(post_id)  # 아직 DB에 반영되지 않은 좋아요 증감
         
         # 2. 본문 이미지 경로 조립 (프로필 방식과 동일)
         post_img_path = post.get("image_url") 
         if post_img_path:
-            # DB에 경로가 있으면 전체 URL로 변환
-            post["image"] = f"{BASE_URL}{post_img_path}"
+            # DB에 경로가 있으면 전체 URL로 변환 (화면 너비에 맞춘 display 크기, 크기별 원본/WebP 목록도 함께)
+            post["image"] = await image_url(post_img_path, "display")
+            manifest = await image_pipeline.get_manifest(post_img_path)
+            post["imageVariants"] = {
+                name: {**variant, "url": asset_url(variant["url"]), "webp": asset_url(variant["webp"])}
+                for name, variant in manifest["variants"].items()
+            } if manifest else None
         else:
             # 이미지가 없으면 null 혹은 빈 값 처리
             post["image"] = None
+            post["imageVariants"] = None
         
         author_info = post.get("author", {})
-        profile_path = author_info.get("profileImage")
-        post["isLiked"] = LikeModel.has_liked(user.userId, post_id)
-        
-        if profile_path and not profile_path.startswith("http"):
-            # 상대 경로인 경우 백엔드 주소(8000번)를 붙여줌
-            post["author"]["profileImage"] = f"{BASE_URL}{profile_path}"
-        elif not profile_path:
-            # 이미지가 없는 경우 백엔드의 기본 이미지 경로 전송
-            post["author"]["profileImage"] = f"{BASE_URL}/public/images/default-profile.png"
+        # 상대 경로면 BASE_URL(또는 CDN) 주소를 붙이고, 없으면 기본 프로필 이미지
+        post["author"]["profileImage"] = await avatar_url(author_info.get("profileImage"))
 
-        
-        response.status_code = 200
-        return BaseResponse(
-            message="POST_DETAIL_SUCCESS",
-            data=post
-        )
+        return trusted_response("POST_DETAIL_SUCCESS", post)
 
     @staticmethod
-    def create_post(request: PostCreateRequest, user: UserInfo, response: Response):
+    async def create_post(db: AsyncConnection, request: PostCreateRequest, user: UserInfo, response: Response):
         """새 게시글 작성"""
 
         new_post = {
@@ -132,7 +139,7 @@ class PostController:
         }
         
         # Model에게 저장을 부탁함
-        post_id = PostModel.create_post(new_post)
+        post_id = await PostModel.create_post(db, new_post)
 
         response.status_code = 201
         return BaseResponse(
@@ -141,11 +148,11 @@ class PostController:
         )
     
     @staticmethod
-    def update_post(post_id: int, request: PostUpdateRequest, user: UserInfo, response: Response):
+    async def update_post(db: AsyncConnection, post_id: int, request: PostUpdateRequest, user: UserInfo, response: Response):
         """게시글 수정: 작성자 본인만 가능"""
 
         # 1. 게시글 존재 확인
-        post = PostModel.get_post_by_id(post_id)
+        post = await PostModel.get_post_by_id(db, post_id)
         if not post:
             raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
         
@@ -184,7 +191,7 @@ class PostController:
             "content": request.content,
             "image_url": request.image
         }
-        PostModel.update_post(post_id, update_data)
+        await PostModel.update_post(db, post_id, update_data)
         
         # 4. 응답
         return BaseResponse(
@@ -193,11 +200,11 @@ class PostController:
         )
     
     @staticmethod
-    def delete_post(post_id: int, user: UserInfo, response: Response):
+    async def delete_post(db: AsyncConnection, post_id: int, user: UserInfo, response: Response):
         """게시글 삭제: 작성자 본인만 가능"""
         
         # 1. 게시글 존재 확인
-        post = PostModel.get_post_by_id(post_id)
+        post = await PostModel.get_post_by_id(db, post_id)
         if not post:
             raise HTTPException(status_code=404, detail="POST_NOT_FOUND")
         
@@ -223,9 +230,9 @@ class PostController:
             raise HTTPException(status_code=403, detail="PERMISSION_DENIED")
         
         # 3. 삭제 수행 (댓글, 좋아요도 함께 삭제)
-        CommentModel.delete_comments_by_post_id(post_id)
-        LikeModel.delete_likes_by_post_id(post_id)
-        PostModel.delete_post(post_id)
+        await CommentModel.delete_comments_by_post_id(db, post_id)
+        await LikeModel.delete_likes_by_post_id(db, post_id)
+        await PostModel.delete_post(db, post_id)
         
         # 4. 응답
         return BaseResponse(
@@ -244,5 +251,17 @@ class PostController:
                 message="IMAGE_UPLOAD_SUCCESS",
                 data={"imagePath": saved_path}
             )
+        except HTTPException:
+            raise  # 413(크기 초과), 415(이미지 아님)는 그대로 응답
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @staticmethod
+    async def presign_image_upload(presign_request: UploadPresignRequest):
+        # 이미지 바이트는 API 서버를 거치지 않고 클라이언트가 저장소에 직접 올립니다.
+        # 400(로컬 저장소), 413(크기 초과)은 그대로, 저장소 오류는 전역 500 처리기로 응답합니다.
+        presigned = await FileService.create_presigned_upload(presign_request)
+        return BaseResponse(
+            message="IMAGE_UPLOAD_PRESIGNED",
+            data=presigned
+        )
@@ -2,12 +2,14 @@
 import os
 import uuid
 from fastapi import HTTPException,UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
 from models.user_model import UserModel
 from utils import BaseResponse, UserInfo, UserUpdateRequest, PasswordChangeRequest
 from security import SecurityUtils
-from utils import FileService, BaseResponse
-
-BASE_URL = "http://127.0.0.1:8000"
+import config
+from utils import FileService, BaseResponse, UploadPresignRequest
+from serializers import profile_image_url
 
 
 class UserController:
@@ -21,11 +23,23 @@ class UserController:
                 message="FILE_UPLOAD_SUCCESS",
                 data={"profileImageUrl": file_url}
             )
+        except HTTPException:
+            raise  # 413(크기 초과), 415(이미지 아님)는 그대로 응답
         except Exception as e:
             # 시니어 팁: 로그는 상세히, 클라이언트 응답은 간결하게
             print(f"Upload error log: {e}")
             raise HTTPException(status_code=500, detail="IMAGE_UPLOAD_FAILED")
 
+    @staticmethod
+    async def presign_profile_upload(presign_request: UploadPresignRequest):
+        # 프로필 이미지도 저장소에 직접 올리도록 주소만 발급합니다.
+        # 400(로컬 저장소), 413(크기 초과)은 그대로, 저장소 오류는 전역 500 처리기로 응답합니다.
+        presigned = await FileService.create_presigned_upload(presign_request)
+        return BaseResponse(
+            message="FILE_UPLOAD_PRESIGNED",
+            data=presigned
+        )
+
     @staticmethod
     def check_permission(userId: int, current_user: UserInfo):
         """[보안] 요청한 userId와 로그인한 사람(current_user)이 같은지 확인"""
@@ -33,18 +47,18 @@ class UserController:
             raise HTTPException(status_code=403, detail="PERMISSION_DENIED")
 
     @staticmethod
-    def get_user_info(userId: int, current_user: UserInfo):
+    async def get_user_info(db: AsyncConnection, userId: int, current_user: UserInfo):
         """회원 정보 조회"""
         # 1. 권한 확인 (내 정보만 볼 수 있음)
         UserController.check_permission(userId, current_user)
         # 2. 유저 조회
-        user = UserModel.find_by_id(userId)
+        user = await UserModel.find_by_id(db, userId)
         if not user:
             raise HTTPException(status_code=404, detail="USER_NOT_FOUND")
 
         # 프로필 이미지 경로 조립
         db_path = user.get("profileImage")
-        full_url = f"{BASE_URL}{db_path}" if db_path else f"{BASE_URL}/public/images/default-profile.png"
+        full_url = profile_image_url(db_path)
         print(f"DB에서 가져온 경로: {user.get('profileImage')}")
 
         # 3. 반환 (비밀번호 제외)
@@ -60,13 +74,13 @@ class UserController:
         )
 
     @staticmethod
-    def update_user_info(userId: int, request: UserUpdateRequest, current_user: UserInfo):
+    async def update_user_info(db: AsyncConnection, userId: int, request: UserUpdateRequest, current_user: UserInfo):
         """회원 정보 수정 (닉네임, 프사)"""
         UserController.check_permission(userId, current_user)
         
         # 닉네임 중복 체크 (변경하려는 닉네임이 다를 경우에만)
         if request.nickname != current_user.nickname:
-            if UserModel.find_by_nickname(request.nickname):
+            if await UserModel.find_by_nickname(db, request.nickname):
                 raise HTTPException(status_code=409, detail="NICKNAME_ALREADY_EXISTS")
 
         update_data = {
@@ -74,28 +88,35 @@ class UserController:
         "profile_url": request.profileImage  # 프론트에서 보내는 필드명 확인 필요
         }
         
-        UserModel.update_user(userId, update_data)
+        try:
+            await UserModel.update_user(db, userId, update_data)
+        except IntegrityError:
+            # 다른 사용자가 같은 닉네임으로 동시에 바꾼 경우 (DB 유니크 인덱스가 막음)
+            raise HTTPException(status_code=409, detail="NICKNAME_ALREADY_EXISTS")
         
         return BaseResponse(message="USER_UPDATE_SUCCESS", data=None)
 
     @staticmethod
-    def change_password(userId: int, request: PasswordChangeRequest, current_user: UserInfo):
+    async def change_password(db: AsyncConnection, userId: int, request: PasswordChangeRequest, current_user: UserInfo):
         """비밀번호 변경"""
         UserController.check_permission(userId, current_user)
 
         # 2. 변경
-        UserModel.update_password(userId, request.newPassword)
+        await UserModel.update_password(db, userId, request.newPassword)
 
-        # 3. 모든 세션 삭제 (강제 로그아웃)
-        UserModel.delete_all_sessions_by_user(userId)
+        # 3. 모든 세션 삭제 (강제 로그아웃, token 모드는 발급된 토큰 무효화)
+        if config.SESSION_MODE == "token":
+            await UserModel.revoke_sessions(db, userId)
+        else:
+            await UserModel.delete_all_sessions_by_user(db, userId)
         
         return BaseResponse(message="PASSWORD_CHANGE_SUCCESS", data=None)
 
     @staticmethod
-    def delete_account(userId: int, current_user: UserInfo):
+    async def delete_account(db: AsyncConnection, userId: int, current_user: UserInfo):
         """회원 탈퇴"""
         UserController.check_permission(userId, current_user)
         
-        UserModel.delete_user(userId)
+        await UserModel.delete_user(db, userId)
         
         return BaseResponse(message="USER_DELETE_SUCCESS", data=None)
\ No newline at end of file
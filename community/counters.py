@@ -0,0 +1,206 @@
+# counters.py
+import config
+from cache import TTLCache, invalidate_post, patch_like_counts, patch_view_counts, post_caches_paused
+from database import connect, on_commit
+from models.like_model import LikeModel
+from models.post_model import PostModel
+
+
+class ViewCountBuffer:
+    """
+    게시글 조회수 쓰기 지연(write-behind) 버퍼
+
+    상세 조회마다 posts 행을 UPDATE 하면 인기 글 한 행에 잠금이 몰립니다.
+    대신 {post_id: 증가량} 을 메모리에 모았다가 tasks.view_count_flusher 가
+    VIEW_FLUSH_INTERVAL 마다(그리고 서버 종료 시) UPDATE ... CASE 로 한 번에 반영합니다.
+    아직 반영되지 않은 증가량은 pending()으로 조회 응답에 더해 줍니다.
+    프로세스가 비정상 종료되면 마지막 주기의 증가량은 사라질 수 있습니다.
+    """
+    def __init__(self, interval: float, batch_size: int, dedupe_window: float, dedupe_size: int):
+        self.enabled = interval > 0
+        self.batch_size = batch_size
+        self.deduped = 0
+        self._pending: dict[int, int] = {}
+        # 같은 사용자가 같은 글을 짧은 시간에 반복 조회한 기록 (프로세스 단위)
+        self._seen = TTLCache("view_dedupe", maxsize=dedupe_size, ttl=dedupe_window) if dedupe_window > 0 else None
+
+    async def record(self, conn, post_id: int, viewer=None) -> int:
+        """
+        조회 1회를 기록하고, 방금 DB에서 읽은 조회수에 더해야 할 값을 반환합니다.
+        (버퍼 사용 시 아직 반영되지 않은 증가량, 즉시 UPDATE 시 이번 조회 1회)
+        """
+        if self._seen is not None and viewer is not None:
+            key = (post_id, viewer)
+            if self._seen.get(key) is not None:
+                self.deduped += 1
+                return self.pending(post_id)
+            self._seen.set(key, True)
+
+        if not self.enabled:
+            await PostModel.increase_view_count(conn, post_id)
+            return 1
+
+        self._pending[post_id] = self._pending.get(post_id, 0) + 1
+        return self._pending[post_id]
+
+    def pending(self, post_id: int) -> int:
+        return self._pending.get(post_id, 0)
+
+    async def flush(self) -> int:
+        """
+        모아 둔 증가량을 DB에 반영하고 반영한 조회 수를 반환합니다. 실패하면 다음 주기에 다시 시도합니다.
+
+        반영하는 동안에도 응답에는 pending()이 계속 더해지도록 버퍼는 커밋된 뒤에 비웁니다.
+        커밋 직후 await 없이 버퍼에서 빼는 것과 캐시의 조회수를 올리는 것을 함께 처리하므로,
+        다른 요청이 그 사이에 끼어들어 숫자가 줄어 보이거나 두 번 더해 보이지 않습니다.
+        (반영 중에 읽은 행은 post_caches_paused 로 캐시하지 않음)
+        """
+        if not self._pending:
+            return 0
+
+        pending = dict(self._pending)
+        items = sorted(pending.items())
+        with post_caches_paused():
+            async with connect() as conn:
+                async with conn.begin():
+                    for i in range(0, len(items), self.batch_size):
+                        await PostModel.add_view_counts(conn, dict(items[i:i + self.batch_size]))
+                # 반영 중에 새로 쌓인 증가량은 남겨 둡니다.
+                for post_id, count in pending.items():
+                    remaining = self._pending[post_id] - count
+                    if remaining:
+                        self._pending[post_id] = remaining
+                    else:
+                        del self._pending[post_id]
+                patch_view_counts(pending)
+        return sum(pending.values())
+
+    def stats(self) -> dict:
+        return {
+            "buffered": self.enabled,
+            "pendingPosts": len(self._pending),
+            "pendingViews": sum(self._pending.values()),
+            "deduped": self.deduped,
+        }
+
+
+class LikeCountBuffer:
+    """
+    게시글 좋아요 수 쓰기 지연 버퍼 (샤딩)
+
+    좋아요 기록(post_likes 행)은 요청마다 바로 INSERT/DELETE 하고, 이것이 기준 데이터입니다.
+    posts.like_count 는 그 개수를 미리 세어 둔 값이므로, 이벤트처럼 한 글에 초당 수백 번 좋아요가 몰릴 때
+    매번 같은 행을 UPDATE 해 잠금을 기다리지 않도록 증감량만 메모리에 모았다가
+    tasks.like_count_flusher 가 LIKE_FLUSH_INTERVAL 마다 한 번에 반영합니다.
+
+    - 증감량은 post_id % shards 로 나눈 샤드에 쌓이고, 반영은 샤드마다 별도 트랜잭션으로 처리합니다.
+      (한 번에 잠그는 행 수를 제한하고, 실패해도 해당 샤드만 다음 주기에 다시 시도)
+    - 증감량은 좋아요 트랜잭션이 커밋된 뒤에만 쌓이며, 아직 반영되지 않은 값은 pending()으로 응답에 더해 줍니다.
+    - 워커 간 반영 시점이 엇갈리거나 프로세스가 비정상 종료되면 카운터가 어긋날 수 있으므로,
+      tasks.like_count_reconciler 가 최근에 반영한 글의 like_count 를 post_likes 개수로 다시 맞춥니다.
+    """
+    def __init__(self, interval: float, shards: int, batch_size: int):
+        self.enabled = interval > 0
+        self.batch_size = batch_size
+        self.reconciled = 0
+        self._shards: list[dict[int, int]] = [{} for _ in range(max(shards, 1))]
+        self._dirty: set[int] = set()  # 반영 후 아직 재계산하지 않은 게시글
+
+    def _shard(self, post_id: int) -> dict[int, int]:
+        return self._shards[post_id % len(self._shards)]
+
+    async def record(self, conn, post_id: int, delta: int) -> int:
+        """
+        방금 추가(+1)/삭제(-n)한 좋아요를 카운터에 반영하고, 응답에 보여줄 좋아요 수를 반환합니다.
+        버퍼를 쓰지 않으면 같은 트랜잭션에서 바로 UPDATE 합니다.
+        """
+        if not self.enabled:
+            return await LikeModel.add_like_count(conn, post_id, delta)
+
+        on_commit(conn, lambda: self._add(post_id, delta))
+        return await LikeModel.get_like_count(conn, post_id) + self.pending(post_id) + delta
+
+    def _add(self, post_id: int, delta: int):
+        shard = self._shard(post_id)
+        shard[post_id] = shard.get(post_id, 0) + delta
+
+    def pending(self, post_id: int) -> int:
+        return self._shard(post_id).get(post_id, 0)
+
+    async def flush(self) -> int:
+        """
+        모아 둔 증감량을 샤드별로 DB에 반영하고 반영한 게시글 수를 반환합니다. 실패한 샤드는 다음 주기에 다시 시도합니다.
+        조회수 버퍼(ViewCountBuffer.flush)와 같이 커밋 직후에 샤드에서 빼고 캐시를 고칩니다.
+        """
+        flushed = 0
+        for shard in self._shards:
+            # 0이 된 항목(좋아요 후 바로 취소)은 쓸 필요가 없습니다.
+            for post_id in [post_id for post_id, delta in shard.items() if not delta]:
+                del shard[post_id]
+            pending = dict(shard)
+            if not pending:
+                continue
+
+            items = sorted(pending.items())
+            with post_caches_paused():
+                async with connect() as conn:
+                    async with conn.begin():
+                        for i in range(0, len(items), self.batch_size):
+                            await PostModel.add_like_counts(conn, dict(items[i:i + self.batch_size]))
+                    # 반영 중에 새로 쌓인 증감량은 남겨 둡니다.
+                    for post_id, delta in pending.items():
+                        remaining = shard[post_id] - delta
+                        if remaining:
+                            shard[post_id] = remaining
+                        else:
+                            del shard[post_id]
+                    patch_like_counts(pending)
+            self._dirty.update(pending)
+            flushed += len(pending)
+        return flushed
+
+    async def reconcile(self) -> int:
+        """
+        최근 반영한 게시글의 like_count 를 post_likes 개수로 다시 계산하고, 수정된 행 수를 반환합니다.
+        아직 반영하지 않은 증감량이 남아 있는 글은 이중으로 세지 않도록 다음 주기로 미룹니다.
+        """
+        await self.flush()
+        post_ids = sorted(post_id for post_id in self._dirty if not self.pending(post_id))
+        if not post_ids:
+            return 0
+        self._dirty.difference_update(post_ids)
+
+        fixed = 0
+        try:
+            for i in range(0, len(post_ids), self.batch_size):
+                batch = post_ids[i:i + self.batch_size]
+                async with connect() as conn:
+                    async with conn.begin():
+                        count = await PostModel.reconcile_like_counts(conn, batch)
+                if count:
+                    # 어떤 글이 고쳐졌는지는 알 수 없으므로 이 배치의 캐시를 모두 지웁니다.
+                    for post_id in batch:
+                        invalidate_post(post_id)
+                fixed += count
+        except BaseException:
+            self._dirty.update(post_ids)
+            raise
+        self.reconciled += fixed
+        return fixed
+
+    def stats(self) -> dict:
+        return {
+            "buffered": self.enabled,
+            "shards": len(self._shards),
+            "pendingPosts": sum(len(shard) for shard in self._shards),
+            "pendingDelta": sum(sum(shard.values()) for shard in self._shards),
+            "dirtyPosts": len(self._dirty),
+            "reconciled": self.reconciled,
+        }
+
+
+view_counts = ViewCountBuffer(
+    config.VIEW_FLUSH_INTERVAL, config.VIEW_FLUSH_BATCH_SIZE, config.VIEW_DEDUPE_WINDOW, config.VIEW_DEDUPE_SIZE
+)
+
+like_counts = LikeCountBuffer(config.LIKE_FLUSH_INTERVAL, config.LIKE_COUNTER_SHARDS, config.LIKE_FLUSH_BATCH_SIZE)
@@ -0,0 +1,244 @@
+# images.py
+import asyncio
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from cache import TTLCache, get_or_load
+
+# Pillow 는 선택 의존성입니다. (pip install ".[images]") 없으면 원본 이미지를 그대로 사용합니다.
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = "public/images"          # utils.FileService.UPLOAD_DIR 과 같은 위치
+IMAGE_URL_PREFIX = "/public/images/"
+
+# (이름, 최대 변 길이(px), 정사각형으로 자를지)
+# avatar 는 40px 프로필을 고해상도 화면에서도 선명하게 보이도록 2배 크기로 만듭니다.
+VARIANTS = (
+    ("avatar", 96, True),
+    ("thumb", 480, False),
+    ("display", 1280, False),
+)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+
+def build_derivatives(source_path: str, source_url: str) -> dict:
+    """
+    [프로세스 풀에서 실행] 원본 이미지로 크기별 파생 이미지(원본 계열 형식 + WebP)와 매니페스트를 만듭니다.
+    x.png -> x.avatar.png, x.avatar.webp, ..., x.json
+    원본보다 크게 늘리지는 않으며, 움직이는 GIF는 첫 프레임만 남지 않도록 파생 이미지를 만들지 않습니다.
+    """
+    stem, _ = os.path.splitext(source_path)
+    url_stem, _ = os.path.splitext(source_url)
+
+    with Image.open(source_path) as opened:
+        manifest = {"source": source_url, "width": opened.width, "height": opened.height, "variants": {}}
+        if not getattr(opened, "is_animated", False):
+            image = ImageOps.exif_transpose(opened)  # 휴대폰 사진의 회전 정보 반영
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            extension = ".png" if has_alpha else ".jpg"
+
+            for name, size, crop in VARIANTS:
+                if crop:
+                    side = min(size, image.width, image.height)
+                    resized = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+                else:
+                    resized = image.copy()
+                    resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+                if has_alpha:
+                    resized.save(f"{stem}.{name}{extension}", "PNG", optimize=True)
+                else:
+                    resized.save(f"{stem}.{name}{extension}", "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                resized.save(f"{stem}.{name}.webp", "WEBP", quality=WEBP_QUALITY, method=4)
+
+                manifest["variants"][name] = {
+                    "width": resized.width,
+                    "height": resized.height,
+                    "url": f"{url_stem}.{name}{extension}",
+                    "webp": f"{url_stem}.{name}.webp",
+                }
+
+    # 매니페스트는 마지막에 원자적으로 써서, 파생 이미지가 다 만들어진 뒤에만 보이도록 합니다.
+    temp_path = f"{stem}.json.part"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, f"{stem}.json")
+    return manifest
+
+
+# 내용 해시로 저장된 원본 (utils.FileService.save_file), 예전 uuid 이름 파일은 정리 대상이 아닙니다.
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}\.(?:png|jpg|gif|webp)$")
+# 해시 이름 원본 + 그 파생 이미지 (x.png, x.thumb.jpg, x.thumb.webp) - 같은 이름의 내용이 바뀌지 않는 파일 (static_files)
+CONTENT_ADDRESSED_FILE = re.compile(
+    r"^[0-9a-f]{64}(?:\.(?:%s))?\.(?:png|jpg|gif|webp)$" % "|".join(name for name, _, _ in VARIANTS)
+)
+
+
+def list_upload_sources(older_than: float) -> list[str]:
+    """[정리 작업용] 마지막으로 저장/재사용된 시각이 older_than(epoch 초) 이전인 해시 이름 원본의 경로 목록"""
+    paths = []
+    with os.scandir(IMAGE_DIR) as entries:
+        for entry in entries:
+            if CONTENT_ADDRESSED_NAME.match(entry.name) and entry.stat().st_mtime < older_than:
+                paths.append(f"{IMAGE_URL_PREFIX}{entry.name}")
+    return paths
+
+
+def remove_upload(url_path: str, older_than: float) -> int:
+    """
+    [정리 작업용] 원본과 파생 이미지, 매니페스트를 지우고 지운 파일 수를 반환합니다.
+    목록을 만든 뒤 같은 내용이 다시 업로드되었다면(수정 시각 갱신) 지우지 않습니다.
+    """
+    source_path = to_disk_path(url_path)
+    try:
+        if os.stat(source_path).st_mtime >= older_than:
+            return 0
+    except FileNotFoundError:
+        return 0
+
+    stem, _ = os.path.splitext(source_path)
+    removed = 0
+    for path in [source_path, f"{stem}.json"] + [
+        f"{stem}.{name}{extension}" for name, _, _ in VARIANTS for extension in (".jpg", ".png", ".webp")
+    ]:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def remove_stale_temp_files(older_than: float) -> int:
+    """[정리 작업용] 업로드/매니페스트 저장 중 프로세스가 죽어 남은 .part 임시 파일을 지웁니다."""
+    removed = 0
+    with os.scandir(IMAGE_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".part") and entry.stat().st_mtime < older_than:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+
+def _read_manifest(manifest_path: str) -> dict | None:
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def to_disk_path(url_path: str) -> str | None:
+    """'/public/images/x.png' -> 'public/images/x.png' (업로드 폴더 밖의 경로나 외부 URL이면 None)"""
+    if not url_path or not url_path.startswith(IMAGE_URL_PREFIX):
+        return None
+    name = url_path[len(IMAGE_URL_PREFIX):]
+    if not name or "/" in name or name.startswith("."):
+        return None
+    return os.path.join(IMAGE_DIR, name)
+
+
+class ImagePipeline:
+    """
+    업로드 후 파생 이미지(avatar/thumb/display + WebP)를 만드는 프로세스 풀
+
+    리사이즈/재압축은 CPU를 오래 쓰고 GIL을 잡고 있으므로 이벤트 루프나 스레드가 아닌 별도 프로세스에서 실행합니다.
+    업로드 응답은 기다리지 않고 바로 돌려주며(원본 경로), 만들어지는 동안에는 resolve()가 원본을 가리킵니다.
+    실행 중 + 대기 중 작업이 max_pending 개를 넘으면 건너뛰고, 나중에 commands.build_image_derivatives 로 채울 수 있습니다.
+    """
+    def __init__(self, workers: int, max_pending: int, manifest_cache_size: int):
+        self.enabled = workers > 0 and Image is not None
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self._executor: ProcessPoolExecutor | None = None  # 처음 쓸 때 생성 (워커 프로세스마다 import 시점에 fork 하지 않도록)
+        self._tasks: set[asyncio.Task] = set()
+        # 원본 경로 -> 매니페스트 (파생 이미지는 바뀌지 않으므로 오래 캐시하고, 아직 없는 경우만 짧게 캐시)
+        self.manifests = TTLCache("image_manifest", maxsize=manifest_cache_size, ttl=3600.0)
+
+    def submit(self, url_path: str):
+        """저장된 원본의 파생 이미지 생성을 예약합니다. (끝날 때까지 기다리지 않음)"""
+        source_path = to_disk_path(url_path)
+        if not self.enabled or source_path is None:
+            return
+        if self.pending >= self.max_pending:
+            self.skipped += 1
+            return
+
+        self.pending += 1
+        task = asyncio.create_task(self._build(source_path, url_path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _build(self, source_path: str, url_path: str):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        try:
+            manifest = await asyncio.get_running_loop().run_in_executor(
+                self._executor, build_derivatives, source_path, url_path
+            )
+        except Exception:
+            self.failed += 1
+            logger.exception("[image_pipeline] 파생 이미지 생성 실패 (%s)", url_path)
+            return
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.manifests.set(url_path, manifest)
+
+    async def get_manifest(self, url_path: str) -> dict | None:
+        source_path = to_disk_path(url_path)
+        if source_path is None:
+            return None
+        manifest_path = f"{os.path.splitext(source_path)[0]}.json"
+        return await get_or_load(
+            self.manifests, url_path, None,
+            lambda _: asyncio.to_thread(_read_manifest, manifest_path),
+            negative_ttl=5.0
+        )
+
+    async def resolve(self, url_path: str | None, variant: str) -> str | None:
+        """원본 경로 대신 보여줄 파생 이미지 경로 (아직 없거나 외부 URL이면 원본 그대로)"""
+        manifest = await self.get_manifest(url_path)
+        if manifest and variant in manifest["variants"]:
+            return manifest["variants"][variant]["url"]
+        return url_path
+
+    def shutdown(self):
+        """진행 중인 작업을 기다리지 않고 종료합니다. (못 만든 파생 이미지는 명령으로 다시 만들 수 있음)"""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "maxPending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+
+image_pipeline = ImagePipeline(config.IMAGE_WORKERS, config.IMAGE_MAX_PENDING, config.IMAGE_MANIFEST_CACHE_SIZE)
@@ -1,4 +1,5 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -9,14 +10,31 @@ from routes.comment_route import router as comment_router
 from routes.like_route import router as like_router
 from routes.user_route import router as user_router
 from slowapi.errors import RateLimitExceeded
-from utils import limiter
+from utils import FileService, UploadSizeLimitMiddleware, limiter
+import config
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine  # DB 엔진 가져오기
+from database import connect, get_pool_status  # DB 커넥션 및 풀 상태
+from cache import TTLCache
+from security import PasswordHashBusyError, password_hash_pool
+from images import image_pipeline
+from serializers import url_cache_stats
+from tasks import PeriodicTask
+from counters import like_counts, view_counts
 from models.user_model import UserModel  # 수정한 유저 모델
-from fastapi.staticfiles import StaticFiles
+from static_files import PublicStaticFiles
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 백그라운드 작업(만료 세션 정리 등) 시작, 서버 종료 시 정리
+    PeriodicTask.start_all()
+    yield
+    await PeriodicTask.stop_all()
+    password_hash_pool.shutdown()
+    image_pipeline.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 허용할 프론트엔드 주소 목록
 origins = [
@@ -25,6 +43,10 @@ origins = [
     "http://dlwnsdud.duckdns.org"  # 나중에 실제 배포할 도메인
 ]
 
+# 업로드 요청 본문 크기 제한 (파일 크기 + multipart 경계/헤더 여유분)
+# CORS 미들웨어보다 먼저 추가해 413 응답에도 CORS 헤더가 붙도록 합니다.
+app.add_middleware(UploadSizeLimitMiddleware, max_body_size=config.UPLOAD_MAX_BYTES + 64 * 1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,       # 특정 주소만 허용
@@ -58,6 +80,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"message": "INVALID_REQUEST", "data": None}
     )
 
+# 비밀번호 해싱 대기열이 가득 찬 경우: 잠시 후 다시 시도하도록 503을 돌려줍니다.
+@app.exception_handler(PasswordHashBusyError)
+async def password_hash_busy_handler(request: Request, exc: PasswordHashBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "SERVER_BUSY", "data": None},
+        headers={"Retry-After": "1"}
+    )
+
 # 공통 예외 처리기는 이미 작성된 것을 그대로 사용합니다.
 # 그러면 400, 409 에러도 자동으로 {"message": "...", "data": null} 형식이 됩니다.
 @app.exception_handler(StarletteHTTPException)
@@ -78,13 +109,34 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 # main.py (진짜 딱 연결만 확인하는 용도)
+# 커넥션 풀 상태(대여 중인 커넥션, overflow, 대기 시간, 실패 횟수)도 함께 보여줍니다.
 @app.get("/db-ping")
-def db_ping():
-    from database import engine
+async def db_ping():
     from sqlalchemy import text
-    with engine.connect() as conn:
-        result = conn.execute(text("SELECT 'OK'")).fetchone()
-        return {"result": result[0]} # 'OK'가 나오면 DB 연결은 완벽하다는 뜻!
+    try:
+        async with connect() as conn:
+            result = (await conn.execute(text("SELECT 'OK'"))).fetchone()
+    except Exception:
+        # 풀이 고갈되어 커넥션을 못 얻는 상황에서도 풀 통계는 확인할 수 있어야 합니다.
+        return JSONResponse(
+            status_code=503,
+            content={"result": "UNAVAILABLE", "pool": get_pool_status()}
+        )
+    return {"result": result[0], "pool": get_pool_status()} # 'OK'가 나오면 DB 연결은 완벽하다는 뜻!
+
+# 프로세스 내 캐시 통계 (크기, 적중/실패 횟수, 적중률, LRU 방출 수), 이미지 주소 변환 캐시, 비밀번호 해싱 풀, 파생 이미지 풀, 백그라운드 작업, 조회수/좋아요 수 버퍼 상태
+@app.get("/stats")
+async def stats():
+    return {
+        "caches": TTLCache.all_stats(),
+        "urls": url_cache_stats(),
+        "passwordHash": password_hash_pool.stats(),
+        "uploads": FileService.stats(),
+        "images": image_pipeline.stats(),
+        "tasks": PeriodicTask.all_stats(),
+        "viewCounts": view_counts.stats(),
+        "likeCounts": like_counts.stats(),
+    }
 
 app.include_router(post_router)
 app.include_router(auth_router)
@@ -92,4 +144,5 @@ app.include_router(comment_router)
 app.include_router(like_router)
 app.include_router(user_router)
 
-app.mount("/public", StaticFiles(directory="public"), name="public")
\ No newline at end of file
+# 해시 이름 이미지는 immutable 캐시, 그 밖의 파일은 ETag 재확인 (304, Range, 미리 압축한 파일 지원)
+app.mount("/public", PublicStaticFiles(directory="public", max_age=config.STATIC_MAX_AGE), name="public")
\ No newline at end of file
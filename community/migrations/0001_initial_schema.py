@@ -0,0 +1,73 @@
+# migrations/0001_initial_schema.py
+"""기본 테이블 생성 (users, sessions, posts, comments, post_likes)"""
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, text,
+)
+
+metadata = MetaData()
+
+# MySQL에서는 InnoDB / utf8mb4 로 생성합니다. (SQLite 등 다른 DB에서는 무시되는 옵션)
+MYSQL_OPTIONS = {"mysql_engine": "InnoDB", "mysql_charset": "utf8mb4"}
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("email", String(255), nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("nickname", String(30), nullable=False),
+    Column("profile_url", String(500)),
+    Column("account_status", String(20), nullable=False, server_default="active"),
+    Column("suspension_start_at", DateTime),
+    Column("created_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    Column("deleted_at", DateTime),
+    **MYSQL_OPTIONS,
+)
+
+sessions = Table(
+    "sessions", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("session_id", String(64), nullable=False),
+    Column("expired_at", DateTime, nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    **MYSQL_OPTIONS,
+)
+
+posts = Table(
+    "posts", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("title", String(100), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("image_url", String(500)),
+    Column("view_count", Integer, nullable=False, server_default="0"),
+    Column("created_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    Column("updated_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    Column("deleted_at", DateTime),
+    **MYSQL_OPTIONS,
+)
+
+comments = Table(
+    "comments", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("post_id", Integer, ForeignKey("posts.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("content", String(255), nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    Column("updated_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    Column("deleted_at", DateTime),
+    **MYSQL_OPTIONS,
+)
+
+post_likes = Table(
+    "post_likes", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("post_id", Integer, ForeignKey("posts.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    **MYSQL_OPTIONS,
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn)
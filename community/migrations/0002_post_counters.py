@@ -0,0 +1,21 @@
+# migrations/0002_post_counters.py
+"""게시글 비정규화 카운터 컬럼 추가 (posts.like_count, posts.comment_count)"""
+from sqlalchemy import text
+
+# SQLite는 ALTER TABLE 한 번에 컬럼 하나만 추가할 수 있어 문장을 나눠 둡니다.
+STATEMENTS = [
+    "ALTER TABLE posts ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE posts ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
+
+    # 기존 데이터가 있다면 실제 개수로 한 번 채워 둡니다.
+    conn.execute(text("""
+        UPDATE posts
+        SET like_count = (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id),
+            comment_count = (SELECT COUNT(*) FROM comments c WHERE c.post_id = posts.id AND c.deleted_at IS NULL)
+    """))
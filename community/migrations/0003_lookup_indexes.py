@@ -0,0 +1,37 @@
+# migrations/0003_lookup_indexes.py
+"""자주 실행되는 조회 쿼리용 인덱스"""
+from sqlalchemy import text
+
+STATEMENTS = [
+    # 인증: get_user_by_session (모든 인증 요청마다 실행)
+    "CREATE UNIQUE INDEX ux_sessions_session_id ON sessions (session_id)",
+    # 로그인 중복 체크, 비밀번호 변경 시 전체 세션 삭제
+    "CREATE INDEX ix_sessions_user_id_expired_at ON sessions (user_id, expired_at)",
+
+    # 회원가입/로그인: find_by_email, find_by_nickname
+    # 탈퇴(소프트 딜리트)한 계정의 이메일로 재가입할 수 있어야 하므로 UNIQUE 대신 (값, deleted_at) 복합 인덱스를 둡니다.
+    "CREATE INDEX ix_users_email_deleted_at ON users (email, deleted_at)",
+    "CREATE INDEX ix_users_nickname_deleted_at ON users (nickname, deleted_at)",
+
+    # 좋아요 여부 확인 + 중복 좋아요 방지 (게시글당 유저 1회)
+    # 예전 check-then-insert 경쟁 상태로 생긴 중복 행은 UNIQUE 인덱스 생성 전에 정리합니다.
+    # (정리 후 카운터는 python -m commands.reconcile_counters 로 맞춰 주세요)
+    """DELETE FROM post_likes WHERE id NOT IN (
+        SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM post_likes GROUP BY post_id, user_id) AS keep
+    )""",
+    "CREATE UNIQUE INDEX ux_post_likes_post_id_user_id ON post_likes (post_id, user_id)",
+    "CREATE INDEX ix_post_likes_user_id ON post_likes (user_id)",
+
+    # 게시글별 댓글 목록 (삭제되지 않은 댓글을 작성 순으로)
+    "CREATE INDEX ix_comments_post_id_deleted_at_created_at ON comments (post_id, deleted_at, created_at)",
+    "CREATE INDEX ix_comments_user_id ON comments (user_id)",
+
+    # 게시글 목록 keyset 페이지네이션 (WHERE deleted_at IS NULL AND id < :last_id ORDER BY id DESC)
+    "CREATE INDEX ix_posts_deleted_at_id ON posts (deleted_at, id)",
+    "CREATE INDEX ix_posts_user_id ON posts (user_id)",
+]
+
+
+def upgrade(conn):
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
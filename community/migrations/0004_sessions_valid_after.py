@@ -0,0 +1,8 @@
+# migrations/0004_sessions_valid_after.py
+"""서명 토큰 세션 무효화 기준 시각 추가 (users.sessions_valid_after)"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # 밀리초 단위 유닉스 시각. 이 시각 이전(포함)에 발급된 토큰은 모두 무효입니다.
+    conn.execute(text("ALTER TABLE users ADD COLUMN sessions_valid_after BIGINT NOT NULL DEFAULT 0"))
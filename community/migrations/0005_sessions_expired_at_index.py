@@ -0,0 +1,8 @@
+# migrations/0005_sessions_expired_at_index.py
+"""만료 세션 정리용 인덱스 (sessions.expired_at)"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # tasks.py 세션 정리 작업: WHERE expired_at <= NOW() ORDER BY expired_at LIMIT :batch_size
+    conn.execute(text("CREATE INDEX ix_sessions_expired_at ON sessions (expired_at)"))
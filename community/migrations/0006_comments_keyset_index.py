@@ -0,0 +1,14 @@
+# migrations/0006_comments_keyset_index.py
+"""댓글 목록 커서 페이지네이션용 인덱스 (post_id, deleted_at, created_at, id)"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # ORDER BY created_at, id 까지 인덱스 순서로 읽도록 id 를 명시한 인덱스로 교체합니다.
+    conn.execute(text(
+        "CREATE INDEX ix_comments_post_id_deleted_at_created_at_id ON comments (post_id, deleted_at, created_at, id)"
+    ))
+    if conn.dialect.name == "mysql":
+        conn.execute(text("DROP INDEX ix_comments_post_id_deleted_at_created_at ON comments"))
+    else:
+        conn.execute(text("DROP INDEX ix_comments_post_id_deleted_at_created_at"))
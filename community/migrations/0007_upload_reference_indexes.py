@@ -0,0 +1,9 @@
+# migrations/0007_upload_reference_indexes.py
+"""업로드 파일 참조 확인용 인덱스 (posts.image_url, users.profile_url)"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    # tasks.py 업로드 정리 작업: 파일 경로 목록 중 게시글/프로필에서 아직 쓰는 것만 조회 (WHERE 경로 IN (...))
+    conn.execute(text("CREATE INDEX ix_posts_image_url ON posts (image_url)"))
+    conn.execute(text("CREATE INDEX ix_users_profile_url ON users (profile_url)"))
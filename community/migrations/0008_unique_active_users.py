@@ -0,0 +1,31 @@
+# migrations/0008_unique_active_users.py
+"""탈퇴하지 않은 계정의 이메일/닉네임 중복을 DB 에서 막는 UNIQUE 인덱스"""
+from sqlalchemy import text
+
+# 0003 의 (값, deleted_at) 인덱스는 조회용일 뿐이라, 동시에 들어온 두 회원가입이
+# 컨트롤러의 중복 검사를 함께 통과하면 같은 이메일/닉네임의 활성 계정이 둘 생길 수 있습니다.
+# 탈퇴(소프트 딜리트)한 계정의 값으로는 다시 가입할 수 있어야 하므로 deleted_at IS NULL 인 행만 유일하게 합니다.
+COLUMNS = ("email", "nickname")
+
+
+def upgrade(conn):
+    # 이미 중복된 활성 계정이 있으면 인덱스를 만들 수 없으므로, 어떤 값인지 알려 주고 멈춥니다. (직접 정리 후 다시 실행)
+    for column in COLUMNS:
+        duplicates = conn.execute(text(f"""
+            SELECT {column} FROM users WHERE deleted_at IS NULL
+            GROUP BY {column} HAVING COUNT(*) > 1
+        """)).scalars().all()
+        if duplicates:
+            raise RuntimeError(f"탈퇴하지 않은 계정 중 {column} 이 중복된 값이 있습니다: {duplicates[:10]}")
+
+    for column in COLUMNS:
+        if conn.dialect.name == "mysql":
+            # MySQL 은 부분 인덱스가 없으므로, 탈퇴한 계정이면 NULL 이 되는 생성 컬럼에 UNIQUE 인덱스를 둡니다. (NULL 은 중복 허용)
+            column_type = "VARCHAR(255)" if column == "email" else "VARCHAR(30)"
+            conn.execute(text(f"""
+                ALTER TABLE users ADD COLUMN active_{column} {column_type}
+                GENERATED ALWAYS AS (CASE WHEN deleted_at IS NULL THEN {column} END) VIRTUAL
+            """))
+            conn.execute(text(f"CREATE UNIQUE INDEX ux_users_active_{column} ON users (active_{column})"))
+        else:
+            conn.execute(text(f"CREATE UNIQUE INDEX ux_users_active_{column} ON users ({column}) WHERE deleted_at IS NULL"))
@@ -1,97 +1,131 @@
 # models/comment_model.py
 from datetime import datetime
 from sqlalchemy import text
-from database import engine
+from sqlalchemy.ext.asyncio import AsyncConnection
+from cache import invalidate_post, patch_post_counts
+from database import on_commit
 
 class CommentModel:
     
     @staticmethod
-    def create_comment(comment_data: dict):
+    async def create_comment(conn: AsyncConnection, comment_data: dict):
         """[DB 방식] 새 댓글을 생성하고 저장합니다."""
-        with engine.connect() as conn:
-            # SQL에서는 id를 자동 생성(Auto Increment)하므로 명시하지 않습니다.
-            query = text("""
-                INSERT INTO comments (post_id, user_id, content, created_at, updated_at)
-                VALUES (:post_id, :user_id, :content, NOW(), NOW())
-            """)
-            result = conn.execute(query, {
-                "post_id": comment_data["postId"],
-                "user_id": comment_data["userId"], # controller에서 userId를 넘겨줘야 함
-                "content": comment_data["content"]
-            })
-            conn.commit()
-            return result.lastrowid # 생성된 댓글의 ID 반환
+        # SQL에서는 id를 자동 생성(Auto Increment)하므로 명시하지 않습니다.
+        query = text("""
+            INSERT INTO comments (post_id, user_id, content, created_at, updated_at)
+            VALUES (:post_id, :user_id, :content, NOW(), NOW())
+        """)
+        result = await conn.execute(query, {
+            "post_id": comment_data["postId"],
+            "user_id": comment_data["userId"], # controller에서 userId를 넘겨줘야 함
+            "content": comment_data["content"]
+        })
+
+        # 같은 트랜잭션 안에서 게시글의 댓글 카운터도 함께 증가
+        await conn.execute(
+            text("UPDATE posts SET comment_count = comment_count + 1 WHERE id = :post_id"),
+            {"post_id": comment_data["postId"]}
+        )
+        on_commit(conn, lambda: patch_post_counts(comment_data["postId"], commentCount=1))
+        return result.lastrowid # 생성된 댓글의 ID 반환
 
     @staticmethod
-    def update_comment(comment_id: int, content: str):
+    async def update_comment(conn: AsyncConnection, comment_id: int, content: str):
         """댓글 내용을 수정합니다."""
-        with engine.connect() as conn:
-            query = text("""
-                UPDATE comments 
-                SET content = :content, updated_at = NOW()
-                WHERE id = :comment_id AND deleted_at IS NULL
-            """)
-            result = conn.execute(query, {
-                "content": content,
-                "comment_id": comment_id
-            })
-            conn.commit()
-            return result.rowcount > 0
+        query = text("""
+            UPDATE comments 
+            SET content = :content, updated_at = NOW()
+            WHERE id = :comment_id AND deleted_at IS NULL
+        """)
+        result = await conn.execute(query, {
+            "content": content,
+            "comment_id": comment_id
+        })
+        return result.rowcount > 0
 
     @staticmethod
-    def get_comments_by_post_id(post_id: int):
-        '''특정 게시글의 댓글 목록 조회'''
-        with engine.connect() as conn:
-            # 성능 향상을 위해 유저 테이블과 JOIN하여 닉네임과 프로필을 한 번에 가져옵니다.
+    async def get_comments_by_post_id(conn: AsyncConnection, post_id: int, last_comment_id: int = None, size: int = 20):
+        '''특정 게시글의 댓글 목록 조회 (작성 순, (created_at, id) 기준 커서 페이지네이션)'''
+        # 성능 향상을 위해 유저 테이블과 JOIN하여 닉네임과 프로필을 한 번에 가져옵니다.
+        if last_comment_id is None:
+            query = text("""
+                SELECT c.id as commentId, c.content, c.created_at as createdAt,
+                       u.id as userId, u.nickname as author, u.profile_url as profileImage
+                FROM comments c
+                JOIN users u ON c.user_id = u.id
+                WHERE c.post_id = :post_id AND c.deleted_at IS NULL
+                ORDER BY c.created_at ASC, c.id ASC LIMIT :size
+            """)
+            params = {"post_id": post_id, "size": size}
+        else:
+            # 같은 시각에 작성된 댓글이 있을 수 있으므로 created_at 이 같으면 id 로 이어서 가져옵니다.
+            # 마지막 댓글이 그사이 삭제되어도 행은 남아 있으므로(soft delete) 기준 시각을 찾을 수 있습니다.
             query = text("""
                 SELECT c.id as commentId, c.content, c.created_at as createdAt,
                        u.id as userId, u.nickname as author, u.profile_url as profileImage
                 FROM comments c
                 JOIN users u ON c.user_id = u.id
+                JOIN comments last ON last.id = :last_id AND last.post_id = :post_id
                 WHERE c.post_id = :post_id AND c.deleted_at IS NULL
-                ORDER BY c.created_at ASC
+                  AND (c.created_at > last.created_at OR (c.created_at = last.created_at AND c.id > last.id))
+                ORDER BY c.created_at ASC, c.id ASC LIMIT :size
             """)
-            result = conn.execute(query, {"post_id": post_id}).fetchall()
-            return [dict(row._mapping) for row in result]
+            params = {"post_id": post_id, "last_id": last_comment_id, "size": size}
+        result = (await conn.execute(query, params)).fetchall()
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def is_comment_of_post(conn: AsyncConnection, post_id: int, comment_id: int) -> bool:
+        '''커서로 받은 댓글이 이 게시글의 댓글인지 확인 (삭제된 댓글 포함, 빈 페이지일 때만 사용)'''
+        query = text("SELECT 1 FROM comments WHERE id = :comment_id AND post_id = :post_id")
+        return (await conn.execute(query, {"comment_id": comment_id, "post_id": post_id})).first() is not None
         
     @staticmethod
-    def get_comment_by_id(comment_id: int):
+    async def get_comment_by_id(conn: AsyncConnection, comment_id: int):
         '''특정 댓글 조회'''
-        with engine.connect() as conn:
-            query = text("""
-                SELECT id as commentId, post_id as postId, user_id as userId, content
-                FROM comments 
-                WHERE id = :comment_id AND deleted_at IS NULL
-            """)
-            result = conn.execute(query, {"comment_id": comment_id}).fetchone()
-            return dict(result._mapping) if result else None
+        query = text("""
+            SELECT id as commentId, post_id as postId, user_id as userId, content
+            FROM comments 
+            WHERE id = :comment_id AND deleted_at IS NULL
+        """)
+        result = (await conn.execute(query, {"comment_id": comment_id})).fetchone()
+        return dict(result._mapping) if result else None
 
     @staticmethod
-    def delete_comment(comment_id: int):
+    async def delete_comment(conn: AsyncConnection, comment_id: int):
         '''특정 댓글 삭제'''
-        with engine.connect() as conn:
-            query = text("""
-                UPDATE comments 
-                SET deleted_at = NOW() 
-                WHERE id = :comment_id
-            """)
-            result = conn.execute(query, {"comment_id": comment_id})
-            conn.commit()
-            return result.rowcount > 0
+        # 이미 삭제된 댓글을 다시 지워 카운터가 두 번 줄어들지 않도록 deleted_at IS NULL 조건을 둡니다.
+        query = text("""
+            UPDATE comments 
+            SET deleted_at = NOW() 
+            WHERE id = :comment_id AND deleted_at IS NULL
+        """)
+        result = await conn.execute(query, {"comment_id": comment_id})
+
+        if result.rowcount > 0:
+            post_id = (await conn.execute(
+                text("SELECT post_id FROM comments WHERE id = :comment_id"), {"comment_id": comment_id}
+            )).scalar()
+            await conn.execute(
+                text("UPDATE posts SET comment_count = comment_count - 1 WHERE id = :post_id"),
+                {"post_id": post_id}
+            )
+            on_commit(conn, lambda: patch_post_counts(post_id, commentCount=-1))
+        return result.rowcount > 0
     
     @staticmethod
-    def delete_comments_by_post_id(post_id: int):
+    async def delete_comments_by_post_id(conn: AsyncConnection, post_id: int):
         '''특정 게시글에 달린 모든 댓글 삭제'''
-        with engine.connect() as conn:
-            # 해당 post_id를 가진 모든 댓글의 deleted_at 컬럼을 현재 시간으로 업데이트
-            query = text("""
-                UPDATE comments 
-                SET deleted_at = NOW() 
-                WHERE post_id = :post_id AND deleted_at IS NULL
-            """)
-            
-            result = conn.execute(query, {"post_id": post_id})
-            conn.commit()
-            
-            # 영향을 받은 행의 수(삭제된 댓글 수)를 반환하거나, 성공 여부를 반환
-            return result.rowcount >= 0
\ No newline at end of file
+        # 해당 post_id를 가진 모든 댓글의 deleted_at 컬럼을 현재 시간으로 업데이트
+        query = text("""
+            UPDATE comments 
+            SET deleted_at = NOW() 
+            WHERE post_id = :post_id AND deleted_at IS NULL
+        """)
+        
+        result = await conn.execute(query, {"post_id": post_id})
+        await conn.execute(text("UPDATE posts SET comment_count = 0 WHERE id = :post_id"), {"post_id": post_id})
+        on_commit(conn, lambda: invalidate_post(post_id))
+        
+        # 영향을 받은 행의 수(삭제된 댓글 수)를 반환하거나, 성공 여부를 반환
+        return result.rowcount >= 0
\ No newline at end of file
@@ -1,6 +1,8 @@
 # models/like_model.py
-from sqlalchemy import text
-from database import engine
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from cache import invalidate_post, patch_post_counts
+from database import on_commit
 
 class LikeModel:
     
@@ -23,33 +25,82 @@ class LikeModel:
     #     return True # "추가됨"을 알림
 
     @staticmethod
-    def has_liked(userId: int, post_id: int):
+    async def has_liked(conn: AsyncConnection, userId: int, post_id: int):
         """DB에서 유저의 좋아요 여부 확인"""
-        with engine.connect() as conn:
-            query = text("SELECT id FROM post_likes WHERE post_id = :post_id AND user_id = :user_id")
-            result = conn.execute(query, {"post_id": post_id, "user_id": userId}).fetchone()
-            return True if result else False
+        query = text("SELECT id FROM post_likes WHERE post_id = :post_id AND user_id = :user_id")
+        result = (await conn.execute(query, {"post_id": post_id, "user_id": userId})).fetchone()
+        return True if result else False
         
     @staticmethod
-    def add_like(userId: int, post_id: int):
-        """DB에 좋아요 추가"""
-        with engine.connect() as conn:
-            query = text("INSERT INTO post_likes (post_id, user_id) VALUES (:post_id, :user_id)")
-            conn.execute(query, {"post_id": post_id, "user_id": userId})
-            conn.commit()
+    async def get_liked_post_ids(conn: AsyncConnection, userId: int, post_ids: list[int]) -> set[int]:
+        """목록 한 페이지의 게시글 중 유저가 좋아요를 누른 글의 id (쿼리 한 번, (post_id, user_id) 유니크 인덱스 사용)"""
+        if not post_ids:
+            return set()
+        query = text("""
+            SELECT post_id FROM post_likes
+            WHERE post_id IN :post_ids AND user_id = :user_id
+        """).bindparams(bindparam("post_ids", expanding=True))
+        result = await conn.execute(query, {"post_ids": post_ids, "user_id": userId})
+        return {row.post_id for row in result}
 
     @staticmethod
-    def remove_like(userId: int, post_id: int):
-        """좋아요 삭제"""
-        with engine.connect() as conn:
-            query = text("DELETE FROM post_likes WHERE post_id = :post_id AND user_id = :user_id")
-            conn.execute(query, {"post_id": post_id, "user_id": userId})
-            conn.commit()
+    async def add_like(conn: AsyncConnection, userId: int, post_id: int):
+        """
+        DB에 좋아요 추가 (중복 클릭/동시 요청에도 한 번만 반영)
+        유니크 키 (post_id, user_id) 에 INSERT IGNORE 하고, 실제로 추가됐는지를 반환합니다.
+        이미 눌렀거나 글이 없으면 False 입니다. 카운터는 counters.LikeCountBuffer 가 갱신합니다.
+        """
+        # 존재 확인과 추가를 한 문장으로 처리해 확인 후 삽입 사이의 경쟁 상태를 없앱니다.
+        if conn.dialect.name == "sqlite":
+            query = text("""
+                INSERT OR IGNORE INTO post_likes (post_id, user_id)
+                SELECT id, :user_id FROM posts WHERE id = :post_id AND deleted_at IS NULL
+            """)
+        else:
+            query = text("""
+                INSERT IGNORE INTO post_likes (post_id, user_id)
+                SELECT id, :user_id FROM posts WHERE id = :post_id AND deleted_at IS NULL
+            """)
+        result = await conn.execute(query, {"post_id": post_id, "user_id": userId})
+        return result.rowcount > 0
 
     @staticmethod
-    def delete_likes_by_post_id(post_id: int):
+    async def remove_like(conn: AsyncConnection, userId: int, post_id: int):
+        """
+        좋아요 삭제 (중복 클릭/동시 요청에도 한 번만 반영)
+        실제로 지워진 행 수를 반환합니다. 누른 적이 없거나 글이 없으면 0 입니다.
+        """
+        query = text("""
+            DELETE FROM post_likes
+            WHERE post_id = :post_id AND user_id = :user_id
+              AND EXISTS (SELECT 1 FROM posts WHERE id = :post_id AND deleted_at IS NULL)
+        """)
+        result = await conn.execute(query, {"post_id": post_id, "user_id": userId})
+        return result.rowcount
+
+    @staticmethod
+    async def add_like_count(conn: AsyncConnection, post_id: int, delta: int) -> int:
+        """
+        [DB 방식] 게시글의 좋아요 카운터를 delta 만큼 바꾸고 바뀐 값을 반환합니다.
+        UPDATE로 행이 잠겨 있어 커밋까지 그대로 유지됩니다.
+        """
+        await conn.execute(
+            text("UPDATE posts SET like_count = like_count + :delta WHERE id = :post_id"),
+            {"delta": delta, "post_id": post_id}
+        )
+        on_commit(conn, lambda: patch_post_counts(post_id, likeCount=delta))
+        return await LikeModel.get_like_count(conn, post_id)
+
+    @staticmethod
+    async def get_like_count(conn: AsyncConnection, post_id: int) -> int:
+        """posts.like_count 값 (아직 반영되지 않은 버퍼 증가량은 포함하지 않음)"""
+        result = await conn.execute(text("SELECT like_count FROM posts WHERE id = :post_id"), {"post_id": post_id})
+        return result.scalar_one()
+
+    @staticmethod
+    async def delete_likes_by_post_id(conn: AsyncConnection, post_id: int):
         """게시글 삭제 시 관련 좋아요 기록도 싹 지우기 (Cascade Delete)"""
-        with engine.connect() as conn:
-            query = text("DELETE FROM post_likes WHERE post_id = :post_id")
-            conn.execute(query, {"post_id": post_id})
-            conn.commit()
\ No newline at end of file
+        query = text("DELETE FROM post_likes WHERE post_id = :post_id")
+        await conn.execute(query, {"post_id": post_id})
+        await conn.execute(text("UPDATE posts SET like_count = 0 WHERE id = :post_id"), {"post_id": post_id})
+        on_commit(conn, lambda: invalidate_post(post_id))
\ No newline at end of file
@@ -1,153 +1,285 @@
 # models/post_model.py
-from sqlalchemy import text
-from database import engine
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from cache import get_or_load, invalidate_new_post, invalidate_post, patch_view_counts, post_cache
+import config
+from database import on_commit
+from models.like_model import LikeModel
+
+# 쓰기 지연 버퍼가 증감량을 반영하는 카운터 컬럼 (SQL 에 이름이 그대로 들어가므로 이 목록만 허용)
+COUNTER_COLUMNS = ("view_count", "like_count")
 
 class PostModel:
     @staticmethod
-    def get_all_posts(last_post_id: int = None, size: int = 10):
-        with engine.connect() as conn:
-            if last_post_id is None:
-                query = text("""
-                    SELECT p.id as postId, p.title, u.nickname as author, -- 이름을 'author'로 설정
-                        p.created_at as createdAt, p.view_count as viewCount,
-                        u.profile_url as profileImage,
-                        (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = p.id) as likeCount,
-                        (SELECT COUNT(*) FROM comments c JOIN users u ON c.user_id = u.id WHERE c.post_id = p.id AND c.deleted_at IS NULL) as commentCount
-                    FROM posts p
-                    JOIN users u ON p.user_id = u.id
-                    WHERE p.deleted_at IS NULL
-                    ORDER BY p.id DESC LIMIT :size
-                """)
-                params = {"size": size}
-            else:
-                query = text("""
-                    SELECT p.id as postId, p.title, u.nickname as author, -- 이름을 'author'로 설정
-                        p.created_at as createdAt, p.view_count as viewCount,
-                        u.profile_url as profileImage,
-                        (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = p.id) as likeCount,
-                        (SELECT COUNT(*) FROM comments c JOIN users u ON c.user_id = u.id WHERE c.post_id = p.id AND c.deleted_at IS NULL) as commentCount
-                    FROM posts p
-                    JOIN users u ON p.user_id = u.id
-                    WHERE p.id < :last_id AND p.deleted_at IS NULL
-                    ORDER BY p.id DESC LIMIT :size
-                """)
-                params = {"last_id": last_post_id, "size": size}
-            
-            result = conn.execute(query, params).fetchall()
-            
-            posts = []
-            for row in result:
-                r = row._mapping
-                posts.append({
-                    "postId": r["postId"],
-                    "title": r["title"],
-                    "createdAt": r["createdAt"],
-                    "viewCount": r["viewCount"],
-                    "likeCount": r["likeCount"],
-                    "commentCount": r["commentCount"],
-                    "author": {
-                        "nickname": r["author"], # SQL 별칭과 똑같이 'author'로 수정!
-                        "profileImage": r["profileImage"]
-                    }
-                })
-            return posts
-
-    @staticmethod
-    def get_post_by_id(post_id: int):
-        """특정 게시글 상세 조회 (작성자 정보 포함 JOIN)"""
-        with engine.connect() as conn:
+    async def get_all_posts(conn: AsyncConnection, last_post_id: int = None, size: int = 10):
+        if last_post_id is None:
+            query = text("""
+                SELECT p.id as postId, p.title, u.nickname as author, -- 이름을 'author'로 설정
+                    p.created_at as createdAt, p.view_count as viewCount,
+                    u.profile_url as profileImage, p.image_url as imageUrl,
+                    p.like_count as likeCount, p.comment_count as commentCount -- 비정규화 카운터 컬럼
+                FROM posts p
+                JOIN users u ON p.user_id = u.id
+                WHERE p.deleted_at IS NULL
+                ORDER BY p.id DESC LIMIT :size
+            """)
+            params = {"size": size}
+        else:
             query = text("""
-                SELECT p.id as postId, p.title, p.content, p.image_url, p.created_at as createdAt, p.view_count as viewCount,
-                   u.id as userId, u.nickname as author, u.profile_url as profileImage,
-                   (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = p.id) as likeCount,
-                   (SELECT COUNT(*) FROM comments c JOIN users u ON c.user_id = u.id WHERE c.post_id = p.id AND c.deleted_at IS NULL) as commentCount
-            FROM posts p
-            JOIN users u ON p.user_id = u.id
-            WHERE p.id = :post_id AND p.deleted_at IS NULL
+                SELECT p.id as postId, p.title, u.nickname as author, -- 이름을 'author'로 설정
+                    p.created_at as createdAt, p.view_count as viewCount,
+                    u.profile_url as profileImage, p.image_url as imageUrl,
+                    p.like_count as likeCount, p.comment_count as commentCount -- 비정규화 카운터 컬럼
+                FROM posts p
+                JOIN users u ON p.user_id = u.id
+                WHERE p.id < :last_id AND p.deleted_at IS NULL
+                ORDER BY p.id DESC LIMIT :size
             """)
-            result = conn.execute(query, {"post_id": post_id}).fetchone()
-            
-            if not result:
-                return None
-                
-            # 결과를 프론트엔드 형식에 맞게 가공 (author를 객체화)
-            row = result._mapping
-            return {
-                "postId": row["postId"],
-                "title": row["title"],
-                "content": row["content"],
-                "image_url": row["image_url"],
-                "createdAt": row["createdAt"],
-                "likeCount": row["likeCount"],
-                "commentCount": row["commentCount"],
-                "viewCount": row["viewCount"],
+            params = {"last_id": last_post_id, "size": size}
+        
+        result = (await conn.execute(query, params)).fetchall()
+        
+        posts = []
+        for row in result:
+            r = row._mapping
+            posts.append({
+                "postId": r["postId"],
+                "title": r["title"],
+                "createdAt": r["createdAt"],
+                "viewCount": r["viewCount"],
+                "likeCount": r["likeCount"],
+                "commentCount": r["commentCount"],
+                "imageUrl": r["imageUrl"],  # 목록 썸네일용 (응답에서는 thumbnail 로 변환)
                 "author": {
-                    "userId": row["userId"],
-                    "nickname": row["author"],
-                    "profileImage": row["profileImage"]
+                    "nickname": r["author"], # SQL 별칭과 똑같이 'author'로 수정!
+                    "profileImage": r["profileImage"]
                 }
+            })
+        return posts
+
+    @staticmethod
+    async def get_post_by_id(conn: AsyncConnection, post_id: int):
+        """특정 게시글 상세 조회 (작성자 정보 포함 JOIN)"""
+        query = text("""
+            SELECT p.id as postId, p.title, p.content, p.image_url, p.created_at as createdAt, p.view_count as viewCount,
+               u.id as userId, u.nickname as author, u.profile_url as profileImage,
+               p.like_count as likeCount, p.comment_count as commentCount
+        FROM posts p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.id = :post_id AND p.deleted_at IS NULL
+        """)
+        result = (await conn.execute(query, {"post_id": post_id})).fetchone()
+        return PostModel._to_post_detail(result._mapping) if result else None
+
+    @staticmethod
+    async def get_post_detail(conn: AsyncConnection, post_id: int, user_id: int):
+        """상세 화면용: 게시글 + 작성자 + 카운터 + 현재 유저의 좋아요 여부를 쿼리 한 번으로 조회"""
+        query = text("""
+            SELECT p.id as postId, p.title, p.content, p.image_url, p.created_at as createdAt, p.view_count as viewCount,
+               u.id as userId, u.nickname as author, u.profile_url as profileImage,
+               p.like_count as likeCount, p.comment_count as commentCount,
+               EXISTS (SELECT 1 FROM post_likes pl WHERE pl.post_id = p.id AND pl.user_id = :user_id) as isLiked
+        FROM posts p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.id = :post_id AND p.deleted_at IS NULL
+        """)
+        result = (await conn.execute(query, {"post_id": post_id, "user_id": user_id})).fetchone()
+        if not result:
+            return None
+
+        post = PostModel._to_post_detail(result._mapping)
+        post["isLiked"] = bool(result.isLiked)
+        return post
+
+    @staticmethod
+    def _to_post_detail(row):
+        # 결과를 프론트엔드 형식에 맞게 가공 (author를 객체화)
+        return {
+            "postId": row["postId"],
+            "title": row["title"],
+            "content": row["content"],
+            "image_url": row["image_url"],
+            "createdAt": row["createdAt"],
+            "likeCount": row["likeCount"],
+            "commentCount": row["commentCount"],
+            "viewCount": row["viewCount"],
+            "author": {
+                "userId": row["userId"],
+                "nickname": row["author"],
+                "profileImage": row["profileImage"]
             }
+        }
     
     @staticmethod
-    def create_post(post_data: dict):
+    async def get_post_by_id_cached(conn: AsyncConnection, post_id: int):
+        """
+        get_post_by_id 의 캐시 버전 (상세 조회, 댓글/좋아요의 게시글 존재 확인용)
+        같은 글을 동시에 조회하면 쿼리 하나만 실행되고, 없는 글도 잠시 캐시됩니다.
+        반환값을 수정해도 캐시에는 영향이 없습니다.
+        """
+        post = await get_or_load(
+            post_cache, post_id, conn,
+            lambda c: PostModel.get_post_by_id(c, post_id),
+            negative_ttl=config.POST_CACHE_NEGATIVE_TTL
+        )
+        return {**post, "author": {**post["author"]}} if post else None
+
+    @staticmethod
+    async def get_post_detail_cached(conn: AsyncConnection, post_id: int, user_id: int):
+        """
+        get_post_detail 의 캐시 버전 (상세 조회용, 반환값에 isLiked 포함)
+        캐시에 없으면 get_post_detail 한 번으로 게시글과 좋아요 여부를 같이 읽고, 캐시에는 게시글만 저장합니다.
+        캐시 적중(또는 다른 요청의 조회 결과를 함께 받은 경우)이면 좋아요 여부만 따로 확인합니다.
+        """
+        is_liked = None
+
+        async def load(c):
+            nonlocal is_liked
+            post = await PostModel.get_post_detail(c, post_id, user_id)
+            if post:
+                is_liked = post.pop("isLiked")
+            return post
+
+        post = await get_or_load(post_cache, post_id, conn, load, negative_ttl=config.POST_CACHE_NEGATIVE_TTL)
+        if not post:
+            return None
+
+        if is_liked is None:
+            is_liked = await LikeModel.has_liked(conn, user_id, post_id)
+        return {**post, "author": {**post["author"]}, "isLiked": is_liked}
+
+    @staticmethod
+    async def create_post(conn: AsyncConnection, post_data: dict):
         """[DB 방식] 새 게시물을 생성하고 저장합니다."""
-        with engine.connect() as conn:
-            query = text("""
-                INSERT INTO posts (user_id, title, content, image_url, created_at, updated_at)
-                VALUES (:user_id, :title, :content, :image_url, NOW(), NOW())
-            """)
-            result = conn.execute(query, {
-                "user_id": post_data["userId"],
-                "title": post_data["title"],
-                "content": post_data["content"],
-                "image_url": post_data["image_url"]
-            })
-            conn.commit() # INSERT 작업 후엔 꼭 commit을 해줘야 DB에 저장됩니다.
-            return result.lastrowid # 방금 생성된 게시글의 ID를 반환합니다.
+        query = text("""
+            INSERT INTO posts (user_id, title, content, image_url, created_at, updated_at)
+            VALUES (:user_id, :title, :content, :image_url, NOW(), NOW())
+        """)
+        result = await conn.execute(query, {
+            "user_id": post_data["userId"],
+            "title": post_data["title"],
+            "content": post_data["content"],
+            "image_url": post_data["image_url"]
+        })
+        post_id = result.lastrowid
+        on_commit(conn, lambda: invalidate_new_post(post_id))  # 새 글은 첫 페이지에 나타나야 함
+        return post_id # 방금 생성된 게시글의 ID를 반환합니다.
     
     @staticmethod
-    def update_post(post_id: int, update_data: dict):
+    async def update_post(conn: AsyncConnection, post_id: int, update_data: dict):
         """[DB 방식] ID로 게시물을 찾아 내용을 업데이트합니다."""
-        with engine.connect() as conn:
-            query = text("""
-                UPDATE posts 
-                SET title = :title, 
-                    content = :content,
-                    image_url = :image_url,
-                    updated_at = NOW()
-                WHERE id = :post_id AND deleted_at IS NULL
-            """)
-            result = conn.execute(query, {
-                "title": update_data["title"],
-                "content": update_data["content"],
-                "image_url": update_data["image_url"],
-                "post_id": post_id
-            })
-            conn.commit()
-            return result.rowcount > 0 # 수정된 행이 있으면 True 반환
+        query = text("""
+            UPDATE posts 
+            SET title = :title, 
+                content = :content,
+                image_url = :image_url,
+                updated_at = NOW()
+            WHERE id = :post_id AND deleted_at IS NULL
+        """)
+        result = await conn.execute(query, {
+            "title": update_data["title"],
+            "content": update_data["content"],
+            "image_url": update_data["image_url"],
+            "post_id": post_id
+        })
+        on_commit(conn, lambda: invalidate_post(post_id))
+        return result.rowcount > 0 # 수정된 행이 있으면 True 반환
     
     @staticmethod
-    def delete_post(post_id: int):
+    async def delete_post(conn: AsyncConnection, post_id: int):
         """[DB 방식] 실제 삭제 대신 deleted_at에 시간을 기록하는 '소프트 삭제'를 수행합니다."""
-        with engine.connect() as conn:
-            query = text("""
-                UPDATE posts 
-                SET deleted_at = NOW() 
-                WHERE id = :post_id
-            """)
-            result = conn.execute(query, {"post_id": post_id})
-            conn.commit()
-            return result.rowcount > 0
+        query = text("""
+            UPDATE posts 
+            SET deleted_at = NOW() 
+            WHERE id = :post_id
+        """)
+        result = await conn.execute(query, {"post_id": post_id})
+        on_commit(conn, lambda: invalidate_post(post_id))
+        return result.rowcount > 0
     
     @staticmethod
-    def increase_view_count(post_id: int):
+    async def increase_view_count(conn: AsyncConnection, post_id: int):
         """[DB 방식] 게시글 조회 시 view_count 컬럼을 1 증가시킵니다."""
-        with engine.connect() as conn:
-            query = text("""
-                UPDATE posts 
-                SET view_count = view_count + 1 
-                WHERE id = :post_id
-            """)
-            result = conn.execute(query, {"post_id": post_id})
-            conn.commit()
-            return result.rowcount > 0
\ No newline at end of file
+        query = text("""
+            UPDATE posts 
+            SET view_count = view_count + 1 
+            WHERE id = :post_id
+        """)
+        result = await conn.execute(query, {"post_id": post_id})
+        on_commit(conn, lambda: patch_view_counts({post_id: 1}))
+        return result.rowcount > 0
+
+    @staticmethod
+    async def add_view_counts(conn: AsyncConnection, counts: dict[int, int]):
+        """
+        [쓰기 지연 방식] {post_id: 증가량} 을 UPDATE ... CASE 한 문장으로 반영합니다. (counters.ViewCountBuffer)
+        여러 워커가 같은 행을 잠그는 순서가 엇갈리지 않도록 id 순으로 정렬해 넘겨 주세요.
+        """
+        return await PostModel._add_counter_values(conn, "view_count", counts)
+
+    @staticmethod
+    async def add_like_counts(conn: AsyncConnection, counts: dict[int, int]):
+        """[쓰기 지연 방식] {post_id: 증감량} 을 like_count 에 한 번에 반영합니다. (counters.LikeCountBuffer)"""
+        return await PostModel._add_counter_values(conn, "like_count", counts)
+
+    @staticmethod
+    async def _add_counter_values(conn: AsyncConnection, column: str, counts: dict[int, int]):
+        params = {"post_ids": list(counts)}
+        for i, (post_id, count) in enumerate(counts.items()):
+            params[f"id{i}"] = post_id
+            params[f"count{i}"] = count
+        result = await conn.execute(PostModel.counter_update_query(column, len(counts)), params)
+        return result.rowcount
+
+    @staticmethod
+    def counter_update_query(column: str, size: int):
+        """
+        게시글 size 개의 column 에 각자 다른 증감량(:id0/:count0 ...)을 더하는 UPDATE ... CASE 한 문장
+        CASE 부분은 개수에 따라 달라지므로, commands.check_query_plans 에는 이 함수로 만든 대표 SQL 을 등록해 두었습니다.
+        """
+        if column not in COUNTER_COLUMNS:
+            raise ValueError(f"카운터 컬럼이 아닙니다: {column}")
+        cases = " ".join(f"WHEN :id{i} THEN :count{i}" for i in range(size))
+        return text(f"""
+            UPDATE posts
+            SET {column} = {column} + CASE id {cases} ELSE 0 END
+            WHERE id IN :post_ids
+        """).bindparams(bindparam("post_ids", expanding=True))
+
+    @staticmethod
+    async def reconcile_counters(conn: AsyncConnection, start_id: int, end_id: int):
+        """
+        [정합성 복구용] id가 start_id ~ end_id 범위인 게시글의 like_count, comment_count를
+        실제 post_likes / comments 개수로 다시 계산합니다. 값이 어긋난 행만 수정하고 그 수를 반환합니다.
+        """
+        query = text("""
+            UPDATE posts
+            SET like_count = (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id),
+                comment_count = (SELECT COUNT(*) FROM comments c WHERE c.post_id = posts.id AND c.deleted_at IS NULL)
+            WHERE id BETWEEN :start_id AND :end_id
+              AND (like_count <> (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id)
+                   OR comment_count <> (SELECT COUNT(*) FROM comments c WHERE c.post_id = posts.id AND c.deleted_at IS NULL))
+        """)
+        result = await conn.execute(query, {"start_id": start_id, "end_id": end_id})
+        return result.rowcount
+
+    @staticmethod
+    async def reconcile_like_counts(conn: AsyncConnection, post_ids: list[int]):
+        """
+        [정합성 복구용] 지정한 게시글들의 like_count 를 실제 post_likes 개수로 다시 계산합니다.
+        값이 어긋난 행만 수정하고 그 수를 반환합니다. (counters.LikeCountBuffer.reconcile)
+        """
+        query = text("""
+            UPDATE posts
+            SET like_count = (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id)
+            WHERE id IN :post_ids
+              AND like_count <> (SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id)
+        """).bindparams(bindparam("post_ids", expanding=True))
+        result = await conn.execute(query, {"post_ids": post_ids})
+        return result.rowcount
+
+    @staticmethod
+    async def get_max_post_id(conn: AsyncConnection):
+        """전체 게시글 중 가장 큰 id (카운터 재계산 배치 범위 계산용)"""
+        result = (await conn.execute(text("SELECT MAX(id) FROM posts"))).fetchone()
+        return result[0] or 0
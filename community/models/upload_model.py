@@ -0,0 +1,22 @@
+# models/upload_model.py
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+class UploadModel:
+
+    @staticmethod
+    async def find_referenced_paths(conn: AsyncConnection, paths: list[str]) -> set[str]:
+        """
+        업로드 파일 경로 중 삭제되지 않은 게시글 이미지나 회원 프로필로 쓰이는 경로 (업로드 정리 작업용)
+        posts.image_url / users.profile_url 인덱스로 경로마다 바로 찾습니다.
+        """
+        if not paths:
+            return set()
+        query = text("""
+            SELECT image_url AS path FROM posts WHERE image_url IN :paths AND deleted_at IS NULL
+            UNION
+            SELECT profile_url AS path FROM users WHERE profile_url IN :paths AND deleted_at IS NULL
+        """).bindparams(bindparam("paths", expanding=True))
+        result = await conn.execute(query, {"paths": paths})
+        return {row.path for row in result}
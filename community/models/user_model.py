@@ -1,248 +1,299 @@
 # models/user_model.py
 import uuid # 세션 ID 생성을 위한 라이브러리
 from security import SecurityUtils
-from sqlalchemy import text
-from database import engine, execute_query
+from sqlalchemy import DateTime, text
+from sqlalchemy.ext.asyncio import AsyncConnection
 from datetime import datetime, timedelta
+import time
+from cache import invalidate_all_posts, session_cache, user_cache
+from database import on_commit
+import config
 
 class UserModel:
     @staticmethod
-    def find_by_email(email: str):
+    def _invalidate_cached_sessions(conn: AsyncConnection, user_id: int):
+        """커밋 후 해당 유저의 캐시된 세션/사용자 정보를 모두 지웁니다. (utils.get_current_user 캐시)"""
+        on_commit(conn, lambda: session_cache.invalidate_where(lambda _, user: user["userId"] == user_id))
+        on_commit(conn, lambda: user_cache.pop(user_id))
+
+    @staticmethod
+    async def find_by_email(conn: AsyncConnection, email: str):
         """이메일로 기존 사용자가 있는지 검색 (중복 체크용)"""
-        with engine.connect() as conn:
-            query = text("""
-                SELECT id, email, nickname, password, profile_url, account_status, suspension_start_at 
-                FROM users 
-                WHERE email = :email AND deleted_at IS NULL
-            """)
-            result = conn.execute(query, {"email": email}).fetchone()
-            
-            if result:
-                # 딕셔너리 형태로 변환해서 리턴
-                return {
-                    "userId": result.id,
-                    "email": result.email,
-                    "nickname": result.nickname,
-                    "password": result.password,
-                    "profileImage": result.profile_url,
-                    "status": result.account_status,
-                    "suspensionStart": result.suspension_start_at
-                }
+        query = text("""
+            SELECT id, email, nickname, password, profile_url, account_status, suspension_start_at 
+            FROM users 
+            WHERE email = :email AND deleted_at IS NULL
+        """)
+        result = (await conn.execute(query, {"email": email})).fetchone()
+        
+        if result:
+            # 딕셔너리 형태로 변환해서 리턴
+            return {
+                "userId": result.id,
+                "email": result.email,
+                "nickname": result.nickname,
+                "password": result.password,
+                "profileImage": result.profile_url,
+                "status": result.account_status,
+                "suspensionStart": result.suspension_start_at
+            }
         return None
 
     @staticmethod
-    def find_by_nickname(nickname: str):
+    async def find_by_nickname(conn: AsyncConnection, nickname: str):
         """닉네임으로 기존 사용자가 있는지 검색 (중복 체크용)"""
-        query = "SELECT * FROM users WHERE nickname = :nickname"
-        result = execute_query(query, {"nickname": nickname})
-        return result[0] if result else None
+        # 비밀번호 해시 등 불필요한 컬럼은 가져오지 않습니다.
+        query = text("SELECT id, nickname, profile_url FROM users WHERE nickname = :nickname")
+        result = (await conn.execute(query, {"nickname": nickname})).fetchone()
+        return dict(result._mapping) if result else None
     
     @staticmethod
-    def find_by_id(user_id: int):
+    async def find_by_id(conn: AsyncConnection, user_id: int):
         """userId로 사용자 검색"""
-        with engine.connect() as conn:
-            query = text("""
-                SELECT id, email, nickname, password, profile_url, account_status, suspension_start_at 
-                FROM users 
-                WHERE id = :user_id AND deleted_at IS NULL
-            """)
-            
-            result = conn.execute(query, {"user_id": user_id}).fetchone()  
-
-            # 2. 결과값을 백엔드에서 쓰기 편한 '딕셔너리' 형태로 직접 매핑해줘
-            if result:
-                return {
-                    "userId": result.id,
-                    "email": result.email,
-                    "nickname": result.nickname,
-                    "password": result.password,
-                    "profileImage": result.profile_url,
-                    "status": result.account_status,
-                }
-            return None
-
-    @staticmethod
-    def save_user(user_data: dict):
+        query = text("""
+            SELECT id, email, nickname, password, profile_url, account_status, suspension_start_at 
+            FROM users 
+            WHERE id = :user_id AND deleted_at IS NULL
+        """)
+        
+        result = (await conn.execute(query, {"user_id": user_id})).fetchone()  
+
+        # 2. 결과값을 백엔드에서 쓰기 편한 '딕셔너리' 형태로 직접 매핑해줘
+        if result:
+            return {
+                "userId": result.id,
+                "email": result.email,
+                "nickname": result.nickname,
+                "password": result.password,
+                "profileImage": result.profile_url,
+                "status": result.account_status,
+            }
+        return None
+
+    @staticmethod
+    async def save_user(conn: AsyncConnection, user_data: dict):
         """회원가입: 사용자 정보를 리스트에 저장"""
         # 비밀번호 해싱 처리
-        hashed_password = SecurityUtils.get_password_hash(user_data["password"])
-        
-        # 2. DB 연결 및 쿼리 실행
-        with engine.connect() as conn:
-            # text()를 이용해 Raw SQL 작성
-            query = text("""
-                INSERT INTO users (email, password, nickname, profile_url, account_status)
-                VALUES (:email, :password, :nickname, :profile_url, 'active')
-            """)
-            
-            params = {
-                "email": user_data["email"],
-                "password": hashed_password,
-                "nickname": user_data["nickname"],
-                "profile_url": user_data.get("profileImage")  # profileImage 키로 받아서 profile_url 컬럼에 저장
-            }
-            
-            # 3. 쿼리 실행 및 커밋
-            conn.execute(query, params)
-            conn.commit()  # 데이터 변경 작업이므로 반드시 커밋이 필요합니다.
-            
+        hashed_password = await SecurityUtils.get_password_hash_async(user_data["password"])
+        
+        # 2. text()를 이용해 Raw SQL 작성
+        query = text("""
+            INSERT INTO users (email, password, nickname, profile_url, account_status)
+            VALUES (:email, :password, :nickname, :profile_url, 'active')
+        """)
+        
+        params = {
+            "email": user_data["email"],
+            "password": hashed_password,
+            "nickname": user_data["nickname"],
+            "profile_url": user_data.get("profileImage")  # profileImage 키로 받아서 profile_url 컬럼에 저장
+        }
+        
+        # 3. 쿼리 실행 (커밋은 요청 단위 트랜잭션이 끝날 때 한 번에 처리됩니다)
+        await conn.execute(query, params)
+        
         return True
 
     @staticmethod
-    def update_user(user_id: int, update_data: dict):
+    async def update_user(conn: AsyncConnection, user_id: int, update_data: dict):
         '''회원 정보 수정'''
-        with engine.connect() as conn:
-            # 1. SQL 문을 text()로 감쌉니다.
-            query = text("""
-                UPDATE users 
-                SET nickname = :nickname, 
-                    profile_url = :profile_url 
-                WHERE Id = :user_id
-            """)
-            
-            # 2. 파라미터 준비
-            params = {
-                "nickname": update_data.get("nickname"),
-                "profile_url": update_data.get("profile_url"),
-                "user_id": user_id
-            }
-            
-            # 3. 쿼리 실행
-            result = conn.execute(query, params)
-            
-            # 4. 데이터 변경 사항을 확정(Commit)합니다.
-            conn.commit()
-            
-            # rowcount를 사용하여 실제 수정된 행이 있는지 확인 (성공 시 True 리턴)
-            return result.rowcount > 0
-
-    @staticmethod
-    def update_password(user_id: int, new_password: str):
+        # 1. SQL 문을 text()로 감쌉니다.
+        query = text("""
+            UPDATE users 
+            SET nickname = :nickname, 
+                profile_url = :profile_url 
+            WHERE Id = :user_id
+        """)
+        
+        # 2. 파라미터 준비
+        params = {
+            "nickname": update_data.get("nickname"),
+            "profile_url": update_data.get("profile_url"),
+            "user_id": user_id
+        }
+        
+        # 3. 쿼리 실행
+        result = await conn.execute(query, params)
+        
+        # 캐시된 세션 정보의 닉네임/프로필도 바뀌어야 하므로 무효화
+        UserModel._invalidate_cached_sessions(conn, user_id)
+        # 게시글 캐시에도 작성자 닉네임/프로필이 들어 있으므로 비웁니다.
+        on_commit(conn, invalidate_all_posts)
+
+        # rowcount를 사용하여 실제 수정된 행이 있는지 확인 (성공 시 True 리턴)
+        return result.rowcount > 0
+
+    @staticmethod
+    async def update_password(conn: AsyncConnection, user_id: int, new_password: str):
         '''비밀번호 변경'''
         # 1. 새 비밀번호 해싱
-        hashed_pw = SecurityUtils.get_password_hash(new_password)
-        
-        # 2. DB 연결 및 실행
-        with engine.connect() as conn:
-            query = text("UPDATE users SET password = :password WHERE id = :user_id")
-            params = {"password": hashed_pw, "user_id": user_id}
-            
-            result = conn.execute(query, params)
-            conn.commit()  # 변경 사항 확정
-            
-            # 영향을 받은 행이 1개 이상이면 성공(True)
-            return result.rowcount > 0
+        hashed_pw = await SecurityUtils.get_password_hash_async(new_password)
+        
+        # 2. 쿼리 실행
+        query = text("UPDATE users SET password = :password WHERE id = :user_id")
+        params = {"password": hashed_pw, "user_id": user_id}
+        
+        result = await conn.execute(query, params)
+        
+        # 영향을 받은 행이 1개 이상이면 성공(True)
+        return result.rowcount > 0
     
     @staticmethod
-    def delete_session(session_id: str):
-        """세션 ID에 해당하는 세션을 삭제합니다."""
-        with engine.connect() as conn:
-            # SQL 문 작성
-            query = text("DELETE FROM sessions WHERE session_id = :session_id")
-            
-            # 쿼리 실행
-            conn.execute(query, {"session_id": session_id})
-            
-            # 삭제 작업이므로 반드시 커밋
-            conn.commit()
+    async def delete_user(conn: AsyncConnection, user_id: int):
+        '''회원 탈퇴'''
+        # 1. 실제 삭제 대신 deleted_at 컬럼에 현재 시간을 기록합니다.
+
+        # 1. 유저 계정 소프트 딜리트
+        query_user = text("UPDATE users SET deleted_at = NOW() WHERE id = :user_id")
+        await conn.execute(query_user, {"user_id": user_id})
+        
+        # 2. 작성한 게시글 처리 (선택: 삭제하거나 '알 수 없음'으로 변경)
+        # 여기서는 게시글도 소프트 딜리트 처리합니다.
+        query_posts = text("UPDATE posts SET deleted_at = NOW() WHERE user_id = :user_id")
+        await conn.execute(query_posts, {"user_id": user_id})
+        
+        # 3. 작성한 댓글 처리 (다른 사람 게시글의 댓글 카운터를 먼저 줄여 둡니다)
+        query_comment_counts = text("""
+            UPDATE posts
+            SET comment_count = comment_count - (
+                SELECT COUNT(*) FROM comments c
+                WHERE c.post_id = posts.id AND c.user_id = :user_id AND c.deleted_at IS NULL
+            )
+            WHERE id IN (SELECT post_id FROM comments WHERE user_id = :user_id AND deleted_at IS NULL)
+        """)
+        await conn.execute(query_comment_counts, {"user_id": user_id})
+        query_comments = text("UPDATE comments SET deleted_at = NOW() WHERE user_id = :user_id")
+        await conn.execute(query_comments, {"user_id": user_id})
+        
+        # 4. 좋아요 처리 (좋아요는 보통 즉시 삭제합니다, 카운터도 함께 감소)
+        query_like_counts = text("""
+            UPDATE posts
+            SET like_count = like_count - (
+                SELECT COUNT(*) FROM post_likes pl WHERE pl.post_id = posts.id AND pl.user_id = :user_id
+            )
+            WHERE id IN (SELECT post_id FROM post_likes WHERE user_id = :user_id)
+        """)
+        await conn.execute(query_like_counts, {"user_id": user_id})
+        query_likes = text("DELETE FROM post_likes WHERE user_id = :user_id")
+        await conn.execute(query_likes, {"user_id": user_id})
+
+        # 탈퇴한 계정의 세션이 캐시에 남아 계속 인증되지 않도록 무효화 (작성한 글도 캐시에서 사라져야 함)
+        UserModel._invalidate_cached_sessions(conn, user_id)
+        on_commit(conn, invalidate_all_posts)
 
     @staticmethod
-    def delete_user(user_id: int):
-        '''회원 탈퇴'''
-        with engine.connect() as conn:
-            # 1. 실제 삭제 대신 deleted_at 컬럼에 현재 시간을 기록합니다.
-
-            # 1. 유저 계정 소프트 딜리트
-            query_user = text("UPDATE users SET deleted_at = NOW() WHERE id = :user_id")
-            conn.execute(query_user, {"user_id": user_id})
-            
-            # 2. 작성한 게시글 처리 (선택: 삭제하거나 '알 수 없음'으로 변경)
-            # 여기서는 게시글도 소프트 딜리트 처리합니다.
-            query_posts = text("UPDATE posts SET deleted_at = NOW() WHERE user_id = :user_id")
-            conn.execute(query_posts, {"user_id": user_id})
-            
-            # 3. 작성한 댓글 처리
-            query_comments = text("UPDATE comments SET deleted_at = NOW() WHERE user_id = :user_id")
-            conn.execute(query_comments, {"user_id": user_id})
-            
-            # 4. 좋아요 처리 (좋아요는 보통 즉시 삭제합니다)
-            query_likes = text("DELETE FROM post_likes WHERE user_id = :user_id")
-            conn.execute(query_likes, {"user_id": user_id})
-
-            conn.commit()
-
-    @staticmethod
-    def create_session(user_id: str):
+    async def create_session(conn: AsyncConnection, user_id: str):
         """새로운 세션 ID를 생성하고 저장합니다."""
         session_id = str(uuid.uuid4())
-        expire_time = datetime.now() + timedelta(hours=1)
+        expire_time = datetime.now() + timedelta(seconds=config.SESSION_TTL)
     
-        with engine.connect() as conn:
-            query = text("""
-                INSERT INTO sessions (user_id, session_id, expired_at) 
-                VALUES (:user_id, :session_id, :expired_at)
-            """)
-            
-            conn.execute(query, {
-                "user_id": user_id, 
-                "session_id": session_id,
-                "expired_at": expire_time # 만료 시간 추가
-            })
-            conn.commit()
-            
+        query = text("""
+            INSERT INTO sessions (user_id, session_id, expired_at) 
+            VALUES (:user_id, :session_id, :expired_at)
+        """)
+        
+        await conn.execute(query, {
+            "user_id": user_id, 
+            "session_id": session_id,
+            "expired_at": expire_time # 만료 시간 추가
+        })
+        
         return session_id
     
     @staticmethod
-    def get_user_by_session(session_id: str):
-        """세션 ID로 사용자 정보를 조회합니다."""
-        with engine.connect() as conn:
+    async def get_user_by_session(conn: AsyncConnection, session_id: str):
+        """세션 ID로 사용자 정보와 세션 만료 시각(expiredAt, 캐시 만료 계산용)을 조회합니다."""
         # 1. SQL 작성 (users와 sessions 테이블을 email로 조인)
-            query = text("""
-            SELECT u.* FROM users u
-            JOIN sessions s ON u.id = s.user_id
-            WHERE s.session_id = :session_id
-            """)
-            
-            # 2. 실행 및 한 줄 가져오기
-            result = conn.execute(query, {"session_id": session_id}).fetchone()
-            
-            # 3. 결과가 있으면 매핑하여 반환
-            if result:
-                row = result._mapping
-                # DB 컬럼명에 맞춰 결과 반환 (필요한 것 위주로)
-                return {
-                    "userId": row["id"],
-                    "email": row["email"],
-                    "nickname": row["nickname"],
-                    "profileImage": row.get("profile_url") or row.get("profileImage"),
-                    "status": row.get("account_status", "active")
-                }
+        query = text("""
+        SELECT u.*, s.expired_at AS session_expired_at FROM users u
+        JOIN sessions s ON u.id = s.user_id
+        WHERE s.session_id = :session_id AND s.expired_at > NOW()
+        """).columns(session_expired_at=DateTime)
+        
+        # 2. 실행 및 한 줄 가져오기
+        result = (await conn.execute(query, {"session_id": session_id})).fetchone()
+        
+        # 3. 결과가 있으면 매핑하여 반환
+        if result:
+            row = result._mapping
+            # DB 컬럼명에 맞춰 결과 반환 (필요한 것 위주로)
+            return {
+                "userId": row["id"],
+                "email": row["email"],
+                "nickname": row["nickname"],
+                "profileImage": row.get("profile_url") or row.get("profileImage"),
+                "status": row.get("account_status", "active"),
+                "expiredAt": row["session_expired_at"]
+            }
+        return None
+
+    @staticmethod
+    async def find_session_user(conn: AsyncConnection, user_id: int):
+        """[token 모드] 토큰 검증에 필요한 사용자 정보와 세션 무효화 기준 시각을 조회합니다."""
+        query = text("""
+            SELECT id, email, nickname, profile_url, account_status, sessions_valid_after
+            FROM users
+            WHERE id = :user_id AND deleted_at IS NULL
+        """)
+        result = (await conn.execute(query, {"user_id": user_id})).fetchone()
+
+        if result:
+            return {
+                "userId": result.id,
+                "email": result.email,
+                "nickname": result.nickname,
+                "profileImage": result.profile_url,
+                "status": result.account_status,
+                "sessionsValidAfter": result.sessions_valid_after,
+            }
         return None
 
     @staticmethod
-    def is_already_logged_in(email: str):
+    async def revoke_sessions(conn: AsyncConnection, user_id: int):
+        """[token 모드 로그아웃/비밀번호 변경용] 지금까지 발급된 해당 유저의 토큰을 모두 무효화"""
+        query = text("UPDATE users SET sessions_valid_after = :now_ms WHERE id = :user_id")
+        await conn.execute(query, {"now_ms": int(time.time() * 1000), "user_id": user_id})
+        UserModel._invalidate_cached_sessions(conn, user_id)
+
+    @staticmethod
+    async def is_already_logged_in(conn: AsyncConnection, email: str):
         """[409 체크용] 이메일이 세션 저장소에 이미 있는지 확인"""
-        with engine.connect() as conn:
-            # 2. 이제 이 안에서는 'conn'을 사용할 수 있습니다.
-            # (sessions 테이블의 컬럼명에 맞춰 query를 작성하세요)
-            query = text("SELECT user_id FROM sessions WHERE user_id = (SELECT id FROM users WHERE email = :email) AND expired_at > NOW()")
-            result = conn.execute(query, {"email": email}).fetchone()
-            
-            return True if result else False
+        # 탈퇴 후 같은 이메일로 재가입한 경우 users 행이 여러 개일 수 있으므로 서브쿼리 대신 조인합니다.
+        query = text("""
+            SELECT 1 FROM users u
+            JOIN sessions s ON s.user_id = u.id
+            WHERE u.email = :email AND u.deleted_at IS NULL AND s.expired_at > NOW()
+            LIMIT 1
+        """)
+        result = (await conn.execute(query, {"email": email})).fetchone()
+        
+        return True if result else False
         
 
     @staticmethod
-    def delete_session(session_id: str):
+    async def delete_session(conn: AsyncConnection, session_id: str):
         """[로그아웃용] 특정 세션 하나만 삭제"""
-        with engine.connect() as conn:
-            query = text("DELETE FROM sessions WHERE session_id = :session_id")
-            conn.execute(query, {"session_id": session_id})
-            conn.commit()
+        query = text("DELETE FROM sessions WHERE session_id = :session_id")
+        await conn.execute(query, {"session_id": session_id})
+        on_commit(conn, lambda: session_cache.pop(session_id))
 
     @staticmethod
-    def delete_all_sessions_by_user(user_id: int):
+    async def delete_all_sessions_by_user(conn: AsyncConnection, user_id: int):
         """[비밀번호 변경용] 해당 유저의 모든 기기 세션 삭제 (TRUNCATE 효과)"""
-        with engine.connect() as conn:
-            query = text("DELETE FROM sessions WHERE user_id = :user_id")
-            conn.execute(query, {"user_id": user_id})
-            conn.commit()
\ No newline at end of file
+        query = text("DELETE FROM sessions WHERE user_id = :user_id")
+        await conn.execute(query, {"user_id": user_id})
+        UserModel._invalidate_cached_sessions(conn, user_id)
+
+    @staticmethod
+    async def delete_expired_sessions(conn: AsyncConnection, batch_size: int):
+        """[세션 정리 작업용] 만료된 세션을 오래된 것부터 최대 batch_size 개 삭제하고 삭제한 개수를 반환"""
+        # MySQL은 IN 서브쿼리에 LIMIT을 쓸 수 없어 파생 테이블로 한 번 더 감쌉니다.
+        query = text("""
+            DELETE FROM sessions WHERE id IN (
+                SELECT id FROM (
+                    SELECT id FROM sessions WHERE expired_at <= NOW() ORDER BY expired_at LIMIT :batch_size
+                ) AS expired
+            )
+        """)
+        result = await conn.execute(query, {"batch_size": batch_size})
+        return result.rowcount
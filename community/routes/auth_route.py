@@ -1,5 +1,7 @@
 # routes/auth_route.py
 from fastapi import APIRouter, Response, Request, Depends
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import get_db
 from controllers.auth_controller import AuthController
 from utils import UserSignupRequest, UserLoginRequest, BaseResponse, limiter, get_current_user, UserInfo, UserUpdateRequest, PasswordChangeRequest
 
@@ -7,14 +9,14 @@ router = APIRouter(prefix="/api/v1/auth")
 
 @router.post("/signup", status_code=201, response_model=BaseResponse)
 @limiter.limit("5/minute")  # 분당 5회로 제한
-async def signup(request: Request, response: Response, user_request: UserSignupRequest):
-    return AuthController.signup(user_request, response)
+async def signup(request: Request, response: Response, user_request: UserSignupRequest, db: AsyncConnection = Depends(get_db, scope="function")):
+    return await AuthController.signup(db, user_request, response)
 
 @router.post("/login", response_model=BaseResponse)
 @limiter.limit("10/minute")  # 분당 10회로 제한
-async def login(request: Request, response: Response, user_request: UserLoginRequest):
+async def login(request: Request, response: Response, user_request: UserLoginRequest, db: AsyncConnection = Depends(get_db, scope="function")):
 
-    session_id, response_obj = AuthController.login(user_request, response)
+    session_id, response_obj = await AuthController.login(db, user_request, response)
 
     response.set_cookie(key="session_id", value=session_id, httponly=True)
     
@@ -25,18 +27,19 @@ async def logout(
     request: Request, 
     response: Response,
     # 로그인 여부 체크 (로그인 안 한 사람은 로그아웃도 못함)
-    user: UserInfo = Depends(get_current_user) 
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
     # 쿠키에서 직접 session_id를 꺼냅니다.
     session_id = request.cookies.get("session_id")
     
-    return AuthController.logout(session_id, response)
+    return await AuthController.logout(db, session_id, user, response)
 
 @router.get("/check-duplicate")
-async def check_duplicate(type: str, value: str):
+async def check_duplicate(type: str, value: str, db: AsyncConnection = Depends(get_db, scope="function")):
     """
     회원가입 전 이메일/닉네임 중복 여부를 확인하는 API
     type: 'email' 또는 'nickname'
     value: 중복을 확인할 값
     """
-    return AuthController.check_duplicate(type, value)
+    return await AuthController.check_duplicate(db, type, value)
@@ -1,5 +1,7 @@
 # routes/comment_route.py
-from fastapi import APIRouter, Path, Response, Depends, Request
+from fastapi import APIRouter, Path, Query, Response, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import get_db
 from controllers.comment_controller import CommentController
 from utils import BaseResponse, CommentCreateRequest, UserInfo, get_current_user, limiter, CommentUpdateRequest
 
@@ -11,9 +13,12 @@ router = APIRouter(prefix="/api/v1/comments")
 async def get_comments(
     request: Request,
     post_id: int = Path(..., ge=1),
-    user: UserInfo = Depends(get_current_user)
+    lastCommentId: int = Query(None, ge=1, description="마지막으로 확인한 댓글 ID"),
+    size: int = Query(20, ge=1, le=100, description="가져올 댓글 개수"),
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return CommentController.get_comments(post_id)
+    return await CommentController.get_comments(db, post_id, lastCommentId, size)
 
 # 2. 댓글 작성 (로그인 필수)
 @router.post("/posts/{post_id}", status_code=201, response_model=BaseResponse)
@@ -23,9 +28,10 @@ async def create_comment(
     response: Response,
     comment_request: CommentCreateRequest,
     post_id: int = Path(..., ge=1),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return CommentController.create_comment(post_id, comment_request, user, response)
+    return await CommentController.create_comment(db, post_id, comment_request, user, response)
 
 # 3. 댓글 수정
 @router.put("/{comment_id}", response_model=BaseResponse)
@@ -35,9 +41,10 @@ async def update_comment(
     response: Response,
     comment_request: CommentUpdateRequest, # Body 데이터 (content)
     comment_id: int = Path(..., ge=1),     # Path 파라미터
-    user: UserInfo = Depends(get_current_user) # 로그인 필수
+    user: UserInfo = Depends(get_current_user), # 로그인 필수
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return CommentController.update_comment(comment_id, comment_request, user, response)
+    return await CommentController.update_comment(db, comment_id, comment_request, user, response)
 
 # 3. 댓글 삭제 (로그인 필수)
 @router.delete("/{comment_id}", response_model=BaseResponse)
@@ -45,6 +52,7 @@ async def update_comment(
 async def delete_comment(
     request: Request,
     comment_id: int = Path(..., ge=1),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return CommentController.delete_comment(comment_id, user)
\ No newline at end of file
+    return await CommentController.delete_comment(db, comment_id, user)
\ No newline at end of file
@@ -1,5 +1,7 @@
 # routes/like_route.py
 from fastapi import APIRouter, Path, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import get_db
 from controllers.like_controller import LikeController
 from utils import BaseResponse, UserInfo, get_current_user, limiter
 
@@ -13,9 +15,10 @@ async def add_like(
     request: Request,
     response: Response,
     post_id: int = Path(..., ge=1, description="게시글 ID"),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return LikeController.add_like(post_id, user, response)
+    return await LikeController.add_like(db, post_id, user, response)
 
 # 2. 좋아요 취소 (DELETE)
 @router.delete("/posts/{post_id}/likes", response_model=BaseResponse)
@@ -24,6 +27,7 @@ async def remove_like(
     request: Request,
     response: Response,
     post_id: int = Path(..., ge=1, description="게시글 ID"),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return LikeController.remove_like(post_id, user, response)
+    return await LikeController.remove_like(db, post_id, user, response)
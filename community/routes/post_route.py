@@ -1,7 +1,9 @@
 # routes/post_route.py
 from fastapi import APIRouter, Query, Path, Response, Depends, Request, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import get_db
 from controllers.post_controller import PostController
-from utils import BaseResponse, get_current_user, UserInfo, PostCreateRequest, PostUpdateRequest, limiter
+from utils import BaseResponse, get_current_user, get_optional_user, UserInfo, PostCreateRequest, PostUpdateRequest, UploadPresignRequest, limiter
 
 # router = APIRouter(prefix="/api/v1")
 router = APIRouter(
@@ -16,10 +18,12 @@ async def get_all_posts(
     request: Request,
     response: Response,
     lastPostId: int = Query(None, description="마지막으로 확인한 게시물 ID"),
-    size: int = Query(10, ge=0, le=100, description="가져올 게시글 개수")
+    size: int = Query(10, ge=0, le=100, description="가져올 게시글 개수"),
+    user: UserInfo | None = Depends(get_optional_user),  # 로그인 상태면 글마다 isLiked 표시
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
     # Controller를 통해 데이터를 가져옵니다.    
-    return PostController.get_posts(lastPostId, size, response)
+    return await PostController.get_posts(db, lastPostId, size, response, user)
 
 # 상세 게시물 조회
 @router.get("/posts/{post_id}", response_model=BaseResponse)
@@ -28,9 +32,10 @@ async def get_post_detail(
     request: Request,
     response: Response,
     post_id: int = Path(..., ge=1, description="게시글 ID (1 이상)"),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return PostController.get_post_detail(post_id, response, user)
+    return await PostController.get_post_detail(db, post_id, response, user)
 
 # 게시물 추가
 @router.post("/posts", status_code=201, response_model=BaseResponse)
@@ -39,10 +44,11 @@ async def create_post(
     request: Request,
     response: Response,
     post_request: PostCreateRequest,
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
     # 컨트롤러에게 요청 데이터와 유저 정보를 함께 넘김
-    return PostController.create_post(post_request, user, response)
+    return await PostController.create_post(db, post_request, user, response)
 
 @router.post("/posts/upload", response_model=BaseResponse)
 async def upload_post_image(
@@ -52,6 +58,14 @@ async def upload_post_image(
     # PostController에 이미지 저장 로직을 요청합니다.
     return await PostController.upload_image(image)
 
+# 저장소 직접 업로드 주소 발급 (STORAGE_BACKEND=s3)
+@router.post("/posts/upload/presign", response_model=BaseResponse)
+async def presign_post_image(
+    presign_request: UploadPresignRequest,
+    user: UserInfo = Depends(get_current_user)
+):
+    return await PostController.presign_image_upload(presign_request)
+
 # 게시물 수정
 @router.put("/posts/{post_id}", response_model=BaseResponse)
 @limiter.limit("10/minute")  # 분당 10회로 제한
@@ -61,9 +75,10 @@ async def update_post(
     post_request: PostUpdateRequest,
     # 1. Path 파라미터로 수정할 글 번호를 받음
     post_id: int = Path(..., ge=1, description="게시글 ID"),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return PostController.update_post(post_id, post_request, user, response)
+    return await PostController.update_post(db, post_id, post_request, user, response)
 
 # 게시물 삭제
 @router.delete("/posts/{post_id}", response_model=BaseResponse)
@@ -72,6 +87,7 @@ async def delete_post(
     request: Request,
     response: Response,
     post_id: int = Path(..., ge=1, description="삭제할 게시글 ID"),
-    user: UserInfo = Depends(get_current_user)
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return PostController.delete_post(post_id, user, response)
\ No newline at end of file
+    return await PostController.delete_post(db, post_id, user, response)
\ No newline at end of file
@@ -1,7 +1,9 @@
 # routes/user_route.py
 from fastapi import APIRouter, Path, Request, Depends, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import get_db
 from controllers.user_controller import UserController
-from utils import BaseResponse, UserInfo, UserUpdateRequest, PasswordChangeRequest, get_current_user, limiter
+from utils import BaseResponse, UserInfo, UserUpdateRequest, PasswordChangeRequest, UploadPresignRequest, get_current_user, limiter
 
 router = APIRouter(prefix="/api/v1/users")
 
@@ -11,9 +13,10 @@ router = APIRouter(prefix="/api/v1/users")
 async def get_user_info(
     request: Request,
     userId: int = Path(..., ge=1, description="사용자 ID"),
-    current_user: UserInfo = Depends(get_current_user)
+    current_user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return UserController.get_user_info(userId, current_user)
+    return await UserController.get_user_info(db, userId, current_user)
 
 # 2. 회원 정보 수정 (닉네임, 프로필 등)
 @router.put("/{userId}", response_model=BaseResponse)
@@ -22,15 +25,24 @@ async def update_user_info(
     request: Request,
     user_request: UserUpdateRequest,
     userId: int = Path(..., ge=1),
-    current_user: UserInfo = Depends(get_current_user)
+    current_user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return UserController.update_user_info(userId, user_request, current_user)
+    return await UserController.update_user_info(db, userId, user_request, current_user)
 
 @router.post("/upload-profile")
 async def upload_profile_image(file: UploadFile = File(...)):
     # 로직은 컨트롤러에게 전적으로 맡깁니다.
     return await UserController.upload_profile(file)
 
+# 프로필 이미지 저장소 직접 업로드 주소 발급 (STORAGE_BACKEND=s3, 로그인한 사용자만)
+@router.post("/upload-profile/presign", response_model=BaseResponse)
+async def presign_profile_image(
+    presign_request: UploadPresignRequest,
+    current_user: UserInfo = Depends(get_current_user)
+):
+    return await UserController.presign_profile_upload(presign_request)
+
 # 3. 비밀번호 변경
 @router.put("/{userId}/password", response_model=BaseResponse)
 @limiter.limit("5/minute")
@@ -38,9 +50,10 @@ async def change_password(
     request: Request,
     password_request: PasswordChangeRequest,
     userId: int = Path(..., ge=1),
-    current_user: UserInfo = Depends(get_current_user)
+    current_user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return UserController.change_password(userId, password_request, current_user)
+    return await UserController.change_password(db, userId, password_request, current_user)
 
 # 4. 회원 탈퇴
 @router.delete("/{userId}", response_model=BaseResponse)
@@ -48,6 +61,7 @@ async def change_password(
 async def delete_account(
     request: Request,
     userId: int = Path(..., ge=1),
-    current_user: UserInfo = Depends(get_current_user)
+    current_user: UserInfo = Depends(get_current_user),
+    db: AsyncConnection = Depends(get_db, scope="function")
 ):
-    return UserController.delete_account(userId, current_user)
\ No newline at end of file
+    return await UserController.delete_account(db, userId, current_user)
\ No newline at end of file
@@ -1,8 +1,69 @@
 # security.py
+import asyncio
+import base64
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+import config
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class PasswordHashBusyError(Exception):
+    """해싱 대기열이 가득 찼을 때 발생합니다. (main.py 에서 503 SERVER_BUSY 로 응답)"""
+
+
+class PasswordHashPool:
+    """
+    bcrypt 해싱/검증을 전용 스레드 풀에서 실행합니다. (bcrypt는 계산 중 GIL을 놓으므로 스레드로 충분)
+    실행 중 + 대기 중인 작업이 max_pending 개를 넘으면 더 쌓지 않고 바로 거절해,
+    로그인이 몰릴 때 대기열이 끝없이 길어져 모든 요청이 타임아웃되는 것을 막습니다.
+    """
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash") if workers > 0 else None
+        )
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHashBusyError()
+
+        self.pending += 1
+        try:
+            if self._executor is None:
+                return func(*args)  # workers=0: 이벤트 루프에서 바로 실행 (이전 방식, 벤치마크 비교용)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "maxPending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hash_pool = PasswordHashPool(config.PASSWORD_HASH_WORKERS, config.PASSWORD_HASH_MAX_PENDING)
+
+
 class SecurityUtils:
     @staticmethod
     def get_password_hash(password: str) -> str:
@@ -10,4 +71,46 @@ class SecurityUtils:
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+        return pwd_context.verify(plain_password, hashed_password)
+
+    # async 라우트에서는 아래 메서드를 사용합니다. (이벤트 루프를 막지 않음, 과부하 시 PasswordHashBusyError)
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        return await password_hash_pool.run(SecurityUtils.get_password_hash, password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return await password_hash_pool.run(SecurityUtils.verify_password, plain_password, hashed_password)
+
+
+class SessionTokenUtils:
+    """
+    SESSION_MODE=token 에서 사용하는 서명 세션 토큰
+    형식: "{userId}.{발급 시각(ms)}.{만료 시각(s)}.{HMAC-SHA256 서명}"
+    서명만 확인하면 되므로 DB 조회 없이 검증할 수 있습니다.
+    """
+    @staticmethod
+    def _sign(payload: str) -> str:
+        digest = hmac.new(config.SESSION_SECRET.encode(), payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    @staticmethod
+    def create_token(user_id: int) -> str:
+        issued_at = int(time.time() * 1000)
+        expires_at = int(time.time()) + config.SESSION_TTL
+        payload = f"{user_id}.{issued_at}.{expires_at}"
+        return f"{payload}.{SessionTokenUtils._sign(payload)}"
+
+    @staticmethod
+    def verify_token(token: str) -> dict | None:
+        """서명과 만료 시각이 올바르면 {"userId", "issuedAt"}를, 아니면 None을 반환합니다."""
+        payload, _, signature = token.rpartition(".")
+        if not hmac.compare_digest(signature.encode(), SessionTokenUtils._sign(payload).encode()):
+            return None
+        try:
+            user_id, issued_at, expires_at = (int(part) for part in payload.split("."))
+        except ValueError:
+            return None
+        if expires_at <= time.time():
+            return None
+        return {"userId": user_id, "issuedAt": issued_at}
@@ -0,0 +1,102 @@
+# serializers.py
+import json
+from datetime import date, datetime
+from functools import lru_cache
+
+from starlette.responses import JSONResponse
+
+import config
+from cache import TTLCache
+from images import image_pipeline
+
+# orjson 이 없으면 표준 json 으로 직렬화합니다. (결과는 같고 속도만 느림)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_PROFILE_PATH = "/public/images/default-profile.png"
+
+# /public 파일을 받을 주소 (CDN 이 있으면 CDN, 없으면 API 서버)
+ASSET_BASE_URL = (config.CDN_BASE_URL or config.BASE_URL).rstrip("/")
+
+# (원본 경로, 파생 이미지 이름) -> 전체 주소 (파생 이미지 이름은 바뀌지 않으므로 오래 캐시)
+image_url_cache = TTLCache("image_url", maxsize=config.URL_CACHE_SIZE, ttl=3600.0)
+PENDING_IMAGE_URL_TTL = 5.0  # 파생 이미지가 아직 없을 때 (images.ImagePipeline.get_manifest 의 negative_ttl 과 같음)
+
+
+@lru_cache(maxsize=config.URL_CACHE_SIZE)
+def asset_url(path: str | None) -> str | None:
+    """
+    DB 에 저장된 경로를 클라이언트가 받을 전체 주소로 바꿉니다. (없으면 None, S3 등 절대 주소는 그대로)
+    피드의 프로필/썸네일 경로는 페이지마다 반복되므로 결과를 캐시해 문자열을 다시 만들지 않습니다.
+    """
+    if not path:
+        return None
+    if path.startswith(("http://", "https://")):
+        return path
+    return f"{ASSET_BASE_URL}{path}"
+
+
+def profile_image_url(path: str | None) -> str:
+    """프로필 이미지 주소 (없으면 기본 프로필 이미지)"""
+    return asset_url(path or DEFAULT_PROFILE_PATH)
+
+
+async def image_url(path: str | None, variant: str) -> str | None:
+    """
+    원본 경로 대신 variant 크기 파생 이미지의 전체 주소 (아직 없으면 원본 주소)
+    피드 한 페이지에서 글마다 매니페스트를 찾지 않도록 (경로, 크기) -> 주소를 캐시합니다.
+    파생 이미지가 아직 없어 원본을 가리키는 동안은 만들어지면 바로 바뀌도록 짧게만 캐시합니다.
+    """
+    if not path:
+        return None
+    key = (path, variant)
+    url = image_url_cache.get(key)
+    if url is None:
+        resolved = await image_pipeline.resolve(path, variant)
+        url = asset_url(resolved)
+        image_url_cache.set(key, url, ttl=None if resolved != path else PENDING_IMAGE_URL_TTL)
+    return url
+
+
+async def avatar_url(path: str | None) -> str:
+    """목록/댓글의 작은 프로필 이미지 주소 (avatar 파생 이미지, 없으면 기본 프로필 이미지)"""
+    return await image_url(path, "avatar") or asset_url(DEFAULT_PROFILE_PATH)
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON 으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+
+class TrustedJSONResponse(JSONResponse):
+    """
+    컨트롤러가 직접 만든 dict/list/str/int/datetime 으로만 된 응답을 그대로 직렬화합니다.
+
+    라우트의 response_model(BaseResponse) 은 응답 객체를 반환하면 적용되지 않으므로,
+    Pydantic 검증과 jsonable_encoder 변환을 건너뛰고 orjson 으로 한 번에 bytes 를 만듭니다.
+    datetime 은 FastAPI 와 같은 ISO 형식으로 나갑니다. 요청 데이터나 모델 객체를 그대로 넣지 마세요.
+    """
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def trusted_response(message: str, data=None, status_code: int = 200) -> TrustedJSONResponse:
+    """{"message", "data"} 표준 응답을 검증 없이 바로 만듭니다. (조회가 많은 목록/상세 API용)"""
+    return TrustedJSONResponse({"message": message, "data": data}, status_code=status_code)
+
+
+def url_cache_stats() -> dict:
+    info = asset_url.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hitRate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,115 @@
+# static_files.py
+import asyncio
+import os
+import stat
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from images import CONTENT_ADDRESSED_FILE
+
+# 해시 이름 파일은 이름이 같으면 내용도 같으므로 1년 동안 다시 확인하지 않도록 합니다.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 미리 압축해 둔 파일(x.json.br, x.svg.gz)을 찾아볼 확장자 (이미지는 이미 압축된 형식이라 제외)
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".json", ".svg", ".txt", ".html")
+# (Accept-Encoding 이름, 파일 확장자) - 앞의 것을 우선합니다.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """'gzip, br;q=0.5, deflate;q=0' -> {'gzip', 'br'} (q=0 은 거부)"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class PublicStaticFiles(StaticFiles):
+    """
+    /public 정적 파일 (업로드 이미지, 기본 프로필 이미지)
+
+    - 내용 해시 이름 파일(원본 + 파생 이미지)은 Cache-Control: immutable 로 보내 목록을 다시 그릴 때 재요청하지 않게 하고,
+      ETag 도 이름(해시)으로 만듭니다. (같은 이미지를 다시 올리면 수정 시각이 갱신되므로 수정 시각 기반 ETag 는 쓰지 않음)
+    - 그 밖의 파일(기본 프로필, 예전 uuid 이름 파일, 매니페스트)은 STATIC_MAX_AGE 초 뒤 ETag 로 다시 확인합니다.
+    - If-None-Match / If-Modified-Since 가 맞으면 304, Range 요청은 206 으로 필요한 부분만 보냅니다. (FileResponse)
+    - 서버가 http.response.pathsend 확장을 지원하면 파일 경로만 넘겨 서버가 sendfile 로 직접 보냅니다. (FileResponse)
+    - COMPRESSIBLE_EXTENSIONS 파일은 옆에 x.br / x.gz 가 있고 원본보다 새것이면 Accept-Encoding 에 맞춰 그 파일을 보냅니다.
+    """
+    def __init__(self, *args, max_age: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revalidate_cache_control = f"public, max-age={max_age}, must-revalidate"
+
+    async def get_response(self, path: str, scope):
+        if scope["method"] in ("GET", "HEAD") and path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            response = await self._precompressed_response(path, scope)
+            if response is not None:
+                return response
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        return self._cached_file_response(full_path, stat_result, scope, status_code)
+
+    async def _precompressed_response(self, path: str, scope):
+        request_headers = Headers(scope=scope)
+        # Range 는 압축 전 원본 기준으로 요청하는 경우가 많으므로 원본을 그대로 보냅니다.
+        if "range" in request_headers:
+            return None
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            found = await asyncio.to_thread(self._lookup_precompressed, path, suffix)
+            if found is not None:
+                full_path, stat_result = found
+                return self._cached_file_response(
+                    full_path, stat_result, scope, media_type=guess_type(path)[0], encoding=encoding
+                )
+        return None
+
+    def _lookup_precompressed(self, path: str, suffix: str):
+        """압축 파일이 있고 원본보다 오래되지 않았으면 (경로, stat) 를 반환합니다. (원본이 없으면 None -> 404 처리는 원래대로)"""
+        try:
+            _, source_stat = self.lookup_path(path)
+            full_path, stat_result = self.lookup_path(path + suffix)
+        except (OSError, ValueError):
+            return None
+        if (
+            source_stat is None or stat_result is None
+            or not stat.S_ISREG(source_stat.st_mode) or not stat.S_ISREG(stat_result.st_mode)
+            or stat_result.st_mtime < source_stat.st_mtime
+        ):
+            return None
+        return full_path, stat_result
+
+    def _cached_file_response(self, full_path, stat_result, scope, status_code: int = 200,
+                              media_type: str | None = None, encoding: str | None = None):
+        name = os.path.basename(full_path)
+        headers = {}
+        if CONTENT_ADDRESSED_FILE.match(name):
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            headers["etag"] = f'"{name}"'
+        else:
+            headers["cache-control"] = self.revalidate_cache_control
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+        if name.lower().endswith(COMPRESSIBLE_EXTENSIONS) or encoding is not None:
+            headers["vary"] = "Accept-Encoding"
+
+        # etag 를 넣지 않은 경우 FileResponse 가 수정 시각 + 크기로 만듭니다. (압축 파일은 자기 stat 기준이라 원본과 다름)
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
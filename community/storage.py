@@ -0,0 +1,249 @@
+# storage.py
+import asyncio
+import base64
+import os
+
+import config
+from images import (
+    CONTENT_ADDRESSED_NAME, IMAGE_DIR, IMAGE_URL_PREFIX,
+    list_upload_sources, remove_stale_temp_files, remove_upload,
+)
+from static_files import IMMUTABLE_CACHE_CONTROL
+
+# boto3 는 선택 의존성입니다. (pip install ".[s3]") STORAGE_BACKEND=s3 일 때만 필요합니다.
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+
+class LocalStorage:
+    """
+    업로드 파일을 API 서버 디스크(public/images)에 저장합니다. (기본값)
+    presigned 업로드는 지원하지 않으므로 FileService.create_presigned_upload 가 400 으로 응답합니다.
+    파일은 /public 정적 파일로 바로 서빙되고, 파생 이미지도 같은 폴더에 만들어집니다. (images.ImagePipeline)
+    서버를 여러 대로 늘리려면 디스크를 공유하거나 S3Storage 를 사용해야 합니다.
+    """
+    name = "local"
+    supports_presigned_upload = False
+
+    def url_for(self, filename: str) -> str:
+        return f"{IMAGE_URL_PREFIX}{filename}"
+
+    async def put_file(self, temp_path: str, filename: str, content_type: str) -> bool:
+        """임시 파일을 저장소에 올립니다. 같은 이름(같은 내용)이 이미 있으면 올리지 않고 False"""
+        return await asyncio.to_thread(self._commit, temp_path, os.path.join(IMAGE_DIR, filename))
+
+    @staticmethod
+    def _commit(temp_path: str, file_path: str) -> bool:
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+            # 정리 작업의 유예 시간을 다시 시작해, 방금 돌려준 경로가 게시글에 연결되기 전에 지워지지 않게 합니다.
+            os.utime(file_path)
+            return False
+        os.replace(temp_path, file_path)
+        return True
+
+    async def list_stale(self, older_than: float) -> list[str]:
+        """[정리 작업용] 마지막으로 저장/재사용된 시각이 older_than(epoch 초) 이전인 해시 이름 파일의 주소 목록"""
+        return await asyncio.to_thread(list_upload_sources, older_than)
+
+    async def remove(self, url: str, older_than: float) -> int:
+        """[정리 작업용] 파일(과 파생 이미지)을 지우고 지운 파일 수를 반환합니다. 그 사이 다시 저장됐으면 0"""
+        return await asyncio.to_thread(remove_upload, url, older_than)
+
+    async def remove_stale_temp_files(self, older_than: float) -> int:
+        return await asyncio.to_thread(remove_stale_temp_files, older_than)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class S3Storage:
+    """
+    업로드 파일을 S3 호환 오브젝트 스토리지에 저장합니다. (STORAGE_BACKEND=s3)
+
+    - API 서버를 거치는 업로드(save_file)는 받은 파일을 잠깐 디스크에 모은 뒤 올리고 바로 지우며,
+      S3_MULTIPART_THRESHOLD 보다 큰 파일은 여러 조각을 S3_MAX_CONCURRENCY 개 스레드로 동시에 올립니다. (multipart)
+    - create_presigned_upload 로 클라이언트가 파일을 스토리지에 직접 올리게 하면 API 서버는 이미지 바이트를 전혀 받지 않습니다.
+      서명에 크기, 형식, SHA-256 체크섬을 넣으므로 스토리지가 다른 내용이나 크기의 업로드를 거절합니다.
+    - 파일 주소는 S3_PUBLIC_URL(CDN 등) 기준의 절대 주소이고, 파생 이미지는 만들지 않습니다. (원본 주소 그대로 사용)
+    - S3_ENDPOINT_URL 로 MinIO, moto_server 같은 S3 호환 서버를 쓸 수 있습니다. (commands.check_storage 참고)
+    인증 정보는 boto3 기본 방식(AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY 환경 변수, IAM 역할 등)을 따릅니다.
+    """
+    name = "s3"
+    supports_presigned_upload = True
+
+    def __init__(self, bucket: str, prefix: str, endpoint_url: str, region: str, public_url: str,
+                 multipart_threshold: int, multipart_chunk_size: int, max_concurrency: int, presign_ttl: int):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 를 사용하려면 boto3 가 필요합니다. (pip install \".[s3]\")")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.presign_ttl = presign_ttl
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunk_size,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+        if not public_url:
+            public_url = f"{endpoint_url}/{bucket}" if endpoint_url else f"https://{bucket}.s3.{region}.amazonaws.com"
+        self.url_prefix = f"{public_url.rstrip('/')}/{prefix}"
+        self.uploaded = 0
+        self.presigned = 0
+
+    def url_for(self, filename: str) -> str:
+        return f"{self.url_prefix}{filename}"
+
+    def _key_for(self, url: str) -> str | None:
+        if not url.startswith(self.url_prefix):
+            return None
+        return f"{self.prefix}{url[len(self.url_prefix):]}"
+
+    async def put_file(self, temp_path: str, filename: str, content_type: str) -> bool:
+        try:
+            return await asyncio.to_thread(self._put_file, temp_path, f"{self.prefix}{filename}", content_type)
+        finally:
+            await asyncio.to_thread(_remove_if_exists, temp_path)
+
+    def _put_file(self, temp_path: str, key: str, content_type: str) -> bool:
+        if self._touch_if_exists(key):
+            return False
+        self.client.upload_file(
+            temp_path, self.bucket, key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE_CACHE_CONTROL},
+            Config=self.transfer_config,
+        )
+        self.uploaded += 1
+        return True
+
+    def _touch_if_exists(self, key: str) -> bool:
+        """
+        객체가 있으면 자기 자신으로 복사해 LastModified 를 갱신하고 True 를 반환합니다.
+        (로컬 저장소의 os.utime 처럼 정리 작업의 유예 시간을 다시 시작)
+        """
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        self.client.copy_object(
+            Bucket=self.bucket, Key=key, CopySource={"Bucket": self.bucket, "Key": key},
+            MetadataDirective="REPLACE",
+            ContentType=head.get("ContentType", "application/octet-stream"),
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+        )
+        return True
+
+    async def create_presigned_upload(self, filename: str, content_type: str, size: int, sha256: str) -> dict | None:
+        """
+        클라이언트가 스토리지에 직접 올릴 PUT 주소와 함께 보내야 할 헤더를 만듭니다.
+        같은 내용이 이미 올라가 있으면 올릴 필요가 없으므로 None 을 반환합니다.
+        """
+        return await asyncio.to_thread(self._create_presigned_upload, f"{self.prefix}{filename}", content_type, size, sha256)
+
+    def _create_presigned_upload(self, key: str, content_type: str, size: int, sha256: str) -> dict | None:
+        if self._touch_if_exists(key):
+            return None
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumSHA256": checksum,
+                "CacheControl": IMMUTABLE_CACHE_CONTROL,
+            },
+            ExpiresIn=self.presign_ttl,
+        )
+        self.presigned += 1
+        return {
+            "method": "PUT",
+            "url": url,
+            "headers": {
+                "Content-Type": content_type,
+                "x-amz-checksum-sha256": checksum,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            },
+            "expiresIn": self.presign_ttl,
+        }
+
+    async def list_stale(self, older_than: float) -> list[str]:
+        return await asyncio.to_thread(self._list_stale, older_than)
+
+    def _list_stale(self, older_than: float) -> list[str]:
+        urls = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                filename = item["Key"][len(self.prefix):]
+                if CONTENT_ADDRESSED_NAME.match(filename) and item["LastModified"].timestamp() < older_than:
+                    urls.append(self.url_for(filename))
+        return urls
+
+    async def remove(self, url: str, older_than: float) -> int:
+        return await asyncio.to_thread(self._remove, url, older_than)
+
+    def _remove(self, url: str, older_than: float) -> int:
+        key = self._key_for(url)
+        if key is None:
+            return 0
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return 0
+            raise
+        if head["LastModified"].timestamp() >= older_than:
+            return 0
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return 1
+
+    async def remove_stale_temp_files(self, older_than: float) -> int:
+        """API 서버에 남은 .part 파일과, 끝나지 않고 남은 multipart 업로드 조각을 정리합니다."""
+        removed = await asyncio.to_thread(remove_stale_temp_files, older_than)
+        return removed + await asyncio.to_thread(self._abort_stale_multipart_uploads, older_than)
+
+    def _abort_stale_multipart_uploads(self, older_than: float) -> int:
+        aborted = 0
+        for page in self.client.get_paginator("list_multipart_uploads").paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"].timestamp() < older_than:
+                    self.client.abort_multipart_upload(Bucket=self.bucket, Key=upload["Key"], UploadId=upload["UploadId"])
+                    aborted += 1
+        return aborted
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "bucket": self.bucket, "uploaded": self.uploaded, "presigned": self.presigned}
+
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def create_storage():
+    if config.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=config.S3_BUCKET,
+            prefix=config.S3_KEY_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL,
+            region=config.S3_REGION,
+            public_url=config.S3_PUBLIC_URL,
+            multipart_threshold=config.S3_MULTIPART_THRESHOLD,
+            multipart_chunk_size=config.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=config.S3_MAX_CONCURRENCY,
+            presign_ttl=config.S3_PRESIGN_TTL,
+        )
+    return LocalStorage()
+
+
+storage = create_storage()
@@ -0,0 +1,168 @@
+# tasks.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+import config
+from counters import like_counts, view_counts
+from database import connect
+from images import VARIANTS, image_pipeline
+from serializers import image_url_cache
+from storage import storage
+from models.upload_model import UploadModel
+from models.user_model import UserModel
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    일정 간격으로 실행되는 백그라운드 작업 (main.py lifespan 에서 시작/종료)
+
+    job 은 처리한 항목 수를 반환하는 async 함수입니다.
+    실행 횟수, 처리 건수, 소요 시간, 실패 횟수와 마지막 오류를 모아 /stats 에서 보여줍니다. (오류는 traceback 과 함께 로그로도 남김)
+    한 번 실패해도 작업은 멈추지 않고 다음 주기에 다시 실행됩니다.
+    run_on_stop=True 이면 서버 종료 시 마지막으로 한 번 더 실행합니다. (버퍼 비우기 등)
+    """
+    registry: dict[str, "PeriodicTask"] = {}
+
+    def __init__(self, name: str, interval: float, job, run_on_stop: bool = False):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.run_on_stop = run_on_stop
+        self.runs = 0
+        self.failures = 0
+        self.total_processed = 0
+        self.last_processed = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.last_run_at: datetime | None = None
+        self.last_error: str | None = None
+        self.last_error_at: datetime | None = None
+        self._task: asyncio.Task | None = None
+        PeriodicTask.registry[name] = self
+
+    async def run_once(self) -> int:
+        started = time.perf_counter()
+        try:
+            processed = await self.job()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = repr(e)
+            self.last_error_at = datetime.now()
+            logger.exception("[%s] 백그라운드 작업 실패", self.name)
+            return 0
+        finally:
+            self.runs += 1
+            self.last_run_at = datetime.now()
+            self.last_duration = time.perf_counter() - started
+            self.max_duration = max(self.max_duration, self.last_duration)
+
+        self.last_processed = processed
+        self.total_processed += processed
+        return processed
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.run_on_stop:
+            await self.run_once()
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "running": self._task is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "totalProcessed": self.total_processed,
+            "lastProcessed": self.last_processed,
+            "lastDurationMs": round(self.last_duration * 1000, 3),
+            "maxDurationMs": round(self.max_duration * 1000, 3),
+            "lastRunAt": self.last_run_at.isoformat(timespec="seconds") if self.last_run_at else None,
+            "lastError": self.last_error,
+            "lastErrorAt": self.last_error_at.isoformat(timespec="seconds") if self.last_error_at else None,
+        }
+
+    @classmethod
+    def start_all(cls):
+        for task in cls.registry.values():
+            task.start()
+
+    @classmethod
+    async def stop_all(cls):
+        for task in cls.registry.values():
+            await task.stop()
+
+    @classmethod
+    def all_stats(cls) -> dict:
+        return {name: task.stats() for name, task in cls.registry.items()}
+
+
+async def sweep_expired_sessions() -> int:
+    """
+    만료된 세션을 배치 단위로 삭제합니다.
+    배치마다 트랜잭션을 따로 커밋해 잠금을 짧게 유지하고, 배치 사이에는 이벤트 루프를 양보합니다.
+    한 번에 최대 SESSION_SWEEP_MAX_BATCHES 배치까지만 지우고 나머지는 다음 주기에 이어서 처리합니다.
+    """
+    purged = 0
+    for _ in range(config.SESSION_SWEEP_MAX_BATCHES):
+        async with connect() as conn:
+            async with conn.begin():
+                deleted = await UserModel.delete_expired_sessions(conn, config.SESSION_SWEEP_BATCH_SIZE)
+        purged += deleted
+        if deleted < config.SESSION_SWEEP_BATCH_SIZE:
+            break
+        await asyncio.sleep(0)
+    return purged
+
+
+async def collect_unreferenced_uploads() -> int:
+    """
+    저장소(STORAGE_BACKEND)에 내용 해시로 저장된 업로드 파일 중 삭제되지 않은 게시글(image_url)이나 회원(profile_url)이
+    더 이상 참조하지 않는 파일을 파생 이미지와 함께 지우고, 지운 원본 수를 반환합니다.
+    업로드 후 글을 작성하기 전의 파일이 지워지지 않도록 UPLOAD_GC_GRACE 가 지난 파일만 확인합니다.
+    """
+    older_than = time.time() - config.UPLOAD_GC_GRACE
+    candidates = await storage.list_stale(older_than)
+
+    collected = 0
+    for i in range(0, len(candidates), config.UPLOAD_GC_BATCH_SIZE):
+        batch = candidates[i:i + config.UPLOAD_GC_BATCH_SIZE]
+        async with connect() as conn:
+            referenced = await UploadModel.find_referenced_paths(conn, batch)
+        for url_path in batch:
+            if url_path not in referenced and await storage.remove(url_path, older_than):
+                image_pipeline.manifests.pop(url_path)
+                for name, _, _ in VARIANTS:
+                    image_url_cache.pop((url_path, name))
+                collected += 1
+        await asyncio.sleep(0)
+
+    await storage.remove_stale_temp_files(older_than)
+    return collected
+
+
+session_sweeper = PeriodicTask("session_sweeper", config.SESSION_SWEEP_INTERVAL, sweep_expired_sessions)
+view_count_flusher = PeriodicTask("view_count_flusher", config.VIEW_FLUSH_INTERVAL, view_counts.flush, run_on_stop=True)
+like_count_flusher = PeriodicTask("like_count_flusher", config.LIKE_FLUSH_INTERVAL, like_counts.flush, run_on_stop=True)
+like_count_reconciler = PeriodicTask(
+    "like_count_reconciler", config.LIKE_RECONCILE_INTERVAL if like_counts.enabled else 0, like_counts.reconcile
+)
+upload_collector = PeriodicTask("upload_collector", config.UPLOAD_GC_INTERVAL, collect_unreferenced_uploads)
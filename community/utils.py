@@ -1,12 +1,22 @@
 # utils.py
-from typing import Any, Generic, TypeVar, Optional
+from typing import Any, Generic, Literal, TypeVar, Optional
 from pydantic import BaseModel, EmailStr, Field
-from fastapi import Request, Response, Cookie, HTTPException
+from fastapi import Request, Response, Cookie, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from models.user_model import UserModel
+from database import get_db
+from cache import session_cache, user_cache
+from security import SessionTokenUtils
+from images import image_pipeline
+from storage import storage
+import config
+from sqlalchemy.ext.asyncio import AsyncConnection
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from datetime import datetime
+import asyncio
+import hashlib
 import os
 import uuid
 from fastapi import UploadFile
@@ -18,22 +28,149 @@ limiter = Limiter(key_func=get_remote_address)
 
 
 class FileService:
-    UPLOAD_DIR = "public/images"
+    UPLOAD_DIR = "public/images"  # 로컬 저장소 폴더, S3 저장소도 받는 동안의 임시 파일은 여기에 씀
+
+    # 파일 앞부분(매직 바이트)으로 판별한 실제 형식 -> 저장할 확장자
+    # 클라이언트가 보낸 파일명/Content-Type 은 믿지 않습니다.
+    IMAGE_SIGNATURES = (
+        (b"\x89PNG\r\n\x1a\n", ".png"),
+        (b"\xff\xd8\xff", ".jpg"),
+        (b"GIF87a", ".gif"),
+        (b"GIF89a", ".gif"),
+    )
+
+    # 저장할 확장자 -> 저장소에 기록할 Content-Type (presigned 업로드에서 허용하는 형식도 이 목록)
+    CONTENT_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".gif": "image/gif", ".webp": "image/webp"}
+
+    stored = 0        # 새로 저장한 파일 수
+    deduplicated = 0  # 같은 내용의 파일이 이미 있어 저장하지 않은 수
+
+    @classmethod
+    def sniff_image_type(cls, head: bytes) -> str | None:
+        """파일 앞부분으로 이미지 형식을 판별해 확장자를 반환합니다. (지원하지 않는 형식이면 None)"""
+        for signature, extension in cls.IMAGE_SIGNATURES:
+            if head.startswith(signature):
+                return extension
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return ".webp"
+        return None
 
     @classmethod
     async def save_file(cls, file: UploadFile) -> str:
-        """파일을 저장하고 접근 가능한 상대 경로를 반환합니다."""
-        # 파일명 생성 로직
-        extension = os.path.splitext(file.filename)[1]
-        filename = f"{uuid.uuid4()}{extension}"
-        file_path = os.path.join(cls.UPLOAD_DIR, filename)
-
-        # 실제 저장 로직 (나중에 이 부분만 S3 업로드 코드로 바꾸면 됩니다)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        return f"/public/images/{filename}"
+        """
+        파일을 저장하고 접근 가능한 주소를 반환합니다.
+        UPLOAD_CHUNK_SIZE 단위로 읽어 스레드에서 디스크에 쓰므로 큰 파일도 메모리에 한 번에 올리지 않고,
+        이벤트 루프도 멈추지 않습니다. 첫 조각으로 형식을 확인하고(415), 쓰는 도중 UPLOAD_MAX_BYTES 를 넘으면 중단합니다(413).
+
+        파일 이름은 내용의 SHA-256 해시(받으면서 계산)이므로, 같은 이미지를 여러 번 올려도 파일은 하나만 남고
+        이미 있는 경우 임시 파일만 지운 뒤 같은 주소를 돌려줍니다. (파생 이미지도 다시 만들지 않음)
+        다 받은 파일은 storage(STORAGE_BACKEND)에 올리고, 어디에서도 참조하지 않는 파일은 tasks.upload_collector 가 정리합니다.
+        """
+        head = await file.read(config.UPLOAD_CHUNK_SIZE)
+        extension = cls.sniff_image_type(head)
+        if extension is None:
+            raise HTTPException(status_code=415, detail="UNSUPPORTED_MEDIA_TYPE")
+
+        # 다 쓰기 전에는 공개 경로에 보이지 않도록 임시 이름으로 씁니다. (최종 이름은 해시를 다 계산한 뒤에 결정)
+        temp_path = os.path.join(cls.UPLOAD_DIR, f".{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+
+        f = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            size = 0
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > config.UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="FILE_TOO_LARGE")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+                chunk = await file.read(config.UPLOAD_CHUNK_SIZE)
+            await asyncio.to_thread(f.close)
+
+            filename = f"{digest.hexdigest()}{extension}"
+            created = await storage.put_file(temp_path, filename, cls.CONTENT_TYPES[extension])
+        except BaseException:
+            await asyncio.to_thread(cls._discard, f, temp_path)
+            raise
+
+        file_url = storage.url_for(filename)
+        if created:
+            cls.stored += 1
+            # 썸네일/WebP 등 파생 이미지는 응답을 기다리게 하지 않고 프로세스 풀에서 만듭니다. (로컬 저장소만)
+            image_pipeline.submit(file_url)
+        else:
+            cls.deduplicated += 1
+        return file_url
+
+    @classmethod
+    async def create_presigned_upload(cls, request: "UploadPresignRequest") -> dict:
+        """
+        클라이언트가 API 서버를 거치지 않고 저장소에 직접 올릴 수 있는 주소를 만듭니다. (S3 저장소만)
+        클라이언트가 계산한 SHA-256 이 파일 이름이 되고, 저장소가 올라온 내용과 체크섬/크기를 검증합니다.
+        같은 내용이 이미 있으면 upload 는 None 이고 imagePath 를 바로 쓰면 됩니다.
+        """
+        if not storage.supports_presigned_upload:
+            raise HTTPException(status_code=400, detail="PRESIGNED_UPLOAD_NOT_SUPPORTED")
+        if request.size > config.UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="FILE_TOO_LARGE")
+
+        extension = next(ext for ext, content_type in cls.CONTENT_TYPES.items() if content_type == request.contentType)
+        filename = f"{request.sha256}{extension}"
+        upload = await storage.create_presigned_upload(filename, request.contentType, request.size, request.sha256)
+        if upload is None:
+            cls.deduplicated += 1
+        return {"imagePath": storage.url_for(filename), "upload": upload}
+
+    @staticmethod
+    def _discard(f, path: str):
+        f.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {"stored": cls.stored, "deduplicated": cls.deduplicated, "storage": storage.stats()}
+
+
+class UploadSizeLimitMiddleware:
+    """
+    multipart 업로드 요청 본문 크기 제한 (ASGI 미들웨어)
+
+    UploadFile 은 라우트가 실행되기 전에 본문 전체를 임시 파일로 받아 두므로,
+    save_file 의 크기 검사만으로는 아주 큰 요청을 끝까지 받은 뒤에야 거절하게 됩니다.
+    Content-Length 가 제한을 넘으면 본문을 읽기 전에 413으로 응답하고,
+    Content-Length 가 없거나 실제 본문이 더 길면 받는 도중 제한을 넘는 순간 중단합니다.
+    """
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse(status_code=413, content={"message": "FILE_TOO_LARGE", "data": None})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # 본문 파싱 중에 발생하므로 라우트의 HTTPException 과 같은 형식으로 응답됩니다.
+                    raise HTTPException(status_code=413, detail="FILE_TOO_LARGE")
+            return message
+
+        await self.app(scope, limited_receive, send)
 
 # 모든 응답의 표준 규격
 class BaseResponse(BaseModel):
@@ -48,6 +185,12 @@ class UserInfo(BaseModel):
     profileImage: str | None = None # 없을 수도 있음
     status: str
 
+# presigned 업로드 요청 스키마 (클라이언트가 파일의 SHA-256 을 계산해 보냄)
+class UploadPresignRequest(BaseModel):
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$", description="파일 내용의 SHA-256 (16진수 소문자)")
+    contentType: Literal["image/png", "image/jpeg", "image/gif", "image/webp"]
+    size: int = Field(gt=0, description="파일 크기(바이트)")
+
 # 게시글 생성 요청 스키마
 class PostCreateRequest(BaseModel):
     title: str = Field(min_length=2, max_length=50, description="제목")
@@ -82,12 +225,30 @@ class PasswordChangeRequest(BaseModel):
     newPassword: str = Field(min_length=8, description="새로운 비밀번호")
 
 # 현재 로그인한 사용자를 확인하는 의존성 함수
-async def get_current_user(session_id: str | None = Cookie(default=None)) -> UserInfo:
+async def get_current_user(
+    session_id: str | None = Cookie(default=None),
+    db: AsyncConnection = Depends(get_db, scope="function")
+) -> UserInfo:
     
     if not session_id:
         raise HTTPException(status_code=401, detail="LOGIN_REQUIRED")
     
-    user_dict = UserModel.get_user_by_session(session_id)
+    if config.SESSION_MODE == "token":
+        user_dict = await _get_token_user(db, session_id)
+    else:
+        # 가장 많이 실행되는 쿼리이므로 캐시를 먼저 확인합니다. (로그아웃 등은 커밋 시 즉시 무효화)
+        user_dict = session_cache.get(session_id)
+        if user_dict is not None and user_dict["expiredAt"] <= datetime.now():
+            # 캐시된 사이에 세션이 만료된 경우 (만료 정리 작업이 행을 지웠을 수도 있음)
+            session_cache.pop(session_id)
+            user_dict = None
+        elif user_dict is None:
+            epoch = session_cache.epoch
+            user_dict = await UserModel.get_user_by_session(db, session_id)
+            if user_dict:
+                # 세션 만료 시각을 넘겨서까지 캐시하지 않습니다.
+                ttl = min(session_cache.ttl, (user_dict["expiredAt"] - datetime.now()).total_seconds())
+                session_cache.set(session_id, user_dict, ttl=ttl, epoch=epoch)
 
     if not user_dict:
         raise HTTPException(status_code=401, detail="INVALID_SESSION")
@@ -97,6 +258,36 @@ async def get_current_user(session_id: str | None = Cookie(default=None)) -> Use
 
     return UserInfo(**user_dict)
 
+async def get_optional_user(
+    session_id: str | None = Cookie(default=None),
+    db: AsyncConnection = Depends(get_db, scope="function")
+) -> UserInfo | None:
+    """로그인하지 않아도 되는 API용: 유효한 세션이면 사용자 정보, 없거나 만료/정지된 세션이면 None"""
+    if not session_id:
+        return None
+    try:
+        return await get_current_user(session_id, db)
+    except HTTPException:
+        return None
+
+async def _get_token_user(db: AsyncConnection, token: str) -> dict | None:
+    """[token 모드] 서명을 검증하고, 토큰이 마지막 로그아웃/비밀번호 변경 이후에 발급됐는지 확인합니다."""
+    claims = SessionTokenUtils.verify_token(token)
+    if not claims:
+        return None
+
+    # 사용자 정보는 캐시에서 꺼내므로 보통은 DB를 전혀 조회하지 않습니다.
+    user_dict = user_cache.get(claims["userId"])
+    if user_dict is None:
+        epoch = user_cache.epoch
+        user_dict = await UserModel.find_session_user(db, claims["userId"])
+        if user_dict:
+            user_cache.set(claims["userId"], user_dict, epoch=epoch)
+
+    if not user_dict or claims["issuedAt"] <= user_dict["sessionsValidAfter"]:
+        return None
+    return user_dict
+
 # 댓글 생성 요청 스키마
 class CommentCreateRequest(BaseModel):
     content: str = Field(min_length=1, max_length=200, description="댓글 내용")